@@ -4,91 +4,341 @@ Excel Workbook Analysis Script
 Analyzes the Optical_Normalized_Catalog_FULL_v2.xlsx workbook structure
 """
 
-import pandas as pd
+import argparse
 import sys
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
 from pathlib import Path
-import json
 
-def analyze_workbook(file_path):
-    """Analyze the Excel workbook and return detailed structure information."""
+from build_metrics import (
+    BuildMetrics, add_metrics_args, metrics_from_args, print_summary, timing_report_path, write_report
+)
+from catalog_writer import JsonCatalogWriter
+
+# Strings pandas.read_excel treats as missing by default
+DEFAULT_NA_VALUES = {
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan",
+    "1.#IND", "1.#QNAN", "<NA>", "N/A", "NA", "NULL", "NaN", "None",
+    "n/a", "nan", "null"
+}
+
+SAMPLE_SIZE = 3
+
+# Distinct values remembered per column; past this the count is only a lower bound
+DISTINCT_LIMIT = 10000
+
+class StreamingColumnProfile:
+    """Single-pass column statistics matching the pandas-based profile.
+
+    At most DISTINCT_LIMIT distinct values are kept, so memory stays flat
+    on very long sheets; past that the distinct count means "at least".
+    """
+
+    def __init__(self):
+        self.null_count = 0
+        self.distinct = set()
+        self.distinct_capped = False
+        self.samples = []
+        self.kinds = set()
+
+    def add(self, value):
+        """Fold one cell value into the running statistics."""
+        if value is None or (isinstance(value, str) and value in DEFAULT_NA_VALUES):
+            self.null_count += 1
+            return
+
+        # pandas' openpyxl reader turns integral floats back into ints
+        if isinstance(value, float) and value.is_integer():
+            value = int(value)
+
+        if isinstance(value, bool):
+            self.kinds.add("bool")
+        elif isinstance(value, int):
+            self.kinds.add("int")
+        elif isinstance(value, float):
+            self.kinds.add("float")
+        elif isinstance(value, datetime):
+            self.kinds.add("datetime")
+        else:
+            self.kinds.add("object")
+
+        if not self.distinct_capped:
+            self.distinct.add(value)
+            self.distinct_capped = len(self.distinct) >= DISTINCT_LIMIT
+        if len(self.samples) < SAMPLE_SIZE:
+            self.samples.append(value)
+
+    def dtype(self):
+        """Return the dtype pandas would infer for the column."""
+        if not self.kinds:
+            return "float64"
+        if self.kinds == {"datetime"}:
+            return "datetime64[ns]"
+        if self.kinds == {"bool"}:
+            # pandas reads a boolean column with gaps as 1.0/0.0 floats
+            return "float64" if self.null_count else "bool"
+        if self.kinds <= {"int", "float"}:
+            if "float" in self.kinds or self.null_count:
+                return "float64"
+            return "int64"
+        return "object"
+
+    def sample_values(self):
+        """Return the first non-null values cast to the inferred dtype."""
+        dtype = self.dtype()
+        if dtype == "float64":
+            return [float(v) for v in self.samples]
+        if dtype == "datetime64[ns]":
+            return [v.isoformat() for v in self.samples]
+        return list(self.samples)
+
+def iter_sheet_rows(worksheet):
+    """Yield the header and data rows of a read-only worksheet.
+
+    Empty rows are held back until a later non-empty row shows they are
+    interior, so trailing blank rows are dropped the way pandas drops them.
+    """
+    pending_blank_rows = 0
+    for row in worksheet.iter_rows(values_only=True):
+        if all(value is None for value in row):
+            pending_blank_rows += 1
+            continue
+        for _ in range(pending_blank_rows):
+            yield ()
+        pending_blank_rows = 0
+        yield row
+
+def make_column_names(header):
+    """Build pandas-style column names, including 'Unnamed: N' and dedup suffixes."""
+    names = []
+    seen = {}
+    for position, name in enumerate(header):
+        if name is None:
+            name = f"Unnamed: {position}"
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        names.append(name)
+    return names
+
+def profile_sheet_rows(sheet_name, rows):
+    """Profile a sheet from a row iterator in a single pass."""
+    rows = iter(rows)
+    header = list(next(rows, ()))
+    column_names = make_column_names(header)
+    profiles = [StreamingColumnProfile() for _ in column_names]
+    row_count = 0
+
+    for row in rows:
+        row_count += 1
+        # Rows wider than the header add unnamed columns, as pandas does
+        while len(row) > len(profiles):
+            column_names.append(f"Unnamed: {len(column_names)}")
+            missing = StreamingColumnProfile()
+            missing.null_count = row_count - 1
+            profiles.append(missing)
+        for position, profile in enumerate(profiles):
+            profile.add(row[position] if position < len(row) else None)
+
+    sheet_info = {
+        "name": sheet_name,
+        "rows": row_count,
+        "columns": len(column_names),
+        "column_names": column_names,
+        "data_types": {},
+        "sample_data": {},
+        "null_counts": {},
+        "unique_counts": {},
+        # Their unique_counts are lower bounds
+        "capped_unique_counts": [col for col, profile in zip(column_names, profiles) if profile.distinct_capped]
+    }
+    for col, profile in zip(column_names, profiles):
+        sheet_info["data_types"][col] = profile.dtype()
+        sheet_info["null_counts"][col] = profile.null_count
+        sheet_info["unique_counts"][col] = len(profile.distinct)
+        sheet_info["sample_data"][col] = profile.sample_values()
+
+    return sheet_info
+
+def profile_sheet_dataframe(workbook, sheet_name, metrics):
+    """Profile a sheet by loading it into a DataFrame."""
+    import pandas as pd
+
+    # Read the sheet
+    with metrics.stage("parse_sheet", sheet=sheet_name) as stage:
+        df = pd.read_excel(workbook, sheet_name=sheet_name)
+        stage["rows"] = len(df)
+    
+    # Basic info
+    sheet_info = {
+        "name": sheet_name,
+        "rows": len(df),
+        "columns": len(df.columns),
+        "column_names": list(df.columns),
+        "data_types": {},
+        "sample_data": {},
+        "null_counts": {},
+        "unique_counts": {},
+        # Counted exactly, so never capped
+        "capped_unique_counts": []
+    }
+    
+    # Analyze each column
+    with metrics.stage("column_stats", rows=len(df), sheet=sheet_name):
+        for col in df.columns:
+            # Data type
+            sheet_info["data_types"][col] = str(df[col].dtype)
+            
+            # Null counts
+            null_count = df[col].isnull().sum()
+            sheet_info["null_counts"][col] = int(null_count)
+            
+            # Unique value counts
+            unique_count = df[col].nunique()
+            sheet_info["unique_counts"][col] = int(unique_count)
+            
+            # Sample data (first 3 non-null values)
+            sample_values = df[col].dropna().head(SAMPLE_SIZE).tolist()
+            sheet_info["sample_data"][col] = sample_values
+    
+    return sheet_info
+
+def open_workbook(file_path, streaming=False):
+    """Open the workbook and return (handle, sheet names)."""
+    if streaming:
+        from openpyxl import load_workbook
+        workbook = load_workbook(file_path, read_only=True, data_only=True)
+        return workbook, workbook.sheetnames
+    # pandas is imported here so catalog-only callers never pay for it
+    import pandas as pd
+    workbook = pd.ExcelFile(file_path)
+    return workbook, workbook.sheet_names
+
+def profile_sheet(workbook, sheet_name, streaming=False, metrics=None):
+    """Profile one sheet of an open workbook."""
+    metrics = metrics or BuildMetrics("analyze_excel")
+    if streaming:
+        # Parsing and column statistics happen in the same pass
+        with metrics.stage("profile_sheet", sheet=sheet_name) as stage:
+            sheet_info = profile_sheet_rows(sheet_name, iter_sheet_rows(workbook[sheet_name]))
+            stage["rows"] = sheet_info["rows"]
+        return sheet_info
+    return profile_sheet_dataframe(workbook, sheet_name, metrics)
+
+def profile_sheet_in_worker(file_path, sheet_name, streaming=False, trace_memory=False):
+    """Open the workbook in a worker process and profile a single sheet.
+
+    Returns (sheet info, stage records) so the parent can merge timings.
+    """
+    metrics = BuildMetrics("analyze_excel", trace_memory=trace_memory).start()
+    with metrics.stage("open_workbook", sheet=sheet_name):
+        workbook, _ = open_workbook(file_path, streaming)
+    try:
+        return profile_sheet(workbook, sheet_name, streaming, metrics), metrics.stages
+    finally:
+        workbook.close()
+        metrics.finish()
+
+def iter_sheet_profiles(file_path, workbook, sheet_names, streaming=False, workers=None, metrics=None):
+    """Yield (sheet name, sheet info or exception) in workbook order.
+
+    With more than one worker each sheet is parsed and profiled in its own
+    process; results are still yielded in ``sheet_names`` order and the
+    workers' stage timings are merged into ``metrics``.
+    """
+    metrics = metrics or BuildMetrics("analyze_excel")
+    if not workers or workers <= 1:
+        for sheet_name in sheet_names:
+            try:
+                yield sheet_name, profile_sheet(workbook, sheet_name, streaming, metrics)
+            except Exception as e:
+                yield sheet_name, e
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(profile_sheet_in_worker, file_path, sheet_name, streaming, metrics.trace_memory)
+            for sheet_name in sheet_names
+        ]
+        for sheet_name, future in zip(sheet_names, futures):
+            try:
+                sheet_info, stages = future.result()
+            except Exception as e:
+                yield sheet_name, e
+                continue
+            metrics.add_stages(stages)
+            yield sheet_name, sheet_info
+
+def analyze_workbook(file_path, streaming=False, workers=None, metrics=None):
+    """Analyze the Excel workbook and return detailed structure information.
+
+    With ``streaming=True`` each sheet is read row-by-row in openpyxl
+    read-only mode and profiled in one pass instead of being loaded into
+    a DataFrame. ``workers`` > 1 fans sheets out across a process pool.
+    All modes produce the same analysis schema and sheet order, except
+    that streaming stops counting distinct values at DISTINCT_LIMIT and
+    lists the columns where it did in ``capped_unique_counts`` (always
+    empty when profiling with pandas). Stage timings and row counts are
+    recorded into ``metrics`` when given.
+    """
+    metrics = metrics or BuildMetrics("analyze_excel")
     
     print("🔍 Analyzing Excel Workbook Structure")
     print("=" * 50)
     
     try:
         # Load the workbook
-        workbook = pd.ExcelFile(file_path)
+        with metrics.stage("open_workbook"):
+            workbook, sheet_names = open_workbook(file_path, streaming)
         print(f"📁 File: {file_path}")
-        print(f"📊 Total Sheets: {len(workbook.sheet_names)}")
+        print(f"📊 Total Sheets: {len(sheet_names)}")
+        if streaming:
+            print("🌊 Mode: streaming (read-only, single pass)")
+        if workers and workers > 1:
+            print(f"⚙️  Workers: {workers}")
         print()
         
         analysis = {
             "file_info": {
                 "path": str(file_path),
-                "total_sheets": len(workbook.sheet_names),
-                "sheet_names": workbook.sheet_names
+                "total_sheets": len(sheet_names),
+                "sheet_names": sheet_names
             },
             "sheets": {}
         }
         
         # Analyze each sheet
-        for sheet_name in workbook.sheet_names:
+        for sheet_name, sheet_info in iter_sheet_profiles(file_path, workbook, sheet_names, streaming, workers, metrics):
             print(f"📋 Analyzing Sheet: '{sheet_name}'")
             print("-" * 30)
             
-            try:
-                # Read the sheet
-                df = pd.read_excel(workbook, sheet_name=sheet_name)
-                
-                # Basic info
-                sheet_info = {
-                    "name": sheet_name,
-                    "rows": len(df),
-                    "columns": len(df.columns),
-                    "column_names": list(df.columns),
-                    "data_types": {},
-                    "sample_data": {},
-                    "null_counts": {},
-                    "unique_counts": {}
-                }
-                
-                print(f"   Rows: {len(df)}")
-                print(f"   Columns: {len(df.columns)}")
-                print(f"   Column Names: {list(df.columns)}")
-                
-                # Analyze each column
-                for col in df.columns:
-                    # Data type
-                    sheet_info["data_types"][col] = str(df[col].dtype)
-                    
-                    # Null counts
-                    null_count = df[col].isnull().sum()
-                    sheet_info["null_counts"][col] = int(null_count)
-                    
-                    # Unique value counts
-                    unique_count = df[col].nunique()
-                    sheet_info["unique_counts"][col] = int(unique_count)
-                    
-                    # Sample data (first 3 non-null values)
-                    sample_values = df[col].dropna().head(3).tolist()
-                    sheet_info["sample_data"][col] = sample_values
-                
-                # Display column details
-                print("   Column Details:")
-                for col in df.columns:
-                    dtype = sheet_info["data_types"][col]
-                    nulls = sheet_info["null_counts"][col]
-                    unique = sheet_info["unique_counts"][col]
-                    samples = sheet_info["sample_data"][col]
-                    print(f"     {col}: {dtype} | {unique} unique | {nulls} nulls | samples: {samples}")
-                
-                analysis["sheets"][sheet_name] = sheet_info
-                print()
-                
-            except Exception as e:
-                print(f"   ❌ Error reading sheet '{sheet_name}': {e}")
-                analysis["sheets"][sheet_name] = {"error": str(e)}
+            if isinstance(sheet_info, Exception):
+                print(f"   ❌ Error reading sheet '{sheet_name}': {sheet_info}")
+                analysis["sheets"][sheet_name] = {"error": str(sheet_info)}
                 print()
+                continue
+            
+            print(f"   Rows: {sheet_info['rows']}")
+            print(f"   Columns: {sheet_info['columns']}")
+            print(f"   Column Names: {sheet_info['column_names']}")
+            
+            # Display column details
+            print("   Column Details:")
+            for col in sheet_info["column_names"]:
+                dtype = sheet_info["data_types"][col]
+                nulls = sheet_info["null_counts"][col]
+                unique = sheet_info["unique_counts"][col]
+                if col in sheet_info["capped_unique_counts"]:
+                    unique = f"at least {unique}"
+                samples = sheet_info["sample_data"][col]
+                print(f"     {col}: {dtype} | {unique} unique | {nulls} nulls | samples: {samples}")
+            
+            analysis["sheets"][sheet_name] = sheet_info
+            print()
+        
+        workbook.close()
         
         return analysis
         
@@ -96,21 +346,41 @@ def analyze_workbook(file_path):
         print(f"❌ Error loading workbook: {e}")
         return None
 
-def save_analysis(analysis, output_file):
-    """Save the analysis to a JSON file."""
+def save_analysis(analysis, output_file, metrics=None, style="pretty"):
+    """Save the analysis to a JSON file, streaming one sheet at a time."""
+    metrics = metrics or BuildMetrics("analyze_excel")
     try:
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(analysis, f, indent=2, ensure_ascii=False)
+        with metrics.stage("write_json"), JsonCatalogWriter(output_file, style) as writer:
+            writer.write_value("file_info", analysis["file_info"])
+            writer.write_mapping("sheets", analysis["sheets"].items())
         print(f"✅ Analysis saved to: {output_file}")
     except Exception as e:
         print(f"❌ Error saving analysis: {e}")
 
-def main():
+def parse_args(argv=None):
+    """Parse command line options."""
+    parser = argparse.ArgumentParser(description="Analyze the catalog workbook structure")
+    parser.add_argument("--input", default="data/Optical_Normalized_Catalog_FULL_v2.xlsx",
+                        help="Path to the Excel workbook")
+    parser.add_argument("--output", default="data/workbook_analysis.json",
+                        help="Where to write the analysis JSON")
+    parser.add_argument("--streaming", action="store_true",
+                        help="Profile sheets row-by-row in read-only mode")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Parse and profile sheets across this many processes")
+    parser.add_argument("--json-style", choices=["pretty", "compact"], default="pretty",
+                        help="Indent the analysis JSON or write it compactly")
+    add_metrics_args(parser)
+    return parser.parse_args(argv)
+
+def main(argv=None):
     """Main analysis function."""
     
+    args = parse_args(argv)
+    
     # File paths
-    excel_file = Path("data/Optical_Normalized_Catalog_FULL_v2.xlsx")
-    output_file = Path("data/workbook_analysis.json")
+    excel_file = Path(args.input)
+    output_file = Path(args.output)
     
     # Check if Excel file exists
     if not excel_file.exists():
@@ -118,11 +388,18 @@ def main():
         sys.exit(1)
     
     # Analyze the workbook
-    analysis = analyze_workbook(excel_file)
+    metrics = metrics_from_args("analyze_excel", args)
+    analysis = analyze_workbook(excel_file, streaming=args.streaming, workers=args.workers, metrics=metrics)
     
     if analysis:
         # Save analysis
-        save_analysis(analysis, output_file)
+        save_analysis(analysis, output_file, metrics, args.json_style)
+        
+        # Timing report
+        timings_file = Path(args.timings) if args.timings else timing_report_path(output_file)
+        report = write_report(metrics, timings_file, args.openmetrics)
+        print(f"✅ Timings saved to: {timings_file}")
+        print_summary(report)
         
         # Summary
         print("\n" + "=" * 50)
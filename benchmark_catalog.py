@@ -0,0 +1,506 @@
+#!/usr/bin/env python3
+"""
+Catalog Benchmark Suite
+Times the catalog build, load and lookup paths on generated fixtures of
+several sizes and compares the results against a stored baseline
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import platform
+import random
+import resource
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+# Fixture sizes, passed straight to generate_scaled_catalog
+SIZES = {
+    "small": {"frames": 1000},
+    "medium": {"frames": 20000, "designs": 16, "materials": 8, "tints": 30},
+    "large": {"frames": 100000, "designs": 20, "materials": 10, "treatments": 6, "tints": 40}
+}
+
+# Targets from docs/validation-engine.md, checked against matching results:
+# metric -> ("max", limit) or ("min", limit)
+TARGETS = {
+    "load_catalog_json": {"peak_alloc_mb": ("max", 50.0)},
+    "load_catalog_model": {"retained_alloc_mb": ("max", 50.0)},
+    "order_validation_latency": {"p95_ms": ("max", 100.0)},
+    "validation_cache_stream": {"hit_rate": ("min", 0.9)}
+}
+
+LOOKUPS_PER_RUN = 10000
+
+BENCHMARKS = {}
+
+def benchmark(name):
+    """Register a benchmark.
+
+    The decorated function receives the fixture paths, does any setup that
+    should not be timed, and returns the zero-argument callable to measure.
+    A callable that returns a dict of numbers adds them to the results.
+    """
+    def register(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+def load_catalog(path):
+    """Load a JSON catalog fixture."""
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+@benchmark("analyze_workbook")
+def bench_analyze_workbook(fixture):
+    from analyze_excel import analyze_workbook
+    return lambda: analyze_workbook(fixture["workbook"])
+
+@benchmark("analyze_workbook_streaming")
+def bench_analyze_workbook_streaming(fixture):
+    from analyze_excel import analyze_workbook
+    return lambda: analyze_workbook(fixture["workbook"], streaming=True)
+
+@benchmark("analyze_workbook_parallel")
+def bench_analyze_workbook_parallel(fixture):
+    from analyze_excel import analyze_workbook
+    return lambda: analyze_workbook(fixture["workbook"], streaming=True, workers=4)
+
+def workbook_schema(fixture):
+    """Analyze a fixture workbook once and return its per-sheet schema."""
+    from analyze_excel import analyze_workbook
+    with contextlib.redirect_stdout(io.StringIO()):
+        return analyze_workbook(fixture["workbook"], streaming=True)["sheets"]
+
+@benchmark("ingest_workbook_typed")
+def bench_ingest_workbook_typed(fixture):
+    from excel_ingest import read_workbook
+    schema = workbook_schema(fixture)
+    return lambda: read_workbook(fixture["workbook"], schema)
+
+@benchmark("ingest_workbook_pandas")
+def bench_ingest_workbook_pandas(fixture):
+    import pandas as pd
+    from build_catalog import SHEET_SPECS
+    return lambda: pd.read_excel(fixture["workbook"], sheet_name=list(SHEET_SPECS))
+
+@benchmark("build_catalog_full")
+def bench_build_catalog_full(fixture):
+    from build_catalog import build_catalog
+    output = Path(fixture["dir"]) / "build_output.json"
+    return lambda: build_catalog(fixture["workbook"], output, incremental=False)
+
+@benchmark("generate_catalog_json")
+def bench_generate_catalog_json(fixture):
+    from catalog_compiler import compile_catalog
+    catalog = load_catalog(fixture["catalog"])
+
+    def run():
+        compile_catalog(catalog)
+        return json.dumps(catalog, indent=2, ensure_ascii=False)
+    return run
+
+@benchmark("stream_catalog_json")
+def bench_stream_catalog_json(fixture):
+    from generate_sample_data import generate_scaled_catalog
+    output = Path(fixture["dir"]) / "streamed_catalog.json"
+    return lambda: generate_scaled_catalog(output, **SIZES[fixture["size"]])
+
+@benchmark("load_catalog_json")
+def bench_load_catalog_json(fixture):
+    return lambda: load_catalog(fixture["catalog"])
+
+@benchmark("load_catalog_model")
+def bench_load_catalog_model(fixture):
+    from catalog_model import CatalogModel
+    return lambda: CatalogModel(load_catalog(fixture["catalog"]))
+
+@benchmark("compatibility_lookups")
+def bench_compatibility_lookups(fixture):
+    from catalog_compiler import combo_key, compile_catalog, lookup
+    catalog = compile_catalog(load_catalog(fixture["catalog"]))
+    rng = random.Random(0)
+    availability = catalog["availability"]
+    combos = [
+        combo_key(row["designId"], row["materialId"], row["treatmentId"])
+        for row in rng.choices(availability, k=LOOKUPS_PER_RUN)
+    ]
+    skus = [frame["sku"] for frame in rng.choices(catalog["frames"], k=LOOKUPS_PER_RUN)]
+    combo_tints = catalog["indexes"]["comboTints"]
+    material_treatments = catalog["indexes"]["materialTreatments"]
+
+    def run():
+        for key, sku in zip(combos, skus):
+            lookup(catalog, "availability", key)
+            lookup(catalog, "framesBySku", sku)
+            combo_tints.get(key)
+            material_treatments.get(key.split("|")[1])
+    return run
+
+@benchmark("option_resolver")
+def bench_option_resolver(fixture):
+    from order_resolver import OptionResolver
+    catalog = load_catalog(fixture["catalog"])
+    rng = random.Random(0)
+    selections = [
+        {"material_id": row["materialId"], "design_id": rng.choice([row["designId"], None])}
+        for row in rng.choices(catalog["availability"], k=LOOKUPS_PER_RUN)
+    ]
+
+    def run():
+        resolver = OptionResolver(catalog)
+        for selection in selections:
+            resolver.remaining_options(**selection)
+        return resolver.cache_stats()
+    return run
+
+@benchmark("wizard_view_queries")
+def bench_wizard_view_queries(fixture):
+    from wizard_views import WizardViews
+    catalog = load_catalog(fixture["catalog"])
+    views = WizardViews.from_catalog(catalog)
+    rng = random.Random(0)
+    skus = [frame["sku"] for frame in rng.choices(catalog["frames"], k=LOOKUPS_PER_RUN)]
+    combos = rng.choices(catalog["availability"], k=LOOKUPS_PER_RUN)
+
+    def run():
+        for sku, row in zip(skus, combos):
+            rimless = views.frame_kind(sku) == "rimless"
+            views.materials(sku)
+            views.designs(row["materialId"], rimless)
+            views.treatments(row["designId"], row["materialId"], rimless)
+            views.tints(row["designId"], row["materialId"], row["treatmentId"])
+    return run
+
+@benchmark("combination_analysis")
+def bench_combination_analysis(fixture):
+    from combination_analysis import analyze_combinations
+    catalog = load_catalog(fixture["catalog"])
+    return lambda: analyze_combinations(catalog)
+
+ORDERS_PER_BATCH = 100000
+
+@benchmark("batch_order_validation")
+def bench_batch_order_validation(fixture):
+    from order_validation import BatchValidator
+    catalog = load_catalog(fixture["catalog"])
+    rng = random.Random(0)
+    rows = rng.choices(catalog["availability"], k=ORDERS_PER_BATCH)
+    columns = {
+        "designId": [row["designId"] for row in rows],
+        "materialId": [row["materialId"] for row in rows],
+        "treatmentId": [row["treatmentId"] for row in rows],
+        "sphere": [rng.randrange(-24, 25) * 0.25 for _ in rows],
+        "cylinder": [rng.randrange(-12, 1) * 0.25 for _ in rows],
+        "axis": [rng.randrange(0, 181) for _ in rows],
+        "addPower": [rng.choice([None, 1.0, 2.25, 3.5]) for _ in rows],
+        "segmentHeight": [rng.randrange(10, 25) for _ in rows]
+    }
+    validator = BatchValidator(catalog)
+    return lambda: validator.validate(columns)
+
+def sample_orders(catalog, rng, count):
+    """Return ``count`` flat orders over random availability combos."""
+    return [
+        {"designId": row["designId"], "materialId": row["materialId"], "treatmentId": row["treatmentId"],
+         "sphere": rng.randrange(-8, 9) * 0.25, "cylinder": rng.randrange(-4, 1) * 0.25, "axis": 90}
+        for row in rng.choices(catalog["availability"], k=count)
+    ]
+
+@benchmark("validation_cache_warm")
+def bench_validation_cache_warm(fixture):
+    from order_validation import BatchValidator
+    from validation_cache import ValidationCache, validate_orders_cached
+    catalog = load_catalog(fixture["catalog"])
+    orders = sample_orders(catalog, random.Random(0), LOOKUPS_PER_RUN)
+    validator = BatchValidator(catalog)
+    cache = ValidationCache.for_catalog(catalog)
+    validate_orders_cached(validator, orders, cache)
+    return lambda: validate_orders_cached(validator, orders, cache)
+
+ORDERS_PER_LATENCY_RUN = 200
+
+@benchmark("order_validation_latency")
+def bench_order_validation_latency(fixture):
+    from order_validation import BatchValidator
+    catalog = load_catalog(fixture["catalog"])
+    orders = sample_orders(catalog, random.Random(0), ORDERS_PER_LATENCY_RUN)
+    validator = BatchValidator(catalog)
+
+    def run():
+        # Each order on its own, as the order wizard submits them
+        latencies = []
+        for order in orders:
+            start = time.perf_counter()
+            validator.validate_orders([order])
+            latencies.append((time.perf_counter() - start) * 1000)
+        return {"p95_ms": statistics.quantiles(latencies, n=20)[-1], "max_ms": max(latencies)}
+    return run
+
+# Distinct order configurations in the cache stream, and orders per batch
+CACHE_STREAM_CONFIGS = 500
+CACHE_STREAM_BATCH = 100
+
+@benchmark("validation_cache_stream")
+def bench_validation_cache_stream(fixture):
+    from order_validation import BatchValidator
+    from validation_cache import ValidationCache, validate_orders_cached
+    catalog = load_catalog(fixture["catalog"])
+    rng = random.Random(0)
+    configs = sample_orders(catalog, rng, CACHE_STREAM_CONFIGS)
+    # A few configurations are ordered far more often than the rest
+    orders = rng.choices(configs, weights=[1 / rank for rank in range(1, len(configs) + 1)], k=LOOKUPS_PER_RUN)
+    validator = BatchValidator(catalog)
+
+    def run():
+        cache = ValidationCache.for_catalog(catalog)
+        for start in range(0, len(orders), CACHE_STREAM_BATCH):
+            validate_orders_cached(validator, orders[start:start + CACHE_STREAM_BATCH], cache)
+        return {"hit_rate": cache.stats()["hitRate"]}
+    return run
+
+FRAME_QUERIES_PER_RUN = 200
+
+def frame_queries(count):
+    """Return reproducible multi-criteria frame searches like an optician's."""
+    rng = random.Random(0)
+    queries = []
+    for _ in range(count):
+        eye = rng.randint(46, 58)
+        query = {"a": (eye, eye + rng.randint(0, 3)), "discontinued": False}
+        if rng.random() < 0.7:
+            bridge = rng.randint(15, 19)
+            query["dbl"] = (bridge, bridge + 2)
+        if rng.random() < 0.3:
+            query["safety"] = True
+        if rng.random() < 0.3:
+            query["color"] = ["BLACK", "TORTOISE"]
+        queries.append(query)
+    return queries
+
+@benchmark("frame_search_index")
+def bench_frame_search_index(fixture):
+    from frame_search import FrameIndex
+    index = FrameIndex(load_catalog(fixture["catalog"])["frames"])
+    queries = frame_queries(FRAME_QUERIES_PER_RUN)
+
+    def run():
+        for query in queries:
+            index.search_positions(**query)
+        index.nearest({"framePd": 64, "a": 52}, k=10, safety=True)
+    return run
+
+@benchmark("frame_search_linear")
+def bench_frame_search_linear(fixture):
+    from frame_search import linear_search
+    frames = load_catalog(fixture["catalog"])["frames"]
+    queries = frame_queries(FRAME_QUERIES_PER_RUN)
+
+    def run():
+        for query in queries:
+            linear_search(frames, **query)
+    return run
+
+def cold_start(code):
+    """Return a callable that runs ``code`` in a fresh interpreter."""
+    command = [sys.executable, "-c", code]
+    return lambda: subprocess.run(command, check=True, cwd=Path(__file__).parent)
+
+@benchmark("cold_start_import_analyze")
+def bench_cold_start_import_analyze(fixture):
+    return cold_start("import analyze_excel")
+
+@benchmark("cold_start_json")
+def bench_cold_start_json(fixture):
+    return cold_start(f"import catalog_access; catalog_access.load_catalog({fixture['catalog']!r}, use_snapshot=False)")
+
+@benchmark("cold_start_snapshot")
+def bench_cold_start_snapshot(fixture):
+    from catalog_access import load_catalog as load_compiled_catalog
+    # Prime the snapshot outside the timed runs
+    load_compiled_catalog(fixture["catalog"])
+    return cold_start(f"import catalog_access; catalog_access.load_catalog({fixture['catalog']!r})")
+
+def prepare_fixture(size, fixtures_dir):
+    """Generate (or reuse) the catalog and workbook fixtures for a size."""
+    from build_catalog import write_catalog_workbook
+    from generate_sample_data import generate_scaled_catalog
+
+    fixture_dir = Path(fixtures_dir) / size
+    fixture_dir.mkdir(parents=True, exist_ok=True)
+    catalog_path = fixture_dir / "catalog.json"
+    workbook_path = fixture_dir / "catalog.xlsx"
+    params_path = fixture_dir / "params.json"
+    params = SIZES[size]
+
+    stale = not params_path.exists() or json.loads(params_path.read_text()) != params
+    if stale or not catalog_path.exists() or not workbook_path.exists():
+        print(f"   🔄 Generating {size} fixture...")
+        generate_scaled_catalog(catalog_path, **params)
+        write_catalog_workbook(load_catalog(catalog_path), workbook_path)
+        params_path.write_text(json.dumps(params))
+
+    return {"size": size, "dir": str(fixture_dir), "catalog": str(catalog_path), "workbook": str(workbook_path)}
+
+def peak_rss_mb():
+    """Return this process's peak resident set size in MiB."""
+    # ru_maxrss survives fork/exec on Linux, so a spawned worker would
+    # report the parent's peak; VmHWM is tracked per address space
+    try:
+        with open("/proc/self/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    rss_scale = 1 if sys.platform == "darwin" else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * rss_scale / 2**20
+
+def run_case(name, fixture, repeat):
+    """Run one benchmark in the current process and return its measurements."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        run = BENCHMARKS[name](fixture)
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = run()
+            times.append(time.perf_counter() - start)
+        # Taken from an untraced run, like the timings
+        measurements = result if isinstance(result, dict) else {}
+
+        # Separate run so tracing overhead does not skew the timings; memory
+        # still held while the result is alive is what the case retains
+        tracemalloc.start()
+        result = run()
+        retained_alloc, peak_alloc = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del result
+
+    return {
+        **measurements,
+        "name": name,
+        "size": fixture["size"],
+        "repeat": repeat,
+        "wall_seconds": min(times),
+        "wall_seconds_median": statistics.median(times),
+        "peak_rss_mb": peak_rss_mb(),
+        "peak_alloc_mb": peak_alloc / 2**20,
+        "retained_alloc_mb": retained_alloc / 2**20
+    }
+
+def run_isolated(name, fixture, repeat):
+    """Run a benchmark in a fresh process so peak RSS belongs to it alone."""
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(1) as pool:
+        return pool.apply(run_case, (name, fixture, repeat))
+
+def compare_to_baseline(results, baseline, tolerance):
+    """Return regressions where wall time or memory grew past ``tolerance``."""
+    previous = {(entry["name"], entry["size"]): entry for entry in baseline.get("results", [])}
+    regressions = []
+    for entry in results:
+        before = previous.get((entry["name"], entry["size"]))
+        if before is None:
+            continue
+        for metric in ("wall_seconds", "peak_alloc_mb", "retained_alloc_mb"):
+            if before.get(metric, 0) > 0 and entry[metric] > before[metric] * (1 + tolerance):
+                regressions.append({
+                    "name": entry["name"],
+                    "size": entry["size"],
+                    "metric": metric,
+                    "baseline": before[metric],
+                    "current": entry[metric]
+                })
+    return regressions
+
+def check_targets(results):
+    """Return results that miss a documented performance target."""
+    misses = []
+    for entry in results:
+        for metric, (bound, limit) in TARGETS.get(entry["name"], {}).items():
+            if entry[metric] > limit if bound == "max" else entry[metric] < limit:
+                misses.append({"name": entry["name"], "size": entry["size"],
+                               "metric": metric, "target": limit, "current": entry[metric]})
+    return misses
+
+def parse_args(argv=None):
+    """Parse command line options."""
+    parser = argparse.ArgumentParser(description="Benchmark catalog build, load and lookup paths")
+    parser.add_argument("--sizes", nargs="+", choices=list(SIZES), default=["small", "medium"],
+                        help="Fixture sizes to benchmark")
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS),
+                        help="Run only these benchmarks")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per benchmark")
+    parser.add_argument("--fixtures-dir", default="data/benchmark_fixtures",
+                        help="Where generated fixtures are cached")
+    parser.add_argument("--output", default="data/benchmark_results.json",
+                        help="Where to write machine-readable results")
+    parser.add_argument("--baseline", default="data/benchmark_baseline.json",
+                        help="Baseline results to compare against")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="Store these results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="Allowed slowdown/growth over baseline before flagging (0.2 = 20%%)")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """Run the benchmark suite."""
+    args = parse_args(argv)
+    names = args.only or list(BENCHMARKS)
+
+    print("⏱️  Catalog Benchmark Suite")
+    print("=" * 50)
+
+    results = []
+    for size in args.sizes:
+        print(f"📦 Fixture: {size} {SIZES[size]}")
+        fixture = prepare_fixture(size, args.fixtures_dir)
+        for name in names:
+            entry = run_isolated(name, fixture, args.repeat)
+            results.append(entry)
+            print(f"   {name}: {entry['wall_seconds'] * 1000:.1f} ms | "
+                  f"peak RSS {entry['peak_rss_mb']:.1f} MB | allocated {entry['peak_alloc_mb']:.1f} MB | "
+                  f"retained {entry['retained_alloc_mb']:.1f} MB")
+
+    report = {
+        "timestamp": datetime.now().isoformat(),
+        "environment": {"python": platform.python_version(), "platform": platform.platform()},
+        "results": results,
+        "targetMisses": check_targets(results)
+    }
+
+    baseline_path = Path(args.baseline)
+    if baseline_path.exists() and not args.save_baseline:
+        report["regressions"] = compare_to_baseline(results, load_catalog(baseline_path), args.tolerance)
+
+    output_path = Path(args.output)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    output_path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"\n✅ Results saved to: {output_path}")
+
+    if args.save_baseline:
+        baseline_path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"✅ Baseline saved to: {baseline_path}")
+
+    for miss in report["targetMisses"]:
+        relation = ">" if TARGETS[miss["name"]][miss["metric"]][0] == "max" else "<"
+        print(f"⚠️  Target missed: {miss['name']} ({miss['size']}) {miss['metric']} "
+              f"{miss['current']:.2f} {relation} {miss['target']}")
+
+    regressions = report.get("regressions", [])
+    for regression in regressions:
+        print(f"❌ Regression: {regression['name']} ({regression['size']}) {regression['metric']} "
+              f"{regression['baseline']:.4f} -> {regression['current']:.4f}")
+    if regressions:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
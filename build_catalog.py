@@ -0,0 +1,472 @@
+#!/usr/bin/env python3
+"""
+Catalog Build Script
+Converts the Optical_Normalized_Catalog_FULL_v2.xlsx workbook into catalog JSON,
+re-parsing only the sheets whose content changed since the last build
+"""
+
+import argparse
+import hashlib
+import json
+import sys
+from datetime import datetime
+from pathlib import Path
+
+from analyze_excel import DEFAULT_NA_VALUES, iter_sheet_rows
+from build_metrics import BuildMetrics
+from catalog_compiler import compile_catalog
+
+CATALOG_VERSION = "2.0"
+
+# Bump when converters change so cached sections are not reused
+CONVERTER_VERSION = 2
+
+def to_text(value):
+    """Return a cell as a string, or None when empty."""
+    if value is None:
+        return None
+    return str(value)
+
+def to_float(value):
+    """Return a numeric cell as a float, or None when empty."""
+    if value is None:
+        return None
+    return float(value)
+
+def to_int(value):
+    """Return a numeric cell as an int, or None when empty."""
+    if value is None:
+        return None
+    return int(value)
+
+def to_flag(value):
+    """Return a Y/N (or boolean) cell as a bool, or None when empty."""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return value.strip().upper() in ("Y", "YES", "TRUE", "1")
+    return bool(value)
+
+def to_list(value):
+    """Return a semicolon-separated cell as a list of strings."""
+    if value is None:
+        return []
+    return [part.strip() for part in str(value).split(";") if part.strip()]
+
+# Sheet -> (catalog section, [(field, column, converter)]).
+# Dotted field names produce nested objects, e.g. frame dimensions.
+SHEET_SPECS = {
+    "Materials": ("materials", [
+        ("id", "MATERIAL_ID", to_text),
+        ("displayName", "NAME_DISPLAY", to_text),
+        ("refractiveIndex", "INDEX", to_float),
+        ("available", "AVAILABLE", to_flag),
+        ("rimlessAllowed", "RIMLESS_ALLOWED", to_flag),
+        ("notes", "NOTES", to_text),
+        ("labOutput", "OUTPUT_LM", to_text)
+    ]),
+    "Treatments": ("treatments", [
+        ("id", "TREATMENT_ID", to_text),
+        ("type", "TYPE", to_text),
+        ("colorsAllowed", "COLORS_ALLOWED", to_text),
+        ("rimlessAllowed", "RIMLESS_ALLOWED", to_flag),
+        ("notes", "NOTES", to_text),
+        ("labOutput", "OUTPUT_TREATMENT", to_text)
+    ]),
+    "Designs": ("designs", [
+        ("id", "DESIGN_ID", to_text),
+        ("category", "CATEGORY", to_text),
+        ("segmentType", "SEG_TYPE", to_text),
+        ("segmentSize", "SEG_SIZE_REQUIRED", to_float),
+        ("minSegmentHeight", "MIN_SEG_HEIGHT_MM", to_int),
+        ("discontinued", "DISCONTINUED", to_flag),
+        ("notes", "NOTES", to_text),
+        ("labOutput", "OUTPUT_LT", to_text),
+        ("segmentOutput", "OUTPUT_SG", to_float)
+    ]),
+    "Frames": ("frames", [
+        ("id", "FRAME_ID", to_int),
+        ("brandModel", "BRAND_MODEL", to_text),
+        ("sku", "SKU", to_int),
+        ("color", "COLOR", to_text),
+        ("material", "MATERIAL", to_text),
+        ("dimensions.a", "A", to_int),
+        ("dimensions.b", "B", to_int),
+        ("dimensions.dbl", "DBL", to_int),
+        ("dimensions.ed", "ED", to_float),
+        ("dimensions.temple", "TEMPLE", to_int),
+        ("dimensions.framePd", "FRAME_PD", to_int),
+        ("collection", "COLLECTION", to_text),
+        ("flags.safety", "SAFETY_FLAG", to_flag),
+        ("flags.sport", "SPORT_FLAG", to_flag),
+        ("sideShieldSku", "SIDE_SHIELD_SKU", to_int),
+        ("heroImage", "HERO_IMAGE", to_text),
+        ("discontinued", "DISCONTINUED", to_flag),
+        ("backordered", "BACKORDERED", to_flag),
+        ("notes", "NOTES", to_text)
+    ]),
+    "AddPowerRules": ("addPowerRules", [
+        ("id", "RULE_ID", to_text),
+        ("designId", "DESIGN_ID", to_text),
+        ("materialId", "MATERIAL_ID", to_text),
+        ("treatmentId", "TREATMENT_ID", to_text),
+        ("addMin", "ADD_MIN", to_float),
+        ("addMax", "ADD_MAX", to_float),
+        ("incrementRule", "INCREMENT_RULE", to_text),
+        ("notes", "NOTES", to_text)
+    ]),
+    "Availability": ("availability", [
+        ("id", "AVAIL_ID", to_text),
+        ("designId", "DESIGN_ID", to_text),
+        ("materialId", "MATERIAL_ID", to_text),
+        ("treatmentId", "TREATMENT_ID", to_text),
+        ("available", "IS_AVAILABLE", to_flag),
+        ("rimlessAllowed", "RIMLESS_ALLOWED", to_flag),
+        ("colorLimits", "COLOR_LIMITS", to_text),
+        ("minSegmentHeight", "MIN_SEG_HEIGHT_MM", to_int),
+        ("substitution", "SUBSTITUTION", to_text),
+        ("leadTimeWeeks", "LEAD_TIME_WEEKS", to_float),
+        ("notes", "NOTES", to_text)
+    ]),
+    "Tints": ("tints", [
+        ("id", "TINT_ID", to_text),
+        ("category", "CATEGORY", to_text),
+        ("colorName", "COLOR_NAME", to_text),
+        ("style", "STYLE", to_text),
+        ("percentageMin", "PCT_MIN", to_float),
+        ("percentageMax", "PCT_MAX", to_float),
+        ("fixedPercentage", "FIXED_PCT", to_float),
+        ("availableIn", "AVAILABLE_IN", to_list),
+        ("notes", "NOTES", to_text),
+        ("labOutput", "OUTPUT_TINT", to_text)
+    ]),
+    "InstructionCodes": ("instructionCodes", [
+        ("code", "CODE", to_text),
+        ("label", "LABEL", to_text),
+        ("valueType", "VALUE_TYPE", to_text),
+        ("allowedValues", "ALLOWED_VALUES", to_text),
+        ("outputTemplate", "OUTPUT_TEMPLATE", to_text)
+    ]),
+    "TintCompatibility": ("tintCompatibility", [
+        ("designId", "DESIGN_ID", to_text),
+        ("materialId", "MATERIAL_ID", to_text),
+        ("treatmentId", "TREATMENT_ID", to_text),
+        ("tintId", "TINT_ID", to_text),
+        ("allowed", "ALLOWED", to_flag),
+        ("styleRequired", "STYLE_REQUIRED", to_text),
+        ("percentageMin", "PCT_MIN", to_float),
+        ("percentageMax", "PCT_MAX", to_float),
+        ("notes", "NOTES", to_text)
+    ])
+}
+
+def get_field(record, field):
+    """Read a dotted field name from a (possibly nested) record."""
+    for part in field.split("."):
+        if record is None:
+            return None
+        record = record.get(part)
+    return record
+
+def set_field(record, field, value):
+    """Set a dotted field on a record, creating nested dicts as needed."""
+    *parents, leaf = field.split(".")
+    for parent in parents:
+        if not isinstance(record.get(parent), dict):
+            record[parent] = {}
+        record = record[parent]
+    record[leaf] = value
+
+def unset_field(record, field):
+    """Remove a dotted field from a record if present."""
+    *parents, leaf = field.split(".")
+    for parent in parents:
+        record = record.get(parent)
+        if not isinstance(record, dict):
+            return
+    record.pop(leaf, None)
+
+def normalize_cell(value):
+    """Apply the same missing-value and integral-float rules as pandas."""
+    if isinstance(value, str) and value in DEFAULT_NA_VALUES:
+        return None
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+def trim_row(row):
+    """Return a row's normalized values without the trailing empty cells.
+
+    How many empty cells openpyxl pads a row with depends on how the
+    workbook was last saved, so padding must not count as content.
+    """
+    values = [normalize_cell(value) for value in row]
+    while values and values[-1] is None:
+        values.pop()
+    return tuple(values)
+
+def iter_sheet_records(rows, spec):
+    """Convert header + data rows into catalog records using a sheet spec.
+
+    Fully blank rows are skipped, as they are when the sheet is hashed.
+    """
+    rows = iter(rows)
+    header = list(next(rows, ()))
+    positions = {name: position for position, name in enumerate(header)}
+    missing = [column for _, column, _ in spec if column not in positions]
+    if missing:
+        raise ValueError(f"missing columns: {missing}")
+
+    for row in rows:
+        row = trim_row(row)
+        if not row:
+            continue
+        record = {}
+        for field, column, convert in spec:
+            position = positions[column]
+            value = row[position] if position < len(row) else None
+            target = record
+            *parents, leaf = field.split(".")
+            for parent in parents:
+                target = target.setdefault(parent, {})
+            target[leaf] = convert(value)
+        yield record
+
+def hash_sheet(rows, blank_rows=None):
+    """Return a content hash over a sheet's cell values.
+
+    Trailing empty cells and fully blank rows are ignored, so re-saving a
+    workbook without changing its content keeps every sheet's hash. The
+    Excel row numbers of the blank rows are appended to ``blank_rows``.
+    """
+    digest = hashlib.sha256()
+    for position, row in enumerate(rows):
+        row = trim_row(row)
+        if not row:
+            if blank_rows is not None:
+                blank_rows.append(position + 1)
+            continue
+        digest.update(repr(row).encode("utf-8"))
+        digest.update(b"\n")
+    return digest.hexdigest()
+
+def hash_file(path):
+    """Return the sha256 of a file's bytes."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def cache_dir_for(output_path):
+    """Return the directory holding per-sheet build state for an output."""
+    output_path = Path(output_path)
+    return output_path.with_name(output_path.name + ".cache")
+
+def load_manifest(cache_dir):
+    """Load the build manifest, or an empty one when missing or stale."""
+    try:
+        with open(cache_dir / "manifest.json", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {"sheets": {}}
+    if manifest.get("converterVersion") != CONVERTER_VERSION:
+        return {"sheets": {}}
+    return manifest
+
+def write_json(path, data, indent=2):
+    """Write JSON atomically via a temporary sibling file."""
+    path = Path(path)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=indent, ensure_ascii=False)
+    tmp_path.replace(path)
+
+def build_catalog(workbook_path, output_path, incremental=True, compact_tints=False, metrics=None):
+    """Build catalog JSON from the workbook and return a build summary.
+
+    Per-sheet content hashes and converted sections are cached in
+    ``<output>.cache/``. In incremental mode an unchanged workbook file is
+    a no-op, and otherwise only sheets whose hash changed are converted;
+    the rest are reused from the cache. Stage timings are recorded into
+    ``metrics`` when given.
+    """
+    from openpyxl import load_workbook
+    # validate_catalog reads SHEET_SPECS from this module
+    from validate_catalog import validate_catalog, violation_records
+
+    metrics = metrics or BuildMetrics("build_catalog")
+    workbook_path = Path(workbook_path)
+    output_path = Path(output_path)
+    cache_dir = cache_dir_for(output_path)
+    manifest = load_manifest(cache_dir) if incremental else {"sheets": {}}
+    workbook_hash = hash_file(workbook_path)
+
+    if (incremental and output_path.exists()
+            and manifest.get("workbookHash") == workbook_hash
+            and manifest.get("compactTints") == compact_tints):
+        return {"changed": [], "reused": list(manifest["sheets"]), "output": str(output_path)}
+
+    (cache_dir / "sections").mkdir(parents=True, exist_ok=True)
+    workbook = load_workbook(workbook_path, read_only=True, data_only=True)
+    try:
+        missing_tabs = [name for name in SHEET_SPECS if name not in workbook.sheetnames]
+        if missing_tabs:
+            raise ValueError(f"workbook is missing tabs: {missing_tabs}")
+
+        sections = {}
+        sheet_hashes = {}
+        blank_rows = {}
+        changed = []
+        reused = []
+        for sheet_name, (section, spec) in SHEET_SPECS.items():
+            with metrics.stage("convert_sheet", sheet=sheet_name) as stage:
+                # Read once: the same rows are hashed and, if changed, converted
+                rows = list(iter_sheet_rows(workbook[sheet_name]))
+                sheet_blank_rows = []
+                sheet_hash = hash_sheet(rows, sheet_blank_rows)
+                sheet_hashes[sheet_name] = sheet_hash
+                if sheet_blank_rows:
+                    blank_rows[sheet_name] = sheet_blank_rows
+                section_path = cache_dir / "sections" / f"{section}.json"
+
+                cached = manifest["sheets"].get(sheet_name)
+                if cached and cached["hash"] == sheet_hash and section_path.exists():
+                    with open(section_path, encoding="utf-8") as f:
+                        sections[section] = json.load(f)
+                    reused.append(sheet_name)
+                else:
+                    sections[section] = list(iter_sheet_records(rows, spec))
+                    write_json(section_path, sections[section], indent=None)
+                    changed.append(sheet_name)
+                stage["rows"] = len(sections[section])
+    finally:
+        workbook.close()
+
+    manifest_sheets = {
+        name: {"hash": sheet_hash, "section": SHEET_SPECS[name][0], "blankRows": blank_rows.get(name, [])}
+        for name, sheet_hash in sheet_hashes.items()
+    }
+    # Blank rows are not content, but they move the rows violations point at
+    moved = any(manifest["sheets"].get(name, {}).get("blankRows", []) != sheet["blankRows"]
+                for name, sheet in manifest_sheets.items())
+    if (not changed and not moved and output_path.exists()
+            and manifest.get("compactTints") == compact_tints):
+        # Re-saved but content-identical workbook: keep the existing build
+        write_json(cache_dir / "manifest.json", {**manifest, "workbookHash": workbook_hash})
+        return {"changed": [], "reused": reused, "output": str(output_path)}
+
+    now = datetime.now()
+    # The content suffix keeps ids unique for builds within the same second,
+    # which snapshot and resolver caches keyed on buildId rely on
+    content_id = hashlib.sha256(json.dumps(
+        [sheet_hashes, blank_rows, compact_tints], sort_keys=True).encode("utf-8")).hexdigest()[:8]
+    catalog = {
+        "metadata": {
+            "version": CATALOG_VERSION,
+            "lastUpdated": now.isoformat(),
+            "sourceFile": workbook_path.name,
+            "validationStatus": "valid",
+            "buildId": f"build-{now.strftime('%Y%m%d-%H%M%S')}-{content_id}",
+            "sheetHashes": sheet_hashes,
+            # Excel rows of skipped blank rows, so validation can report source rows
+            "blankRows": blank_rows,
+            "tabCount": len(workbook.sheetnames),
+            "totalRecords": sum(len(records) for records in sections.values())
+        },
+        **sections,
+        "indexes": {}
+    }
+    with metrics.stage("validate", rows=catalog["metadata"]["totalRecords"]):
+        violations = violation_records(validate_catalog(catalog))
+    catalog["metadata"]["validationStatus"] = "invalid" if violations else "valid"
+    write_json(cache_dir / "validation.json", violations)
+
+    with metrics.stage("compile"):
+        compile_catalog(catalog, compact_tints=compact_tints)
+    with metrics.stage("write_catalog"):
+        write_json(output_path, catalog)
+
+    write_json(cache_dir / "manifest.json", {
+        "converterVersion": CONVERTER_VERSION,
+        "workbookHash": workbook_hash,
+        "compactTints": compact_tints,
+        "buildId": catalog["metadata"]["buildId"],
+        "sheets": manifest_sheets
+    })
+    return {"changed": changed, "reused": reused, "output": str(output_path),
+            "violations": violations}
+
+def to_cell(value, convert):
+    """Invert a spec converter so a catalog value can be written to a sheet."""
+    if value is None:
+        return None
+    if convert is to_flag:
+        return "Y" if value else "N"
+    if convert is to_list:
+        return ";".join(value)
+    return value
+
+def write_catalog_workbook(catalog, path):
+    """Write catalog sections back out as a normalized workbook.
+
+    This is the inverse of SHEET_SPECS and is used to turn generated
+    fixtures into workbooks for testing and benchmarking the ingestion path.
+    """
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    readme = workbook.create_sheet("README")
+    readme.append(["README"])
+    readme.append([f"Generated from catalog build {catalog['metadata'].get('buildId')}"])
+    for sheet_name, (section, spec) in SHEET_SPECS.items():
+        worksheet = workbook.create_sheet(sheet_name)
+        worksheet.append([column for _, column, _ in spec])
+        for record in catalog.get(section, []):
+            worksheet.append([to_cell(get_field(record, field), convert) for field, _, convert in spec])
+    workbook.save(path)
+
+def parse_args(argv=None):
+    """Parse command line options."""
+    parser = argparse.ArgumentParser(description="Build catalog JSON from the workbook")
+    parser.add_argument("--input", default="data/Optical_Normalized_Catalog_FULL_v2.xlsx",
+                        help="Path to the Excel workbook")
+    parser.add_argument("--output", default="data/catalog.json",
+                        help="Where to write the catalog JSON")
+    parser.add_argument("--full", action="store_true",
+                        help="Ignore cached sheet hashes and rebuild every section")
+    parser.add_argument("--compact-tints", action="store_true",
+                        help="Store tint compatibility as a packed tintMatrix section")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """Main build function."""
+    args = parse_args(argv)
+    workbook_path = Path(args.input)
+
+    if not workbook_path.exists():
+        print(f"❌ Excel file not found: {workbook_path}")
+        sys.exit(1)
+
+    print(f"🔄 Building catalog from {workbook_path}")
+    try:
+        result = build_catalog(workbook_path, args.output,
+                               incremental=not args.full, compact_tints=args.compact_tints)
+    except Exception as e:
+        print(f"❌ Build failed: {e}")
+        sys.exit(1)
+
+    if not result["changed"]:
+        print("✅ Workbook unchanged; catalog is up to date")
+    print(f"   Rebuilt sheets: {result['changed'] or 'none'}")
+    print(f"   Reused sheets: {result['reused'] or 'none'}")
+    violations = result.get("violations", [])
+    if violations:
+        print(f"⚠️  {len(violations)} validation violations (see {cache_dir_for(args.output) / 'validation.json'})")
+        for violation in violations[:10]:
+            print(f"   {violation['sheet']} row {violation['row']} {violation['column']}: "
+                  f"{violation['message']} ({violation['value']})")
+    print(f"✅ Catalog written to: {result['output']}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Build Metrics
+Per-stage timers and row counts for the catalog build pipeline, with
+optional cProfile and tracemalloc capture, written as a JSON timing
+report and optionally as OpenMetrics text
+"""
+
+import json
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+REPORT_VERSION = 1
+PROFILE_TOP_FUNCTIONS = 25
+METRIC_PREFIX = "catalog_build"
+
+def timing_report_path(output_path):
+    """Return where the timing report for a build output lives.
+
+    ``data/workbook_analysis.json`` -> ``data/workbook_analysis.timings.json``
+    """
+    output_path = Path(output_path)
+    return output_path.with_name(f"{output_path.stem}.timings.json")
+
+class BuildMetrics:
+    """Collects timed stages for one pipeline run.
+
+    Stages are recorded in the order they finish; nested stages are
+    recorded too, with the parent's time covering its children. With
+    ``trace_memory`` each stage also records its peak traced allocation,
+    and with ``profile`` the whole run is captured with cProfile.
+    """
+
+    def __init__(self, pipeline, profile=False, trace_memory=False):
+        self.pipeline = pipeline
+        self.profile = profile
+        self.trace_memory = trace_memory
+        self.stages = []
+        self.started_at = None
+        self.total_seconds = None
+        self.profiler = None
+        self.profile_rows = []
+        self._start = None
+        self._open = []
+        self._tracing_started = False
+
+    def start(self):
+        """Start the run clock and any requested profilers."""
+        self.started_at = datetime.now().isoformat()
+        self._start = time.perf_counter()
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._tracing_started = True
+        if self.profile:
+            import cProfile
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+        return self
+
+    def finish(self):
+        """Stop the run clock and profilers; returns the report."""
+        if self._start is None:
+            self.start()
+        self.total_seconds = time.perf_counter() - self._start
+        if self.profiler is not None:
+            self.profiler.disable()
+            self.profile_rows = profile_summary(self.profiler)
+        if self._tracing_started:
+            tracemalloc.stop()
+            self._tracing_started = False
+        return self.report()
+
+    @contextmanager
+    def stage(self, name, rows=None, **labels):
+        """Time a block as one stage.
+
+        Yields the stage record, so rows counted inside the block can be
+        set with ``record["rows"] = n``.
+        """
+        record = {"stage": name, "labels": labels, "seconds": 0.0, "cpuSeconds": 0.0, "rows": rows}
+        tracing = self.trace_memory and tracemalloc.is_tracing()
+        if tracing:
+            record["peakAllocMb"] = 0.0
+            self._fold_peak()
+            tracemalloc.reset_peak()
+        self._open.append(record)
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        try:
+            yield record
+        finally:
+            record["seconds"] = time.perf_counter() - wall
+            record["cpuSeconds"] = time.process_time() - cpu
+            if tracing:
+                self._fold_peak()
+            self._open.pop()
+            if tracing and self._open and "peakAllocMb" in self._open[-1]:
+                parent = self._open[-1]
+                parent["peakAllocMb"] = max(parent["peakAllocMb"], record["peakAllocMb"])
+            self.stages.append(record)
+
+    def _fold_peak(self):
+        """Fold the allocation peak since the last reset into the innermost open stage."""
+        if not self._open or "peakAllocMb" not in self._open[-1]:
+            return
+        peak_mb = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+        self._open[-1]["peakAllocMb"] = max(self._open[-1]["peakAllocMb"], peak_mb)
+        tracemalloc.reset_peak()
+
+    def add_stages(self, stages):
+        """Merge stage records measured elsewhere, e.g. in a worker process."""
+        self.stages.extend(stages)
+
+    def report(self):
+        """Return the machine-readable timing report."""
+        report = {
+            "version": REPORT_VERSION,
+            "pipeline": self.pipeline,
+            "startedAt": self.started_at,
+            "totalSeconds": self.total_seconds,
+            "stages": self.stages
+        }
+        if self.profile_rows:
+            report["profile"] = self.profile_rows
+        return report
+
+def profile_summary(profiler, limit=PROFILE_TOP_FUNCTIONS):
+    """Return the functions with the highest cumulative time as plain dicts."""
+    import pstats
+    stats = pstats.Stats(profiler)
+    rows = []
+    for (filename, line, function), (_, calls, total, cumulative, _) in stats.stats.items():
+        rows.append({
+            "function": f"{Path(filename).name}:{line}({function})",
+            "calls": calls,
+            "totalSeconds": total,
+            "cumulativeSeconds": cumulative
+        })
+    rows.sort(key=lambda row: row["cumulativeSeconds"], reverse=True)
+    return rows[:limit]
+
+def escape_label(value):
+    """Escape a label value for the OpenMetrics text format."""
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def to_openmetrics(report):
+    """Render a timing report in the OpenMetrics text exposition format.
+
+    Stages that repeat with the same labels are summed into one sample.
+    """
+    families = {
+        "stage_seconds": ("gauge", "Wall time spent in a build stage", "seconds"),
+        "stage_cpu_seconds": ("gauge", "CPU time spent in a build stage", "cpuSeconds"),
+        "stage_rows": ("gauge", "Rows processed by a build stage", "rows"),
+        "stage_peak_alloc_megabytes": ("gauge", "Peak traced allocation during a build stage", "peakAllocMb")
+    }
+    samples = {}
+    for record in report["stages"]:
+        labels = {"pipeline": report["pipeline"], "stage": record["stage"], **record["labels"]}
+        label_text = ",".join(f'{name}="{escape_label(value)}"' for name, value in labels.items())
+        for family, (_, _, field) in families.items():
+            if record.get(field) is not None:
+                key = (family, label_text)
+                samples[key] = samples.get(key, 0) + record[field]
+
+    lines = []
+    for family, (kind, help_text, _) in families.items():
+        name = f"{METRIC_PREFIX}_{family}"
+        family_samples = [(labels, value) for (sample_family, labels), value in samples.items()
+                          if sample_family == family]
+        if not family_samples:
+            continue
+        lines.append(f"# TYPE {name} {kind}")
+        lines.append(f"# HELP {name} {help_text}")
+        lines.extend(f"{name}{{{labels}}} {value:g}" for labels, value in family_samples)
+    if report.get("totalSeconds") is not None:
+        name = f"{METRIC_PREFIX}_total_seconds"
+        lines.append(f"# TYPE {name} gauge")
+        lines.append(f"# HELP {name} Wall time of the whole build")
+        lines.append(f'{name}{{pipeline="{escape_label(report["pipeline"])}"}} {report["totalSeconds"]:g}')
+    lines.append("# EOF")
+    return "\n".join(lines) + "\n"
+
+def write_report(metrics, output_path, openmetrics_path=None):
+    """Finish ``metrics`` and write its JSON report (and optional OpenMetrics text)."""
+    report = metrics.finish()
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    if openmetrics_path:
+        with open(openmetrics_path, "w", encoding="utf-8") as f:
+            f.write(to_openmetrics(report))
+    return report
+
+def add_metrics_args(parser):
+    """Add the shared instrumentation options to a command line parser."""
+    group = parser.add_argument_group("instrumentation")
+    group.add_argument("--timings", default=None,
+                       help="Where to write the JSON timing report (default: next to the output)")
+    group.add_argument("--openmetrics", default=None,
+                       help="Also write the timings as OpenMetrics text to this path")
+    group.add_argument("--profile", action="store_true",
+                       help="Capture a cProfile summary in the timing report")
+    group.add_argument("--trace-memory", action="store_true",
+                       help="Record each stage's peak traced allocation")
+    return group
+
+def metrics_from_args(pipeline, args):
+    """Return a started BuildMetrics configured from parsed command line options."""
+    return BuildMetrics(pipeline, profile=args.profile, trace_memory=args.trace_memory).start()
+
+def print_summary(report, count=5):
+    """Print the slowest stages of a finished report."""
+    stages = sorted(report["stages"], key=lambda record: record["seconds"], reverse=True)[:count]
+    print(f"⏱️  Total: {report['totalSeconds']:.3f}s")
+    for record in stages:
+        labels = " ".join(f"{name}={value}" for name, value in record["labels"].items())
+        rows = f" | {record['rows']} rows" if record["rows"] is not None else ""
+        print(f"   {record['stage']} {labels}".rstrip() + f": {record['seconds']:.3f}s{rows}")
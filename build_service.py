@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+Catalog Build Service
+Builds many lab/region workbooks at once (analyze -> validate -> compile
+-> wizard views). Jobs are queued with asyncio and run over a bounded
+process pool, and identical workbooks are built only once
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import shutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from build_catalog import build_catalog, cache_dir_for, hash_file, load_manifest, write_json
+from build_metrics import BuildMetrics
+from wizard_views import load_views, materialize_views
+
+WORKBOOK_SUFFIXES = {".xlsx", ".xlsm"}
+CATALOG_FILE = "catalog.json"
+ANALYSIS_FILE = "workbook_analysis.json"
+VIEWS_FILE = "wizard_views.json"
+TIMINGS_FILE = "build.timings.json"
+SUMMARY_FILE = "build_summary.json"
+
+def read_manifest(path):
+    """Return (name, workbook path) pairs listed in a manifest file.
+
+    A ``.json`` manifest is a list of paths or of {"name", "workbook"}
+    objects (optionally under a "catalogs" key); any other file lists one
+    workbook path per line, with ``#`` comments. Relative paths are
+    resolved against the manifest's directory.
+    """
+    path = Path(path)
+    if path.suffix == ".json":
+        with open(path, encoding="utf-8") as f:
+            entries = json.load(f)
+        if isinstance(entries, dict):
+            entries = entries.get("catalogs", [])
+    else:
+        lines = (line.split("#", 1)[0].strip() for line in path.read_text(encoding="utf-8").splitlines())
+        entries = [line for line in lines if line]
+
+    pairs = []
+    for entry in entries:
+        if isinstance(entry, str):
+            entry = {"workbook": entry}
+        workbook = path.parent / entry["workbook"]
+        pairs.append((entry.get("name") or workbook.stem, workbook))
+    return pairs
+
+def discover_workbooks(inputs):
+    """Return (name, workbook path) pairs from workbook files, directories and manifests.
+
+    Catalog names must be unique because each one gets its own output
+    directory; give clashing workbooks explicit names in a manifest.
+    """
+    pairs = []
+    for item in inputs:
+        item = Path(item)
+        if item.is_dir():
+            pairs.extend(
+                (path.stem, path) for path in sorted(item.iterdir())
+                # ~$ files are Excel's lock files for open workbooks
+                if path.suffix.lower() in WORKBOOK_SUFFIXES and not path.name.startswith("~$")
+            )
+        elif item.suffix.lower() in WORKBOOK_SUFFIXES:
+            pairs.append((item.stem, item))
+        elif item.exists():
+            pairs.extend(read_manifest(item))
+        else:
+            raise ValueError(f"input not found: {item}")
+
+    seen = {}
+    for name, workbook in pairs:
+        if name in seen and seen[name] != workbook:
+            raise ValueError(f"catalog name {name!r} used by both {seen[name]} and {workbook}")
+        seen[name] = workbook
+    return list(seen.items())
+
+def is_up_to_date(workbook_hash, output_dir, compact_tints, analyze=True):
+    """Return whether a catalog directory already holds this workbook's build."""
+    catalog_path = output_dir / CATALOG_FILE
+    if not catalog_path.exists() or not (output_dir / VIEWS_FILE).exists():
+        return False
+    if analyze and not (output_dir / ANALYSIS_FILE).exists():
+        return False
+    manifest = load_manifest(cache_dir_for(catalog_path))
+    return manifest.get("workbookHash") == workbook_hash and manifest.get("compactTints") == compact_tints
+
+def run_build_job(workbook_path, output_dir, incremental=True, compact_tints=False, analyze=True):
+    """Analyze, validate, compile and materialize views for one workbook; runs in a worker process.
+
+    Every file is written to a temporary sibling and renamed into place,
+    so readers never see a half-written catalog or analysis.
+    """
+    from analyze_excel import analyze_workbook, save_analysis
+
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    metrics = BuildMetrics("build_service").start()
+    if analyze:
+        # analyze_workbook reports progress on stdout; keep worker output quiet
+        with contextlib.redirect_stdout(io.StringIO()):
+            analysis = analyze_workbook(workbook_path, streaming=True, metrics=metrics)
+            if analysis is None:
+                raise ValueError(f"could not analyze {workbook_path}")
+            tmp_path = output_dir / (ANALYSIS_FILE + ".tmp")
+            save_analysis(analysis, tmp_path, metrics)
+        tmp_path.replace(output_dir / ANALYSIS_FILE)
+
+    result = build_catalog(workbook_path, output_dir / CATALOG_FILE, incremental=incremental,
+                           compact_tints=compact_tints, metrics=metrics)
+    views_path = output_dir / VIEWS_FILE
+    if result["changed"] or not views_path.exists():
+        with metrics.stage("load_catalog"):
+            with open(output_dir / CATALOG_FILE, encoding="utf-8") as f:
+                catalog = json.load(f)
+        previous = load_views(views_path) if incremental else None
+        document, _ = materialize_views(catalog, previous, metrics)
+        write_json(views_path, document, indent=None)
+    report = metrics.finish()
+    write_json(output_dir / TIMINGS_FILE, report)
+    return {"changed": result["changed"], "violations": len(result.get("violations", [])),
+            "seconds": report["totalSeconds"]}
+
+def copy_atomic(source, target):
+    """Copy a file so ``target`` is replaced in one step."""
+    tmp_path = target.with_name(target.name + ".tmp")
+    shutil.copyfile(source, tmp_path)
+    tmp_path.replace(target)
+
+def copy_build(source_dir, target_dir):
+    """Give a duplicate workbook the outputs built for its identical twin."""
+    target_dir.mkdir(parents=True, exist_ok=True)
+    for name in (CATALOG_FILE, ANALYSIS_FILE, VIEWS_FILE):
+        if (source_dir / name).exists():
+            copy_atomic(source_dir / name, target_dir / name)
+
+async def hash_workbooks(pairs):
+    """Hash every workbook concurrently, off the event loop.
+
+    A workbook that cannot be read maps to the exception instead of a hash.
+    """
+    hashes = await asyncio.gather(
+        *(asyncio.to_thread(hash_file, workbook) for _, workbook in pairs), return_exceptions=True
+    )
+    return dict(zip((name for name, _ in pairs), hashes))
+
+async def build_all(pairs, output_root, workers=None, incremental=True, compact_tints=False,
+                    analyze=True, on_result=None):
+    """Build every (name, workbook) pair and return a result per catalog name.
+
+    Workbooks with identical content are grouped and built once; the other
+    names in the group receive copies of the outputs. Groups are fed
+    through an asyncio queue to ``workers`` consumers, each of which keeps
+    one job running in the shared process pool, so at most ``workers``
+    builds are in flight. A workbook that cannot be read or a failing job
+    is recorded and does not stop the others.
+    """
+    output_root = Path(output_root)
+    workers = workers or os.cpu_count() or 1
+    hashes = await hash_workbooks(pairs)
+    groups = {}
+    results = {}
+    for name, workbook in pairs:
+        content_hash = hashes[name]
+        if isinstance(content_hash, Exception):
+            results[name] = {"status": "failed", "error": f"{type(content_hash).__name__}: {content_hash}",
+                             "workbook": str(workbook), "hash": None, "elapsed": 0.0}
+            if on_result:
+                on_result(name, results[name])
+            continue
+        groups.setdefault(content_hash, []).append((name, workbook))
+
+    queue = asyncio.Queue()
+    for content_hash, members in groups.items():
+        queue.put_nowait((content_hash, members))
+    loop = asyncio.get_running_loop()
+
+    async def consume(executor):
+        while True:
+            try:
+                content_hash, members = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            name, workbook = members[0]
+            output_dir = output_root / name
+            start = time.perf_counter()
+            if incremental and is_up_to_date(content_hash, output_dir, compact_tints, analyze):
+                result = {"status": "up-to-date", "changed": []}
+            else:
+                try:
+                    result = await loop.run_in_executor(
+                        executor, run_build_job, workbook, output_dir, incremental, compact_tints, analyze)
+                    result["status"] = "built"
+                except Exception as e:
+                    result = {"status": "failed", "error": f"{type(e).__name__}: {e}"}
+            result.update(workbook=str(workbook), hash=content_hash, elapsed=time.perf_counter() - start)
+            results[name] = result
+            if on_result:
+                on_result(name, result)
+
+            for duplicate, duplicate_workbook in members[1:]:
+                duplicate_result = dict(result, workbook=str(duplicate_workbook), duplicateOf=name)
+                if result["status"] != "failed":
+                    await asyncio.to_thread(copy_build, output_dir, output_root / duplicate)
+                    duplicate_result["status"] = "copied"
+                results[duplicate] = duplicate_result
+                if on_result:
+                    on_result(duplicate, duplicate_result)
+
+    if groups:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            await asyncio.gather(*(consume(executor) for _ in range(min(workers, len(groups)))))
+    return {name: results[name] for name, _ in pairs}
+
+def print_result(name, result):
+    """Print one finished job."""
+    status = result["status"]
+    if status == "failed":
+        print(f"   ❌ {name}: {result['error']}")
+    elif status == "copied":
+        print(f"   📦 {name}: identical to {result['duplicateOf']}, copied")
+    elif status == "up-to-date":
+        print(f"   ✅ {name}: up to date")
+    else:
+        warning = f" | ⚠️  {result['violations']} violations" if result.get("violations") else ""
+        print(f"   ✅ {name}: built in {result['elapsed']:.1f}s{warning}")
+
+def parse_args(argv=None):
+    """Parse command line options."""
+    parser = argparse.ArgumentParser(description="Build many catalog workbooks in parallel")
+    parser.add_argument("inputs", nargs="+",
+                        help="Workbooks, directories of workbooks, or manifest files")
+    parser.add_argument("--output-dir", default="data/catalogs",
+                        help="Each catalog is written to <output-dir>/<name>/")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Concurrent build jobs (default: CPU count)")
+    parser.add_argument("--full", action="store_true",
+                        help="Ignore cached sheet hashes and rebuild everything")
+    parser.add_argument("--compact-tints", action="store_true",
+                        help="Store tint compatibility as a packed tintMatrix section")
+    parser.add_argument("--skip-analysis", action="store_true",
+                        help="Only validate and compile; do not write workbook_analysis.json")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """Build every requested catalog."""
+    args = parse_args(argv)
+    try:
+        pairs = discover_workbooks(args.inputs)
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    if not pairs:
+        print("❌ No workbooks found")
+        sys.exit(1)
+
+    output_root = Path(args.output_dir)
+    print(f"🔄 Building {len(pairs)} catalogs into {output_root}")
+    start = time.perf_counter()
+    results = asyncio.run(build_all(
+        pairs, output_root, workers=args.workers, incremental=not args.full,
+        compact_tints=args.compact_tints, analyze=not args.skip_analysis, on_result=print_result
+    ))
+    elapsed = time.perf_counter() - start
+
+    output_root.mkdir(parents=True, exist_ok=True)
+    write_json(output_root / SUMMARY_FILE, {"elapsed": elapsed, "catalogs": results})
+    failed = [name for name, result in results.items() if result["status"] == "failed"]
+    print(f"📊 {len(results) - len(failed)}/{len(results)} catalogs ready in {elapsed:.1f}s")
+    print(f"✅ Summary saved to: {output_root / SUMMARY_FILE}")
+    if failed:
+        print(f"❌ Failed: {', '.join(failed)}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Catalog Access
+Lightweight entry point for loading a compiled catalog. Keeps a pickled
+snapshot next to the catalog, keyed on metadata.buildId, and never
+imports pandas or numpy on the common path
+"""
+
+import gc
+import json
+import os
+import pickle
+import re
+import sys
+import time
+from pathlib import Path
+
+from catalog_compiler import compile_catalog
+
+SNAPSHOT_VERSION = 1
+
+# Every catalog writer puts metadata first, so the build id sits near the top
+BUILD_ID_PATTERN = re.compile(rb'"buildId"\s*:\s*"((?:[^"\\]|\\.)*)"')
+BUILD_ID_SCAN_BYTES = 64 * 1024
+
+def snapshot_path_for(catalog_path):
+    """Return where the snapshot for a catalog lives."""
+    catalog_path = Path(catalog_path)
+    return catalog_path.with_name(catalog_path.name + ".cache") / "snapshot.pickle"
+
+def peek_build_id(catalog_path):
+    """Return a JSON catalog's buildId without parsing the whole file.
+
+    Returns None when the id is not in the first BUILD_ID_SCAN_BYTES.
+    """
+    with open(catalog_path, "rb") as f:
+        head = f.read(BUILD_ID_SCAN_BYTES)
+    match = BUILD_ID_PATTERN.search(head)
+    if match is None:
+        return None
+    return json.loads(b'"' + match.group(1) + b'"')
+
+def read_snapshot(snapshot_path, build_id):
+    """Return the snapshotted catalog if it was taken from ``build_id``."""
+    try:
+        with open(snapshot_path, "rb") as f:
+            # The header is its own pickle so a stale snapshot is rejected
+            # without unpickling the catalog behind it
+            header = pickle.load(f)
+            if header != {"version": SNAPSHOT_VERSION, "buildId": build_id}:
+                return None
+            # Unpickling allocates only acyclic containers; collector passes
+            # over them while they are built are pure overhead
+            gc_was_enabled = gc.isenabled()
+            gc.disable()
+            try:
+                return pickle.load(f)
+            finally:
+                if gc_was_enabled:
+                    gc.enable()
+    except (OSError, EOFError, pickle.UnpicklingError):
+        return None
+
+def write_snapshot(snapshot_path, catalog):
+    """Write a snapshot atomically via a temporary sibling file.
+
+    The temporary name is per process, so pool workers that all miss the
+    snapshot at start-up never write into each other's file.
+    """
+    snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = snapshot_path.with_name(f"{snapshot_path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "wb") as f:
+        pickle.dump({"version": SNAPSHOT_VERSION, "buildId": catalog["metadata"]["buildId"]},
+                    f, protocol=pickle.HIGHEST_PROTOCOL)
+        pickle.dump(catalog, f, protocol=pickle.HIGHEST_PROTOCOL)
+    tmp_path.replace(snapshot_path)
+
+def parse_catalog(catalog_path):
+    """Load a catalog from JSON or binary (.ocat), compiling missing indexes."""
+    catalog_path = Path(catalog_path)
+    if catalog_path.suffix == ".ocat":
+        from catalog_binary import read_catalog_binary
+        catalog = read_catalog_binary(catalog_path)
+    else:
+        with open(catalog_path, encoding="utf-8") as f:
+            catalog = json.load(f)
+    if not catalog.get("indexes"):
+        # Only the indexes are missing: a tint matrix the catalog already has is kept
+        compile_catalog(catalog, compact_tints="tintMatrix" in catalog)
+    return catalog
+
+def load_catalog(catalog_path, use_snapshot=True):
+    """Return a compiled catalog, from its snapshot when the buildId matches.
+
+    A snapshot is only trusted while the catalog's metadata.buildId is
+    unchanged, so every rebuild must issue a new build id. Catalogs without
+    one (and binary catalogs, which are already fast to open) are always
+    parsed. Snapshots are pickles written by this module; never point it
+    at files from an untrusted source.
+    """
+    catalog_path = Path(catalog_path)
+    if not use_snapshot or catalog_path.suffix == ".ocat":
+        return parse_catalog(catalog_path)
+
+    build_id = peek_build_id(catalog_path)
+    snapshot_path = snapshot_path_for(catalog_path)
+    if build_id is not None:
+        catalog = read_snapshot(snapshot_path, build_id)
+        if catalog is not None:
+            return catalog
+
+    catalog = parse_catalog(catalog_path)
+    build_id = catalog.get("metadata", {}).get("buildId")
+    if build_id is not None:
+        try:
+            write_snapshot(snapshot_path, catalog)
+        except OSError:
+            # A read-only data directory only costs the fast path
+            pass
+    return catalog
+
+def parse_args(argv=None):
+    """Parse command line options."""
+    # Only the CLI needs argparse; keep it off the library import path
+    import argparse
+    parser = argparse.ArgumentParser(description="Load a catalog, refreshing its snapshot")
+    parser.add_argument("catalog", nargs="?", default="data/sample_catalog.json",
+                        help="Catalog JSON or binary (.ocat) file")
+    parser.add_argument("--no-snapshot", action="store_true",
+                        help="Parse the catalog without reading or writing a snapshot")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """Load a catalog and report how long it took."""
+    args = parse_args(argv)
+    catalog_path = Path(args.catalog)
+    if not catalog_path.exists():
+        print(f"❌ Catalog not found: {catalog_path}")
+        sys.exit(1)
+
+    start = time.perf_counter()
+    catalog = load_catalog(catalog_path, use_snapshot=not args.no_snapshot)
+    elapsed = time.perf_counter() - start
+    metadata = catalog.get("metadata", {})
+    print(f"✅ Loaded {catalog_path} (build {metadata.get('buildId')}) in {elapsed * 1000:.1f} ms")
+
+if __name__ == "__main__":
+    main()
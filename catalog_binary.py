@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+"""
+Binary Catalog Format
+Writes catalogs as a sectioned binary file (table of contents, columnar
+arrays, interned string pool) that readers memory-map and decode lazily
+"""
+
+import json
+import mmap
+import struct
+import sys
+from array import array
+
+MAGIC = b"OCAT"
+FORMAT_VERSION = 1
+
+# magic, format version, TOC length
+HEADER = struct.Struct("<4sHI")
+
+# Column type -> array typecode of the stored values
+COLUMN_TYPECODES = {
+    "int": "q",
+    "float": "d",
+    "bool": "b",
+    "str": "I",
+    "json": "I"
+}
+
+ALIGNMENT = 8
+
+def nested_fields(records, prefix=""):
+    """Return the dotted names of fields that are a non-empty dict in every record having them.
+
+    Only these can be split into columns and rebuilt; a field that is a
+    dict in one row and None (or anything else) in another is stored
+    whole as a JSON column instead.
+    """
+    values = {}
+    for record in records:
+        for key, value in record.items():
+            values.setdefault(key, []).append(value)
+    fields = set()
+    for key, column in values.items():
+        if all(isinstance(value, dict) and value for value in column):
+            name = f"{prefix}{key}"
+            fields.add(name)
+            fields |= nested_fields(column, f"{name}.")
+    return fields
+
+def flatten_record(record, prefix="", nested=None):
+    """Flatten nested dicts into dotted column names, preserving key order.
+
+    With ``nested`` (see nested_fields) only those fields are flattened.
+    """
+    flat = {}
+    for key, value in record.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict) and value and (nested is None or name in nested):
+            flat.update(flatten_record(value, f"{name}.", nested))
+        else:
+            flat[name] = value
+    return flat
+
+def unflatten_record(flat):
+    """Rebuild nested dicts from dotted column names."""
+    record = {}
+    for name, value in flat.items():
+        target = record
+        *parents, leaf = name.split(".")
+        for parent in parents:
+            target = target.setdefault(parent, {})
+        target[leaf] = value
+    return record
+
+def infer_column_type(values):
+    """Pick the narrowest stored type that holds every non-null value."""
+    kinds = {type(value) for value in values if value is not None}
+    if not kinds:
+        return "null"
+    if kinds == {bool}:
+        return "bool"
+    if kinds == {int}:
+        return "int"
+    if kinds <= {int, float}:
+        return "float"
+    if kinds == {str}:
+        return "str"
+    return "json"
+
+def to_little_endian(values):
+    """Return array bytes in little-endian order regardless of host."""
+    if sys.byteorder != "little":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+class StringPool:
+    """Interned strings, stored once and referenced by index."""
+
+    def __init__(self):
+        self.ids = {}
+        self.strings = []
+
+    def intern(self, text):
+        """Return the pool index for ``text``, adding it if new."""
+        index = self.ids.get(text)
+        if index is None:
+            index = self.ids[text] = len(self.strings)
+            self.strings.append(text)
+        return index
+
+    def encode(self):
+        """Return (offsets bytes, utf-8 blob) for the pool."""
+        offsets = array("I", [0])
+        blob = bytearray()
+        for text in self.strings:
+            blob += text.encode("utf-8")
+            offsets.append(len(blob))
+        return to_little_endian(offsets), bytes(blob)
+
+class BlockWriter:
+    """Accumulates aligned data blocks and records their locations."""
+
+    def __init__(self):
+        self.blocks = []
+        self.size = 0
+
+    def add(self, data):
+        """Append a block and return its {offset, length} relative to the data area."""
+        padding = -self.size % ALIGNMENT
+        if padding:
+            self.blocks.append(b"\0" * padding)
+            self.size += padding
+        location = {"offset": self.size, "length": len(data)}
+        self.blocks.append(data)
+        self.size += len(data)
+        return location
+
+def encode_table(rows, blocks, pool):
+    """Encode a list of records as typed columns and return its TOC entry."""
+    nested = nested_fields(rows)
+    flat_rows = [flatten_record(row, nested=nested) for row in rows]
+    names = []
+    for flat in flat_rows:
+        for name in flat:
+            if name not in names:
+                names.append(name)
+
+    columns = []
+    for name in names:
+        values = [flat.get(name) for flat in flat_rows]
+        column_type = infer_column_type(values)
+        column = {"name": name, "type": column_type}
+        if column_type != "null":
+            if column_type == "str":
+                stored = [pool.intern(value) if value is not None else 0 for value in values]
+            elif column_type == "json":
+                stored = [
+                    pool.intern(json.dumps(value, ensure_ascii=False)) if value is not None else 0
+                    for value in values
+                ]
+            else:
+                stored = [value if value is not None else 0 for value in values]
+            column["values"] = blocks.add(to_little_endian(array(COLUMN_TYPECODES[column_type], stored)))
+            if any(value is None for value in values):
+                column["nulls"] = blocks.add(bytes(value is None for value in values))
+        # Rows that lack the key entirely, as opposed to holding None
+        absent = [name not in flat for flat in flat_rows]
+        if any(absent):
+            column["absent"] = blocks.add(bytes(absent))
+        columns.append(column)
+
+    return {"kind": "table", "rows": len(rows), "columns": columns}
+
+def write_catalog_binary(catalog, path):
+    """Write a catalog dict to ``path`` in the binary format.
+
+    List-of-record sections become columnar tables; other sections
+    (metadata, indexes, tintMatrix) are stored as JSON blobs.
+    """
+    blocks = BlockWriter()
+    pool = StringPool()
+    sections = {}
+    for name, value in catalog.items():
+        if isinstance(value, list) and all(isinstance(row, dict) for row in value):
+            sections[name] = encode_table(value, blocks, pool)
+        else:
+            data = json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+            sections[name] = {"kind": "json", **blocks.add(data)}
+
+    offsets, blob = pool.encode()
+    toc = {
+        "sections": sections,
+        "strings": {
+            "count": len(pool.strings),
+            "offsets": blocks.add(offsets),
+            "data": blocks.add(blob)
+        }
+    }
+    toc_bytes = json.dumps(toc, separators=(",", ":")).encode("utf-8")
+    data_start = HEADER.size + len(toc_bytes)
+    data_start += -data_start % ALIGNMENT
+
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, len(toc_bytes)))
+        f.write(toc_bytes)
+        f.write(b"\0" * (data_start - HEADER.size - len(toc_bytes)))
+        for block in blocks.blocks:
+            f.write(block)
+
+class CatalogFile:
+    """Memory-mapped reader that decodes only the sections it is asked for."""
+
+    def __init__(self, path):
+        self.file = open(path, "rb")
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, toc_length = HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a binary catalog")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"unsupported binary catalog version {version}")
+        toc_end = HEADER.size + toc_length
+        self.toc = json.loads(self.map[HEADER.size:toc_end].decode("utf-8"))
+        self.data_start = toc_end + (-toc_end % ALIGNMENT)
+        self.sections = {}
+        self.string_cache = {}
+        strings = self.toc["strings"]
+        self.string_offsets = self.array_at(strings["offsets"], "I")
+        self.string_data = strings["data"]["offset"]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Release the memory map and the underlying file."""
+        self.string_offsets = None
+        self.map.close()
+        self.file.close()
+
+    def section_names(self):
+        """Return the names of every section in the file."""
+        return list(self.toc["sections"])
+
+    def bytes_at(self, location):
+        """Return the raw bytes of a block."""
+        start = self.data_start + location["offset"]
+        return self.map[start:start + location["length"]]
+
+    def array_at(self, location, typecode):
+        """Return a block as a typed array."""
+        values = array(typecode)
+        values.frombytes(self.bytes_at(location))
+        if sys.byteorder != "little":
+            values.byteswap()
+        return values
+
+    def string(self, index):
+        """Return one interned string from the pool."""
+        text = self.string_cache.get(index)
+        if text is None:
+            start = self.data_start + self.string_data + self.string_offsets[index]
+            end = self.data_start + self.string_data + self.string_offsets[index + 1]
+            text = self.string_cache[index] = self.map[start:end].decode("utf-8")
+        return text
+
+    def column(self, section, name):
+        """Return one column of a table section as a list of Python values (None where absent)."""
+        entry = self.toc["sections"][section]
+        if entry["kind"] != "table":
+            raise ValueError(f"section '{section}' is not a table")
+        for column in entry["columns"]:
+            if column["name"] == name:
+                return self.decode_column(column, entry["rows"])
+        raise KeyError(f"section '{section}' has no column '{name}'")
+
+    def numeric_column(self, section, name):
+        """Return a numeric column as a typed array without null handling."""
+        for column in self.toc["sections"][section]["columns"]:
+            if column["name"] == name:
+                if column["type"] not in ("int", "float", "bool"):
+                    raise ValueError(f"column '{name}' is not numeric")
+                return self.array_at(column["values"], COLUMN_TYPECODES[column["type"]])
+        raise KeyError(f"section '{section}' has no column '{name}'")
+
+    def decode_column(self, column, row_count):
+        """Decode a column's stored values, applying its null mask."""
+        column_type = column["type"]
+        if column_type == "null":
+            return [None] * row_count
+        stored = self.array_at(column["values"], COLUMN_TYPECODES[column_type])
+        if column_type == "str":
+            values = [self.string(index) for index in stored]
+        elif column_type == "json":
+            values = [json.loads(self.string(index)) for index in stored]
+        elif column_type == "bool":
+            values = [bool(value) for value in stored]
+        else:
+            values = stored.tolist()
+        if "nulls" in column:
+            nulls = self.bytes_at(column["nulls"])
+            values = [None if is_null else value for value, is_null in zip(values, nulls)]
+        return values
+
+    def section(self, name):
+        """Return a section decoded to its JSON form, caching the result."""
+        if name not in self.sections:
+            entry = self.toc["sections"][name]
+            if entry["kind"] == "json":
+                self.sections[name] = json.loads(self.bytes_at(entry).decode("utf-8"))
+            else:
+                names = [column["name"] for column in entry["columns"]]
+                columns = [self.decode_column(column, entry["rows"]) for column in entry["columns"]]
+                if any("absent" in column for column in entry["columns"]):
+                    absent = [self.bytes_at(column["absent"]) if "absent" in column else None
+                              for column in entry["columns"]]
+                    self.sections[name] = [
+                        unflatten_record({
+                            column_name: value for column_name, value, missing in zip(names, values, absent)
+                            if missing is None or not missing[row]
+                        })
+                        for row, values in enumerate(zip(*columns))
+                    ]
+                else:
+                    self.sections[name] = [
+                        unflatten_record(dict(zip(names, values))) for values in zip(*columns)
+                    ]
+        return self.sections[name]
+
+    def to_catalog(self):
+        """Decode every section into a full catalog dict."""
+        return {name: self.section(name) for name in self.section_names()}
+
+def read_catalog_binary(path):
+    """Load a whole binary catalog into a dict."""
+    with CatalogFile(path) as catalog_file:
+        return catalog_file.to_catalog()
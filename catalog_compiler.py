@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Catalog Compiler
+Precomputes lookup indexes for a catalog so consumers can answer
+compatibility questions with a single hash lookup instead of a scan
+"""
+
+import re
+
+# Composite keys join ids with a character that never appears in them
+KEY_SEPARATOR = "|"
+
+# Positional indexes and the catalog section their positions point into
+POSITIONAL_INDEXES = {
+    "availability": "availability",
+    "addPowerRules": "addPowerRules",
+    "framesBySku": "frames"
+}
+
+# Fields that identify a record within each catalog section
+SECTION_KEYS = {
+    "materials": ["id"],
+    "treatments": ["id"],
+    "designs": ["id"],
+    "frames": ["sku"],
+    "addPowerRules": ["id"],
+    "availability": ["id"],
+    "tints": ["id"],
+    "instructionCodes": ["code"],
+    "tintCompatibility": ["designId", "materialId", "treatmentId", "tintId"]
+}
+
+# Free-text ADD increment rules such as ">+4.00 in 0.50 steps"
+INCREMENT_RULE_PATTERN = re.compile(
+    r"^\s*(?:(>=|<=|>|<)\s*([+-]?\d+(?:\.\d+)?)\s+)?in\s+(\d+(?:\.\d+)?)\s+steps?\s*$",
+    re.IGNORECASE
+)
+
+def combo_key(design_id, material_id, treatment_id):
+    """Build the design×material×treatment key used by the indexes."""
+    return KEY_SEPARATOR.join((str(design_id), str(material_id), str(treatment_id)))
+
+def index_by_combo(rows):
+    """Map each design×material×treatment combo to its row position.
+
+    A combo listed twice maps to its first row; validate_catalog reports
+    the later ones as duplicates.
+    """
+    index = {}
+    for position, row in enumerate(rows):
+        index.setdefault(combo_key(row["designId"], row["materialId"], row["treatmentId"]), position)
+    return index
+
+def build_material_treatments(availability):
+    """Map each material to the treatments it is available with."""
+    material_treatments = {}
+    for row in availability:
+        if not row.get("available"):
+            continue
+        treatments = material_treatments.setdefault(row["materialId"], [])
+        if row["treatmentId"] not in treatments:
+            treatments.append(row["treatmentId"])
+    return material_treatments
+
+def build_tint_indexes(tint_compatibility):
+    """Map combos to allowed tints and tints to allowed combos."""
+    combo_tints = {}
+    tint_combos = {}
+    for row in tint_compatibility:
+        if not row.get("allowed"):
+            continue
+        key = combo_key(row["designId"], row["materialId"], row["treatmentId"])
+        combo_tints.setdefault(key, []).append(row["tintId"])
+        tint_combos.setdefault(row["tintId"], []).append(key)
+    return combo_tints, tint_combos
+
+def parse_increment_rule(text):
+    """Parse an incrementRule into {"op", "threshold", "step"}.
+
+    ">+4.00 in 0.50 steps" means ADD powers above +4.00 must be reached in
+    0.50 steps from +4.00; a rule without a comparison applies to every
+    ADD. Returns None for an empty rule and raises ValueError when the
+    text cannot be parsed.
+    """
+    if text is None or not str(text).strip():
+        return None
+    match = INCREMENT_RULE_PATTERN.match(str(text))
+    if match is None:
+        raise ValueError(f"unrecognised increment rule {text!r}")
+    op, threshold, step = match.groups()
+    if float(step) <= 0:
+        raise ValueError(f"increment rule step must be positive: {text!r}")
+    return {
+        "op": op,
+        "threshold": float(threshold) if threshold is not None else None,
+        "step": float(step)
+    }
+
+def build_add_power_increments(rules):
+    """Parse every ADD rule's incrementRule, aligned with the rule positions.
+
+    Unparseable rules compile to None; validate_catalog reports them.
+    """
+    increments = []
+    for rule in rules:
+        try:
+            increments.append(parse_increment_rule(rule.get("incrementRule")))
+        except ValueError:
+            increments.append(None)
+    return increments
+
+def build_indexes(catalog):
+    """Build every lookup index for the catalog.
+
+    Row-level indexes store the position of the record in its section,
+    so the catalog is not duplicated inside ``indexes``.
+    """
+    combo_tints, tint_combos = build_tint_indexes(catalog.get("tintCompatibility", []))
+
+    return {
+        "availability": index_by_combo(catalog.get("availability", [])),
+        "addPowerRules": index_by_combo(catalog.get("addPowerRules", [])),
+        "addPowerIncrements": build_add_power_increments(catalog.get("addPowerRules", [])),
+        "materialTreatments": build_material_treatments(catalog.get("availability", [])),
+        "comboTints": combo_tints,
+        "tintCombos": tint_combos,
+        # JSON object keys are strings, so SKUs are stringified
+        "framesBySku": {
+            str(frame["sku"]): position
+            for position, frame in enumerate(catalog.get("frames", []))
+        }
+    }
+
+def compile_catalog(catalog, compact_tints=False):
+    """Populate the catalog's ``indexes`` section in place and return it.
+
+    With ``compact_tints`` the exploded ``tintCompatibility`` list and its
+    tint indexes are replaced by a ``tintMatrix`` section (see tint_matrix).
+    A catalog that already holds a ``tintMatrix`` keeps it as it is.
+    """
+    if compact_tints and "tintMatrix" in catalog and "tintCompatibility" in catalog:
+        raise ValueError("catalog has both tintCompatibility and a tintMatrix")
+    catalog["indexes"] = build_indexes(catalog)
+    if compact_tints:
+        if "tintMatrix" not in catalog:
+            # numpy is only needed for the compact form
+            from tint_matrix import encode_tint_matrix
+            catalog["tintMatrix"] = encode_tint_matrix(catalog.pop("tintCompatibility", []))
+        del catalog["indexes"]["comboTints"]
+        del catalog["indexes"]["tintCombos"]
+    return catalog
+
+def lookup(catalog, index_name, key):
+    """Return the record a positional index maps ``key`` to, or None."""
+    position = catalog["indexes"][index_name].get(str(key))
+    if position is None:
+        return None
+    return catalog[POSITIONAL_INDEXES[index_name]][position]
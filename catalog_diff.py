@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Catalog Diff
+Compares two catalog builds section by section and emits a compact
+added/removed/changed changeset that can be applied as a patch
+"""
+
+import argparse
+import copy
+import json
+import sys
+from pathlib import Path
+
+from build_catalog import set_field, unset_field
+from catalog_binary import flatten_record
+from catalog_compiler import SECTION_KEYS, compile_catalog
+from tint_matrix import expand_tint_matrix
+
+CHANGESET_VERSION = 1
+
+# Metadata fields that change on every build and carry no catalog content
+VOLATILE_METADATA = {"lastUpdated", "buildId", "sheetHashes", "blankRows", "totalRecords"}
+
+def section_rows(catalog, section):
+    """Return a section's rows, expanding a compact tint matrix if needed."""
+    if section == "tintCompatibility" and "tintMatrix" in catalog:
+        return expand_tint_matrix(catalog["tintMatrix"])
+    return catalog.get(section) or []
+
+def record_key(row, fields):
+    """Return a record's key: the field value, or a list for composite keys."""
+    if len(fields) == 1:
+        return row.get(fields[0])
+    return [row.get(field) for field in fields]
+
+def hashable_key(key):
+    """Return a dict-usable form of a record key."""
+    return tuple(key) if isinstance(key, list) else key
+
+def key_rows(section, rows, fields):
+    """Hash rows by key, rejecting keys that would make the join ambiguous."""
+    keyed = {}
+    for row in rows:
+        key = hashable_key(record_key(row, fields))
+        if key in keyed:
+            raise ValueError(f"duplicate {'/'.join(fields)} {key!r} in {section}")
+        keyed[key] = row
+    return keyed
+
+def field_changes(old, new):
+    """Return (set, unset) between two records, with nested fields dotted."""
+    old_flat = flatten_record(old)
+    new_flat = flatten_record(new)
+    changed = {
+        name: value for name, value in new_flat.items()
+        if name not in old_flat or old_flat[name] != value
+    }
+    removed = [name for name in old_flat if name not in new_flat]
+    return changed, removed
+
+def diff_section(section, old_rows, new_rows):
+    """Diff one section with a hash join on its key fields, in linear time."""
+    fields = SECTION_KEYS[section]
+    remaining = key_rows(section, old_rows, fields)
+    added = []
+    changed = []
+    for row in new_rows:
+        key = record_key(row, fields)
+        old = remaining.pop(hashable_key(key), None)
+        if old is None:
+            added.append(row)
+        elif old != row:
+            set_fields, unset_fields = field_changes(old, row)
+            change = {"key": key, "set": set_fields}
+            if unset_fields:
+                change["unset"] = unset_fields
+            changed.append(change)
+    removed = [list(key) if isinstance(key, tuple) else key for key in remaining]
+    return {"key": fields, "added": added, "removed": removed, "changed": changed}
+
+def diff_catalogs(old, new):
+    """Return the changeset that turns catalog ``old`` into catalog ``new``."""
+    old_metadata = old.get("metadata", {})
+    new_metadata = new.get("metadata", {})
+    changeset = {
+        "version": CHANGESET_VERSION,
+        "from": old_metadata.get("buildId"),
+        "to": new_metadata.get("buildId"),
+        "metadata": {
+            name: value for name, value in new_metadata.items()
+            if name not in VOLATILE_METADATA and old_metadata.get(name) != value
+        },
+        "sections": {},
+        "summary": {}
+    }
+    for section in SECTION_KEYS:
+        diff = diff_section(section, section_rows(old, section), section_rows(new, section))
+        counts = {name: len(diff[name]) for name in ("added", "removed", "changed")}
+        if any(counts.values()):
+            changeset["sections"][section] = diff
+            changeset["summary"][section] = counts
+    return changeset
+
+def apply_section(section, rows, diff):
+    """Return ``rows`` with one section's changes applied.
+
+    Changed records keep their position, removed records are dropped and
+    added records are appended.
+    """
+    fields = diff["key"]
+    removed = {hashable_key(key) for key in diff["removed"]}
+    changes = {hashable_key(change["key"]): change for change in diff["changed"]}
+    patched = []
+    for row in rows:
+        key = hashable_key(record_key(row, fields))
+        if key in removed:
+            continue
+        change = changes.get(key)
+        if change is not None:
+            row = copy.deepcopy(row)
+            for name in change.get("unset", []):
+                unset_field(row, name)
+            for name, value in change["set"].items():
+                set_field(row, name, value)
+        patched.append(row)
+    patched.extend(diff["added"])
+    return patched
+
+def apply_changeset(catalog, changeset):
+    """Apply a changeset to a catalog and return the patched catalog.
+
+    Indexes are recompiled afterwards, keeping the catalog's tint
+    representation (rows or compact matrix).
+    """
+    if changeset.get("version") != CHANGESET_VERSION:
+        raise ValueError(f"unsupported changeset version {changeset.get('version')}")
+    build_id = catalog.get("metadata", {}).get("buildId")
+    if changeset["from"] is not None and build_id != changeset["from"]:
+        raise ValueError(f"changeset applies to build {changeset['from']}, not {build_id}")
+
+    compact_tints = "tintMatrix" in catalog
+    patched = dict(catalog)
+    if compact_tints:
+        patched["tintCompatibility"] = expand_tint_matrix(patched.pop("tintMatrix"))
+    for section, diff in changeset["sections"].items():
+        patched[section] = apply_section(section, section_rows(patched, section), diff)
+
+    metadata = dict(patched.get("metadata", {}))
+    metadata.update(changeset["metadata"])
+    metadata["buildId"] = changeset["to"]
+    metadata["totalRecords"] = sum(len(patched.get(section) or []) for section in SECTION_KEYS)
+    patched["metadata"] = metadata
+    return compile_catalog(patched, compact_tints=compact_tints)
+
+def parse_args(argv=None):
+    """Parse command line options."""
+    parser = argparse.ArgumentParser(description="Diff two catalog builds")
+    parser.add_argument("old", help="Previous catalog (JSON or .ocat)")
+    parser.add_argument("new", help="New catalog (JSON or .ocat)")
+    parser.add_argument("--output", default="data/catalog_changeset.json",
+                        help="Where to write the changeset")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """Main diff function."""
+    args = parse_args(argv)
+    for path in (Path(args.old), Path(args.new)):
+        if not path.exists():
+            print(f"❌ Catalog not found: {path}")
+            sys.exit(1)
+
+    from catalog_access import load_catalog
+    print(f"🔍 Comparing {args.old} -> {args.new}")
+    try:
+        changeset = diff_catalogs(load_catalog(args.old), load_catalog(args.new))
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    output_path = Path(args.output)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump(changeset, f, ensure_ascii=False, separators=(",", ":"))
+
+    if not changeset["sections"] and not changeset["metadata"]:
+        print("✅ No changes")
+    for section, counts in changeset["summary"].items():
+        print(f"   {section}: +{counts['added']} -{counts['removed']} ~{counts['changed']}")
+    print(f"✅ Changeset saved to: {output_path}")
+
+if __name__ == "__main__":
+    main()
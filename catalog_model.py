@@ -0,0 +1,403 @@
+#!/usr/bin/env python3
+"""
+Catalog Model
+Compact in-memory entities for a loaded catalog: frames are stored as
+typed column arrays, rule and reference rows as __slots__ objects with
+interned enum strings
+"""
+
+import argparse
+import gc
+import json
+import sys
+import tracemalloc
+from array import array
+from pathlib import Path
+
+from build_catalog import get_field, set_field
+
+# Signed array typecodes from narrowest to widest, with their value ranges
+INT_TYPECODES = [("b", -2**7, 2**7 - 1), ("h", -2**15, 2**15 - 1),
+                 ("i", -2**31, 2**31 - 1), ("q", -2**63, 2**63 - 1)]
+
+# Flag column byte values
+FLAG_FALSE, FLAG_TRUE, FLAG_NULL = 0, 1, 2
+
+def intern_text(value):
+    """Intern a string so repeated enum values share one object."""
+    return sys.intern(value) if isinstance(value, str) else value
+
+class Entity:
+    """Base for slotted catalog rows.
+
+    Subclasses list ``FIELDS`` as (attribute, top-level record field) pairs
+    in record order and ``ENUMS`` as the attributes whose values are interned.
+    """
+
+    __slots__ = ()
+    FIELDS = ()
+    ENUMS = frozenset()
+
+    @classmethod
+    def from_record(cls, record):
+        """Build an entity from a catalog JSON record."""
+        entity = cls.__new__(cls)
+        for attribute, field in cls.FIELDS:
+            value = record.get(field)
+            if attribute in cls.ENUMS:
+                value = intern_text(value)
+            elif isinstance(value, list):
+                value = tuple(intern_text(item) for item in value)
+            setattr(entity, attribute, value)
+        return entity
+
+    def to_record(self):
+        """Convert back to the catalog JSON record shape."""
+        record = {}
+        for attribute, field in self.FIELDS:
+            value = getattr(self, attribute)
+            record[field] = list(value) if isinstance(value, tuple) else value
+        return record
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.FIELDS[0][1]}={getattr(self, self.FIELDS[0][0])!r})"
+
+def entity_class(name, fields, enums=()):
+    """Create a slotted Entity subclass from (attribute, field) pairs."""
+    return type(name, (Entity,), {
+        "__slots__": tuple(attribute for attribute, _ in fields),
+        "FIELDS": tuple(fields),
+        "ENUMS": frozenset(enums),
+        "__doc__": f"One {name} catalog row."
+    })
+
+Material = entity_class("Material", [
+    ("id", "id"), ("display_name", "displayName"), ("refractive_index", "refractiveIndex"),
+    ("available", "available"), ("rimless_allowed", "rimlessAllowed"), ("notes", "notes"),
+    ("lab_output", "labOutput")
+], enums=["id"])
+
+Treatment = entity_class("Treatment", [
+    ("id", "id"), ("type", "type"), ("colors_allowed", "colorsAllowed"),
+    ("rimless_allowed", "rimlessAllowed"), ("notes", "notes"), ("lab_output", "labOutput")
+], enums=["id", "type"])
+
+Design = entity_class("Design", [
+    ("id", "id"), ("category", "category"), ("segment_type", "segmentType"),
+    ("segment_size", "segmentSize"), ("min_segment_height", "minSegmentHeight"),
+    ("discontinued", "discontinued"), ("notes", "notes"), ("lab_output", "labOutput"),
+    ("segment_output", "segmentOutput")
+], enums=["id", "category", "segment_type"])
+
+AddPowerRule = entity_class("AddPowerRule", [
+    ("id", "id"), ("design_id", "designId"), ("material_id", "materialId"),
+    ("treatment_id", "treatmentId"), ("add_min", "addMin"), ("add_max", "addMax"),
+    ("increment_rule", "incrementRule"), ("notes", "notes")
+], enums=["design_id", "material_id", "treatment_id", "increment_rule"])
+
+AvailabilityRule = entity_class("AvailabilityRule", [
+    ("id", "id"), ("design_id", "designId"), ("material_id", "materialId"),
+    ("treatment_id", "treatmentId"), ("available", "available"),
+    ("rimless_allowed", "rimlessAllowed"), ("color_limits", "colorLimits"),
+    ("min_segment_height", "minSegmentHeight"), ("substitution", "substitution"),
+    ("lead_time_weeks", "leadTimeWeeks"), ("notes", "notes")
+], enums=["design_id", "material_id", "treatment_id", "color_limits", "substitution"])
+
+Tint = entity_class("Tint", [
+    ("id", "id"), ("category", "category"), ("color_name", "colorName"), ("style", "style"),
+    ("percentage_min", "percentageMin"), ("percentage_max", "percentageMax"),
+    ("fixed_percentage", "fixedPercentage"), ("available_in", "availableIn"),
+    ("notes", "notes"), ("lab_output", "labOutput")
+], enums=["id", "category", "color_name", "style"])
+
+# Catalog section -> entity class for the row-object sections
+ENTITY_SECTIONS = {
+    "materials": Material,
+    "treatments": Treatment,
+    "designs": Design,
+    "addPowerRules": AddPowerRule,
+    "availability": AvailabilityRule,
+    "tints": Tint
+}
+
+class EnumPool:
+    """Small-integer codes for a column's distinct values (0 is None)."""
+
+    def __init__(self):
+        self.values = [None]
+        self.codes = {None: 0}
+
+    def code(self, value):
+        """Return the code for ``value``, adding it if new."""
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(intern_text(value))
+        return code
+
+# Frame columns: (attribute, record field, storage kind)
+FRAME_COLUMNS = [
+    ("id", "id", "int"),
+    ("brand_model", "brandModel", "enum"),
+    ("sku", "sku", "int"),
+    ("color", "color", "enum"),
+    ("material", "material", "enum"),
+    ("a", "dimensions.a", "int"),
+    ("b", "dimensions.b", "int"),
+    ("dbl", "dimensions.dbl", "int"),
+    ("ed", "dimensions.ed", "float"),
+    ("temple", "dimensions.temple", "int"),
+    ("frame_pd", "dimensions.framePd", "int"),
+    ("collection", "collection", "enum"),
+    ("safety", "flags.safety", "flag"),
+    ("sport", "flags.sport", "flag"),
+    ("side_shield_sku", "sideShieldSku", "int"),
+    ("hero_image", "heroImage", "text"),
+    ("discontinued", "discontinued", "flag"),
+    ("backordered", "backordered", "flag"),
+    ("notes", "notes", "text")
+]
+
+def pack_numbers(values, kind):
+    """Pack a numeric column into (array, null mask or None).
+
+    Returns (list, None) when a value does not fit the column kind, so odd
+    hand-edited rows are kept verbatim instead of being coerced.
+    """
+    present = [value for value in values if value is not None]
+    if kind == "int":
+        if any(type(value) is not int for value in present):
+            return list(values), None
+        low, high = (min(present), max(present)) if present else (0, 0)
+        typecode = next((code for code, lowest, highest in INT_TYPECODES
+                         if lowest <= low and high <= highest), None)
+        if typecode is None:
+            return list(values), None
+    else:
+        # ints are not widened to floats, which would change the round trip
+        if any(type(value) is not float for value in present):
+            return list(values), None
+        typecode = "d"
+    packed = array(typecode, (0 if value is None else value for value in values))
+    nulls = None
+    if len(present) != len(values):
+        nulls = bytearray(value is None for value in values)
+    return packed, nulls
+
+class Frame:
+    """Read-only view of one row of a FrameTable."""
+
+    __slots__ = ("table", "position")
+
+    def __init__(self, table, position):
+        self.table = table
+        self.position = position
+
+    def __getattr__(self, name):
+        if name in Frame.__slots__:
+            # Unset slot (e.g. during copy/unpickle); avoid recursing
+            raise AttributeError(name)
+        return self.table.value(name, self.position)
+
+    def to_record(self):
+        """Convert back to the catalog JSON record shape."""
+        return self.table.record(self.position)
+
+    def __repr__(self):
+        return f"Frame(sku={self.sku!r})"
+
+class FrameTable:
+    """Frames stored column-wise in typed arrays."""
+
+    def __init__(self, records):
+        records = records if isinstance(records, list) else list(records)
+        self.length = len(records)
+        self.columns = {}
+        self.sku_positions = None
+        for attribute, field, kind in FRAME_COLUMNS:
+            values = [get_field(record, field) for record in records]
+            if kind in ("int", "float"):
+                self.columns[attribute] = (kind,) + pack_numbers(values, kind)
+            elif kind == "flag":
+                self.columns[attribute] = (kind, bytearray(
+                    FLAG_NULL if value is None else FLAG_TRUE if value else FLAG_FALSE for value in values
+                ), None)
+            elif kind == "enum":
+                pool = EnumPool()
+                codes = [pool.code(value) for value in values]
+                typecode = "B" if len(pool.values) <= 2**8 else "H" if len(pool.values) <= 2**16 else "I"
+                self.columns[attribute] = (kind, array(typecode, codes), pool.values)
+            else:
+                self.columns[attribute] = (kind, values, None)
+        # position -> {parent: value} for rows whose dimensions/flags is not an object;
+        # record() restores them instead of an object of nulls
+        self.parent_values = {}
+        parents = {field.rpartition(".")[0] for _, field, _ in FRAME_COLUMNS} - {""}
+        for position, record in enumerate(records):
+            for parent in parents:
+                value = record.get(parent)
+                if not isinstance(value, dict):
+                    self.parent_values.setdefault(position, {})[parent] = value
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, position):
+        if not -self.length <= position < self.length:
+            raise IndexError("frame position out of range")
+        return Frame(self, position % self.length)
+
+    def __iter__(self):
+        return (Frame(self, position) for position in range(self.length))
+
+    def value(self, attribute, position):
+        """Return one decoded cell."""
+        try:
+            kind, stored, extra = self.columns[attribute]
+        except KeyError:
+            raise AttributeError(attribute) from None
+        if kind == "enum":
+            return extra[stored[position]]
+        if kind == "flag":
+            flag = stored[position]
+            return None if flag == FLAG_NULL else flag == FLAG_TRUE
+        if extra is not None and extra[position]:
+            return None
+        return stored[position]
+
+    def record(self, position):
+        """Rebuild one frame as a catalog JSON record."""
+        record = {}
+        for attribute, field, _ in FRAME_COLUMNS:
+            set_field(record, field, self.value(attribute, position))
+        record.update(self.parent_values.get(position, ()))
+        return record
+
+    def find(self, sku):
+        """Return the frame with ``sku``, or None."""
+        if self.sku_positions is None:
+            # Built on first use; many consumers only scan columns
+            self.sku_positions = {sku: position for position, sku in enumerate(self.column("sku"))}
+        position = self.sku_positions.get(sku)
+        return None if position is None else Frame(self, position)
+
+    def column(self, attribute):
+        """Return a whole column as a list of decoded values."""
+        return [self.value(attribute, position) for position in range(self.length)]
+
+    def raw_column(self, attribute):
+        """Return a column's stored array (codes for enums) for vectorized use."""
+        return self.columns[attribute][1]
+
+class CatalogModel:
+    """A catalog held as compact entities instead of nested dicts.
+
+    Sections without a model (instructionCodes, tint compatibility,
+    indexes) are kept as loaded.
+    """
+
+    def __init__(self, catalog):
+        self.metadata = catalog.get("metadata", {})
+        self.frames = FrameTable(catalog.get("frames") or [])
+        self.entities = {
+            section: [cls.from_record(record) for record in catalog.get(section) or []]
+            for section, cls in ENTITY_SECTIONS.items()
+        }
+        self.passthrough = {
+            name: value for name, value in catalog.items()
+            if name not in ENTITY_SECTIONS and name not in ("metadata", "frames")
+        }
+
+    @property
+    def materials(self):
+        return self.entities["materials"]
+
+    @property
+    def treatments(self):
+        return self.entities["treatments"]
+
+    @property
+    def designs(self):
+        return self.entities["designs"]
+
+    @property
+    def add_power_rules(self):
+        return self.entities["addPowerRules"]
+
+    @property
+    def availability(self):
+        return self.entities["availability"]
+
+    @property
+    def tints(self):
+        return self.entities["tints"]
+
+    def to_catalog(self):
+        """Convert back to the catalog JSON dict."""
+        catalog = {"metadata": self.metadata}
+        catalog.update({section: [entity.to_record() for entity in rows] for section, rows in self.entities.items()})
+        catalog["frames"] = [self.frames.record(position) for position in range(len(self.frames))]
+        catalog.update(self.passthrough)
+        return catalog
+
+def load_catalog_model(catalog_path):
+    """Load a catalog file (via its snapshot when fresh) into a CatalogModel."""
+    from catalog_access import load_catalog
+    return CatalogModel(load_catalog(catalog_path))
+
+def retained_mb(build):
+    """Return (object, MiB still allocated by ``build`` once it returns)."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = build()
+        gc.collect()
+        current, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, current / 2**20
+
+def compare_memory(catalog_path):
+    """Measure memory held by the dict catalog and by its CatalogModel."""
+    def load_dict():
+        with open(catalog_path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def load_model():
+        # The dict is dropped inside the traced call, so only what the
+        # model keeps (including shared strings) is counted
+        return CatalogModel(load_dict())
+
+    catalog, dict_mb = retained_mb(load_dict)
+    model, model_mb = retained_mb(load_model)
+    return {
+        "frames": len(model.frames),
+        "dictMB": dict_mb,
+        "modelMB": model_mb,
+        "ratio": dict_mb / model_mb if model_mb else None,
+        "roundTrip": model.to_catalog() == catalog
+    }
+
+def parse_args(argv=None):
+    """Parse command line options."""
+    parser = argparse.ArgumentParser(description="Compare dict and compact model catalog memory")
+    parser.add_argument("catalog", nargs="?", default="data/sample_catalog.json",
+                        help="Catalog JSON to measure")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """Report how much memory the compact model saves."""
+    args = parse_args(argv)
+    catalog_path = Path(args.catalog)
+    if not catalog_path.exists():
+        print(f"❌ Catalog not found: {catalog_path}")
+        sys.exit(1)
+
+    report = compare_memory(catalog_path)
+    print(f"📦 {catalog_path}: {report['frames']} frames")
+    print(f"   dict catalog:  {report['dictMB']:.1f} MB")
+    print(f"   catalog model: {report['modelMB']:.1f} MB ({report['ratio']:.1f}x smaller)")
+    print(f"   round trip:    {'✅ exact' if report['roundTrip'] else '❌ differs'}")
+
+if __name__ == "__main__":
+    main()
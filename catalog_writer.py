@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Catalog Writer
+Streams catalogs (or any JSON document with large top-level sections) to
+disk record by record, as pretty JSON, compact JSON or one JSON Lines file
+per section, counting metadata.totalRecords on the way
+"""
+
+import json
+from pathlib import Path
+
+STYLES = ("pretty", "compact", "jsonl")
+WRITE_BUFFER = 1 << 20
+
+# Room left after a placeholder count; whitespace is valid JSON
+TOTAL_SLOT_WIDTH = 20
+
+# JSON Lines catalogs keep everything that is not a section in this file
+JSONL_MANIFEST = "metadata.json"
+
+# dumps() with keyword arguments builds a new encoder per call; reuse them
+PRETTY_ENCODER = json.JSONEncoder(ensure_ascii=False, indent=2)
+COMPACT_ENCODER = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+
+def is_section(value):
+    """Return whether a top-level value is streamed as a record section."""
+    return not isinstance(value, (dict, str, bytes, int, float, bool, type(None)))
+
+class JsonCatalogWriter:
+    """Writes one JSON object whose values can be streamed record by record.
+
+    ``pretty`` output is byte-identical to ``json.dump(indent=2,
+    ensure_ascii=False)``; ``compact`` output has no indentation and puts
+    each record on its own line.
+    """
+
+    def __init__(self, path, style="compact"):
+        if style not in ("pretty", "compact"):
+            raise ValueError(f"unknown JSON style {style!r}")
+        self.path = Path(path)
+        self.pretty = style == "pretty"
+        self.encoder = PRETTY_ENCODER if self.pretty else COMPACT_ENCODER
+        self.counts = {}
+        self.file = None
+        self.entries = 0
+        self.total_offset = None
+
+    def __enter__(self):
+        self.file = open(self.path, "wb", buffering=WRITE_BUFFER)
+        self.file.write(b"{")
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if exc_type is None:
+                self.file.write(b"\n}" if self.pretty and self.entries else b"}")
+                if self.total_offset is not None:
+                    self.file.seek(self.total_offset)
+                    self.file.write(str(self.total_records()).ljust(TOTAL_SLOT_WIDTH + 1).encode("ascii"))
+        finally:
+            self.file.close()
+
+    def encode(self, value, depth):
+        """Encode a value indented for ``depth`` levels of nesting."""
+        text = self.encoder.encode(value)
+        if self.pretty and depth:
+            text = text.replace("\n", "\n" + "  " * depth)
+        return text.encode("utf-8")
+
+    def key(self, name):
+        """Write the separator and key for the next top-level entry."""
+        prefix = ("," if self.entries else "") + ("\n  " if self.pretty else "")
+        separator = ": " if self.pretty else ":"
+        self.file.write((prefix + json.dumps(name, ensure_ascii=False) + separator).encode("utf-8"))
+        self.entries += 1
+
+    def write_value(self, name, value):
+        """Write one top-level entry in full."""
+        self.key(name)
+        self.file.write(self.encode(value, 1))
+
+    def write_metadata(self, metadata, total_records=None):
+        """Write the metadata entry, reserving room for totalRecords if unknown.
+
+        Without ``total_records`` a placeholder count is written and patched
+        with the number of section records when the writer closes.
+        """
+        if total_records is not None:
+            self.write_value("metadata", dict(metadata, totalRecords=total_records))
+            return
+        self.key("metadata")
+        head = self.encode(dict(metadata, totalRecords=0), 1)
+        marker = b'"totalRecords": 0' if self.pretty else b'"totalRecords":0'
+        self.total_offset = self.file.tell() + head.index(marker) + len(marker) - 1
+        self.file.write(head.replace(marker, marker + b" " * TOTAL_SLOT_WIDTH))
+
+    def write_section(self, name, records):
+        """Stream a list of records from any iterable and count them."""
+        self.key(name)
+        write = self.file.write
+        encode = self.encoder.encode
+        if self.pretty:
+            opener, separator, closer = b"[\n    ", b",\n    ", b"\n  ]"
+        else:
+            opener, separator, closer = b"[\n", b",\n", b"\n]"
+        count = 0
+        for record in records:
+            text = encode(record)
+            if self.pretty:
+                text = text.replace("\n", "\n    ")
+            write(separator if count else opener)
+            write(text.encode("utf-8"))
+            count += 1
+        write(closer if count else b"[]")
+        self.counts[name] = count
+        return count
+
+    def write_mapping(self, name, items):
+        """Stream an object from an iterable of (key, value) pairs."""
+        self.key(name)
+        write = self.file.write
+        indent = b"\n    " if self.pretty else b""
+        separator = ": " if self.pretty else ":"
+        count = 0
+        for key, value in items:
+            write(b"," if count else b"{")
+            write(indent + (json.dumps(key, ensure_ascii=False) + separator).encode("utf-8"))
+            write(self.encode(value, 2))
+            count += 1
+        write((b"\n  }" if self.pretty else b"}") if count else b"{}")
+        return count
+
+    def total_records(self):
+        """Return the number of records written to sections so far."""
+        return sum(self.counts.values())
+
+class JsonLinesCatalogWriter:
+    """Writes each section to ``<directory>/<section>.jsonl``, one record per line.
+
+    Everything else, including the metadata with its final totalRecords,
+    goes into ``<directory>/metadata.json`` when the writer closes.
+    """
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.manifest = {}
+        self.counts = {}
+
+    def __enter__(self):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            return
+        if "metadata" in self.manifest:
+            self.manifest["metadata"] = dict(self.manifest["metadata"], totalRecords=self.total_records())
+        self.manifest["sections"] = self.counts
+        with open(self.directory / JSONL_MANIFEST, "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f, indent=2, ensure_ascii=False)
+
+    def write_value(self, name, value):
+        """Keep a small top-level entry for the manifest."""
+        self.manifest[name] = value
+
+    def write_metadata(self, metadata, total_records=None):
+        """Keep the metadata; totalRecords is filled in on close."""
+        self.manifest["metadata"] = metadata
+
+    def write_section(self, name, records):
+        """Stream a section to its own JSON Lines file and count it."""
+        encode = COMPACT_ENCODER.encode
+        count = 0
+        with open(self.directory / f"{name}.jsonl", "wb", buffering=WRITE_BUFFER) as f:
+            for record in records:
+                f.write(encode(record).encode("utf-8"))
+                f.write(b"\n")
+                count += 1
+        self.counts[name] = count
+        return count
+
+    def write_mapping(self, name, items):
+        """Stream an object as ``[key, value]`` lines in its own file."""
+        count = self.write_section(name, ([key, value] for key, value in items))
+        del self.counts[name]
+        self.manifest.setdefault("mappings", []).append(name)
+        return count
+
+    def total_records(self):
+        """Return the number of records written to sections so far."""
+        return sum(self.counts.values())
+
+def open_writer(path, style="compact"):
+    """Return a writer for ``style``; JSON Lines catalogs are written to a directory."""
+    if style == "jsonl":
+        path = Path(path)
+        return JsonLinesCatalogWriter(path.with_suffix("") if path.suffix == ".json" else path)
+    return JsonCatalogWriter(path, style)
+
+def write_catalog(path, catalog, style="compact", metrics=None):
+    """Stream a catalog dict to ``path`` and return the per-section counts.
+
+    Top-level lists and generators are written record by record; other
+    values (metadata, indexes, tintMatrix) are written whole.
+    ``metadata.totalRecords`` is set to the number of section records:
+    up front when every section is a list, otherwise counted while
+    streaming and patched in at the end.
+    """
+    sections = {name: value for name, value in catalog.items() if name != "metadata" and is_section(value)}
+    total_records = None
+    if all(isinstance(records, (list, tuple)) for records in sections.values()):
+        total_records = sum(len(records) for records in sections.values())
+
+    with open_writer(path, style) as writer:
+        if "metadata" in catalog:
+            writer.write_metadata(catalog["metadata"], total_records)
+        for name, value in catalog.items():
+            if name == "metadata":
+                continue
+            if name not in sections:
+                writer.write_value(name, value)
+            elif metrics is None:
+                writer.write_section(name, value)
+            else:
+                with metrics.stage("write_section", section=name) as stage:
+                    stage["rows"] = writer.write_section(name, value)
+    return writer.counts
+
+def read_catalog_jsonl(directory):
+    """Load a catalog written in the JSON Lines style back into one dict."""
+    directory = Path(directory)
+    with open(directory / JSONL_MANIFEST, encoding="utf-8") as f:
+        manifest = json.load(f)
+    catalog = {}
+    mappings = manifest.pop("mappings", [])
+    sections = manifest.pop("sections", {})
+    if "metadata" in manifest:
+        catalog["metadata"] = manifest.pop("metadata")
+    for name in list(sections) + mappings:
+        with open(directory / f"{name}.jsonl", encoding="utf-8") as f:
+            rows = [json.loads(line) for line in f]
+        catalog[name] = dict(rows) if name in mappings else rows
+    catalog.update(manifest)
+    return catalog
@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+"""
+Combination Analysis
+Evaluates every design × material × treatment (and tint) combination
+with vectorized DataFrame operations to find what is orderable, what is
+contradicted by other tabs and which rules can never be reached
+"""
+
+import argparse
+import json
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from validate_catalog import section_frame
+
+COMBO_KEY = ["designId", "materialId", "treatmentId"]
+
+# Design categories that need an ADD power range to be orderable
+MULTIFOCAL_CATEGORIES = {"bifocal", "trifocal", "progressive"}
+
+# Refractive index -> the material family names tint availableIn lists use
+MATERIAL_FAMILIES = {1.5: "Plastic", 1.53: "Trivex", 1.59: "Poly", 1.6: "1.60", 1.67: "1.67", 1.74: "1.74"}
+
+ORDERABLE_VERSION = 1
+
+def material_family(material):
+    """Return the tint availableIn family for a material, or None if unknown."""
+    text = f"{material.get('id') or ''} {material.get('displayName') or ''}".lower()
+    if "glass" in text:
+        return "Glass"
+    index = material.get("refractiveIndex")
+    if isinstance(index, (int, float)) and not isinstance(index, bool):
+        return MATERIAL_FAMILIES.get(round(index, 2))
+    return None
+
+def flag(column):
+    """Return a boolean column with missing values as False."""
+    return column.eq(True)
+
+def prepare_tables(catalog):
+    """Build the DataFrames the analysis joins, renamed so joins never collide."""
+    materials = section_frame(catalog, "materials", ["id", "available", "rimlessAllowed"])
+    materials = pd.DataFrame({
+        "materialId": materials["id"],
+        "materialAvailable": flag(materials["available"]),
+        "materialRimless": flag(materials["rimlessAllowed"]),
+        "family": [material_family(material) for material in catalog.get("materials") or []]
+    })
+    designs = section_frame(catalog, "designs", ["id", "category", "discontinued", "minSegmentHeight"])
+    designs = pd.DataFrame({
+        "designId": designs["id"],
+        "multifocal": designs["category"].fillna("").str.lower().isin(MULTIFOCAL_CATEGORIES),
+        "designDiscontinued": flag(designs["discontinued"]),
+        "designMinSegmentHeight": pd.to_numeric(designs["minSegmentHeight"], errors="coerce").fillna(0)
+    })
+    treatments = section_frame(catalog, "treatments", ["id", "rimlessAllowed"])
+    treatments = pd.DataFrame({
+        "treatmentId": treatments["id"],
+        "treatmentRimless": flag(treatments["rimlessAllowed"])
+    })
+    availability = section_frame(catalog, "availability",
+                                 ["id"] + COMBO_KEY + ["available", "rimlessAllowed", "minSegmentHeight"])
+    availability = availability.rename(columns={
+        "id": "availabilityId", "available": "offered",
+        "rimlessAllowed": "availabilityRimless", "minSegmentHeight": "availabilityMinSegmentHeight"
+    })
+    add_rules = section_frame(catalog, "addPowerRules", ["id"] + COMBO_KEY + ["addMin", "addMax"])
+    add_rules["addMin"] = pd.to_numeric(add_rules["addMin"], errors="coerce")
+    add_rules["addMax"] = pd.to_numeric(add_rules["addMax"], errors="coerce")
+
+    tints = section_frame(catalog, "tints", ["id", "percentageMin", "percentageMax", "fixedPercentage", "availableIn"])
+    tint_families = tints[["id", "availableIn"]].explode("availableIn").dropna()
+    tint_families = pd.DataFrame({"tintId": tint_families["id"], "family": tint_families["availableIn"]})
+    tints = pd.DataFrame({
+        "tintId": tints["id"],
+        "tintMin": pd.to_numeric(tints["percentageMin"], errors="coerce"),
+        "tintMax": pd.to_numeric(tints["percentageMax"], errors="coerce"),
+        "tintFixed": pd.to_numeric(tints["fixedPercentage"], errors="coerce")
+    })
+
+    if "tintMatrix" in catalog:
+        from tint_matrix import expand_tint_matrix
+        compatibility_rows = expand_tint_matrix(catalog["tintMatrix"])
+    else:
+        compatibility_rows = catalog.get("tintCompatibility") or []
+    compatibility = section_frame({"rows": compatibility_rows}, "rows",
+                                  COMBO_KEY + ["tintId", "allowed", "percentageMin", "percentageMax"])
+    compatibility["row"] = np.arange(len(compatibility))
+
+    return {
+        "materials": materials, "designs": designs, "treatments": treatments,
+        "availability": availability, "addPowerRules": add_rules,
+        "tints": tints, "tintFamilies": tint_families, "tintCompatibility": compatibility
+    }
+
+def join_reasons(index, reasons):
+    """Combine (label, mask) pairs into one '; '-separated reason string per row."""
+    joined = pd.Series("", index=index, dtype=object)
+    for label, mask in reasons:
+        mask = np.asarray(mask, dtype=bool)
+        joined = joined.where(~mask, joined + label + "; ")
+    return joined.str.rstrip("; ")
+
+def evaluate_combos(tables):
+    """Evaluate every design × material × treatment combination."""
+    combos = (tables["designs"]
+              .merge(tables["materials"], how="cross")
+              .merge(tables["treatments"], how="cross"))
+    availability = tables["availability"].drop_duplicates(COMBO_KEY)
+    add_ranges = tables["addPowerRules"].groupby(COMBO_KEY, as_index=False).agg(
+        addMin=("addMin", "min"), addMax=("addMax", "max"))
+    combos = combos.merge(availability, on=COMBO_KEY, how="left").merge(add_ranges, on=COMBO_KEY, how="left")
+
+    offered = flag(combos["offered"])
+    availability_min = pd.to_numeric(combos["availabilityMinSegmentHeight"], errors="coerce").fillna(0)
+    availability_rimless = flag(combos["availabilityRimless"])
+    blocks = [
+        ("material unavailable", offered & ~combos["materialAvailable"]),
+        ("design discontinued", offered & combos["designDiscontinued"]),
+        ("no ADD range for multifocal design", offered & combos["multifocal"] & combos["addMin"].isna()),
+        ("ADD min above ADD max", offered & (combos["addMin"] > combos["addMax"]))
+    ]
+    conflicts = [
+        ("rimless allowed by availability but not by material/treatment",
+         offered & availability_rimless & ~(combos["materialRimless"] & combos["treatmentRimless"])),
+        ("availability min segment height below design minimum",
+         offered & (availability_min < combos["designMinSegmentHeight"]))
+    ]
+    combos["reasons"] = join_reasons(combos.index, blocks)
+    combos["conflicts"] = join_reasons(combos.index, conflicts)
+    combos["status"] = np.select([~offered, combos["reasons"] != ""], ["not_offered", "contradicted"], "orderable")
+    combos["rimlessAllowed"] = availability_rimless & combos["materialRimless"] & combos["treatmentRimless"]
+    combos["minSegmentHeight"] = np.maximum(availability_min, combos["designMinSegmentHeight"])
+    return combos
+
+def evaluate_add_rules(tables, combos):
+    """Flag ADD power rules no orderable combination can use."""
+    rules = tables["addPowerRules"].merge(combos[COMBO_KEY + ["status", "multifocal"]], on=COMBO_KEY, how="left")
+    rules["reasons"] = join_reasons(rules.index, [
+        ("combination not offered", rules["status"].eq("not_offered")),
+        ("combination contradicted", rules["status"].eq("contradicted")),
+        ("unknown design, material or treatment", rules["status"].isna()),
+        ("design takes no ADD", rules["multifocal"].eq(False))
+    ])
+    return rules
+
+def evaluate_tints(tables, combos):
+    """Evaluate every tint compatibility row against its combination and tint."""
+    rows = tables["tintCompatibility"].merge(combos[COMBO_KEY + ["status", "family"]], on=COMBO_KEY, how="left")
+    rows = rows.merge(tables["tints"], on="tintId", how="left", indicator="tintFound")
+    rows = rows.merge(tables["tintFamilies"].assign(familyListed=True), on=["tintId", "family"], how="left")
+
+    low = pd.to_numeric(rows["percentageMin"], errors="coerce")
+    high = pd.to_numeric(rows["percentageMax"], errors="coerce")
+    allowed = flag(rows["allowed"])
+    fixed = rows["tintFixed"]
+    reasons = [
+        ("combination not offered", rows["status"].eq("not_offered")),
+        ("combination contradicted", rows["status"].eq("contradicted")),
+        ("unknown design, material or treatment", rows["status"].isna()),
+        ("unknown tint", rows["tintFound"].eq("left_only")),
+        ("tint not available in material", rows["family"].notna() & rows["familyListed"].isna()
+         & rows["tintFound"].eq("both")),
+        ("percentage range outside tint range", (low > rows["tintMax"]) | (high < rows["tintMin"])),
+        ("fixed percentage outside allowed range", fixed.notna() & ((fixed < low) | (fixed > high)))
+    ]
+    rows["reasons"] = join_reasons(rows.index, [(label, allowed & mask) for label, mask in reasons])
+    rows["tintStatus"] = np.select([~allowed, rows["reasons"] != ""], ["disallowed", "unreachable"], "orderable")
+    return rows.sort_values("row", kind="stable")
+
+def evaluate_chunk(tables):
+    """Evaluate one chunk of designs; safe to run in a worker process."""
+    combos = evaluate_combos(tables)
+    return {
+        "combos": combos,
+        "addPowerRules": evaluate_add_rules(tables, combos),
+        "tints": evaluate_tints(tables, combos)
+    }
+
+def split_tables(tables, chunks):
+    """Split the tables into per-chunk tables by design id."""
+    design_ids = tables["designs"]["designId"].tolist()
+    size = -(-len(design_ids) // chunks) if design_ids else 1
+    for start in range(0, len(design_ids), size):
+        chunk_ids = design_ids[start:start + size]
+        yield {
+            name: table[table["designId"].isin(chunk_ids)] if "designId" in table else table
+            for name, table in tables.items()
+        }
+
+def analyze_combinations(catalog, workers=None):
+    """Evaluate every combination and return combos, ADD rule and tint tables.
+
+    With ``workers`` > 1 designs are split into chunks evaluated in a
+    process pool; every rule row belongs to exactly one design, so chunk
+    results simply concatenate.
+    """
+    tables = prepare_tables(catalog)
+    if not workers or workers <= 1:
+        results = [evaluate_chunk(tables)]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(evaluate_chunk, split_tables(tables, workers * 2)))
+    if not results:
+        results = [evaluate_chunk(tables)]
+
+    analysis = {name: pd.concat([result[name] for result in results], ignore_index=True) for name in results[0]}
+    # Compatibility rows for unknown designs belong to no chunk; evaluate them once
+    orphans = tables["tintCompatibility"][~tables["tintCompatibility"]["designId"].isin(tables["designs"]["designId"])]
+    orphan_rules = tables["addPowerRules"][~tables["addPowerRules"]["designId"].isin(tables["designs"]["designId"])]
+    if workers and workers > 1 and (len(orphans) or len(orphan_rules)):
+        empty = analysis["combos"].iloc[0:0]
+        analysis["tints"] = pd.concat([analysis["tints"], evaluate_tints({**tables, "tintCompatibility": orphans}, empty)])
+        analysis["addPowerRules"] = pd.concat([
+            analysis["addPowerRules"], evaluate_add_rules({**tables, "addPowerRules": orphan_rules}, empty)
+        ])
+    analysis["tints"] = analysis["tints"].sort_values("row", kind="stable").reset_index(drop=True)
+    return analysis
+
+def clean_records(frame, columns):
+    """Convert selected DataFrame columns into JSON-friendly dicts."""
+    frame = frame[columns].astype(object)
+    return frame.where(frame.notna(), None).to_dict("records")
+
+def build_report(catalog, analysis):
+    """Summarize an analysis: status counts, contradictions and unreachable rules."""
+    combos = analysis["combos"]
+    tints = analysis["tints"]
+    add_rules = analysis["addPowerRules"]
+    offered = combos[combos["status"] != "not_offered"]
+
+    unreachable = []
+    for record in clean_records(combos[combos["status"] == "contradicted"], ["availabilityId", "reasons"]):
+        unreachable.append({"sheet": "Availability", "rule": record["availabilityId"], "reason": record["reasons"]})
+    for record in clean_records(add_rules[add_rules["reasons"] != ""], ["id", "reasons"]):
+        unreachable.append({"sheet": "AddPowerRules", "rule": record["id"], "reason": record["reasons"]})
+    for record in clean_records(tints[tints["tintStatus"] == "unreachable"], COMBO_KEY + ["tintId", "reasons"]):
+        rule = "|".join(str(record[field]) for field in COMBO_KEY + ["tintId"])
+        unreachable.append({"sheet": "TintCompatibility", "rule": rule, "reason": record["reasons"]})
+    # Chunked runs append rows of unknown designs last; sort so the report is the same for any worker count
+    unreachable.sort(key=lambda entry: (entry["sheet"], str(entry["rule"]), entry["reason"]))
+
+    return {
+        "buildId": catalog.get("metadata", {}).get("buildId"),
+        "combinations": len(combos),
+        "status": {status: int(count) for status, count in combos["status"].value_counts().items()},
+        "tintStatus": {status: int(count) for status, count in tints["tintStatus"].value_counts().items()},
+        "contradicted": clean_records(combos[combos["status"] == "contradicted"], COMBO_KEY + ["reasons"]),
+        "conflicts": clean_records(offered[offered["conflicts"] != ""], COMBO_KEY + ["conflicts"]),
+        "unreachable": unreachable
+    }
+
+def build_orderable_table(catalog, analysis):
+    """Return the precomputed table of orderable combinations for the runtime."""
+    combos = analysis["combos"]
+    tints = analysis["tints"]
+    orderable = combos[combos["status"] == "orderable"]
+    tint_lists = (tints[tints["tintStatus"] == "orderable"]
+                  .groupby(COMBO_KEY, sort=False)["tintId"].agg(list).rename("tints"))
+    orderable = orderable.merge(tint_lists, left_on=COMBO_KEY, right_index=True, how="left")
+    records = clean_records(orderable, COMBO_KEY + ["rimlessAllowed", "minSegmentHeight", "addMin", "addMax", "tints"])
+    for record in records:
+        record["tints"] = record["tints"] or []
+        record["minSegmentHeight"] = int(record["minSegmentHeight"])
+    return {
+        "version": ORDERABLE_VERSION,
+        "buildId": catalog.get("metadata", {}).get("buildId"),
+        "combos": records
+    }
+
+def load_orderable_table(path, build_id):
+    """Return a cached orderable table if it was built from ``build_id``."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            table = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if table.get("version") != ORDERABLE_VERSION or table.get("buildId") != build_id:
+        return None
+    return table
+
+def parse_args(argv=None):
+    """Parse command line options."""
+    parser = argparse.ArgumentParser(description="Evaluate every catalog combination")
+    parser.add_argument("catalog", nargs="?", default="data/sample_catalog.json",
+                        help="Catalog JSON to analyze")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Evaluate design chunks across this many processes")
+    parser.add_argument("--report", default="data/combination_report.json",
+                        help="Where to write the analysis report")
+    parser.add_argument("--orderable", default="data/orderable_combos.json",
+                        help="Where to write the precomputed orderable table")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """Main combination analysis function."""
+    args = parse_args(argv)
+    catalog_path = Path(args.catalog)
+    if not catalog_path.exists():
+        print(f"❌ Catalog not found: {catalog_path}")
+        sys.exit(1)
+
+    with open(catalog_path, encoding="utf-8") as f:
+        catalog = json.load(f)
+
+    print(f"🔍 Evaluating combinations: {catalog_path}")
+    analysis = analyze_combinations(catalog, workers=args.workers)
+    report = build_report(catalog, analysis)
+    with open(args.report, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    with open(args.orderable, "w", encoding="utf-8") as f:
+        json.dump(build_orderable_table(catalog, analysis), f, ensure_ascii=False, separators=(",", ":"))
+
+    print(f"   Combinations: {report['combinations']}")
+    for status, count in report["status"].items():
+        print(f"   {status}: {count}")
+    for status, count in report["tintStatus"].items():
+        print(f"   tint rows {status}: {count}")
+    print(f"   Conflicts: {len(report['conflicts'])}")
+    print(f"   Unreachable rules: {len(report['unreachable'])}")
+    for rule in report["unreachable"][:10]:
+        print(f"      {rule['sheet']} {rule['rule']}: {rule['reason']}")
+    print(f"✅ Report saved to: {args.report}")
+    print(f"✅ Orderable table saved to: {args.orderable}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+"""Shared pytest fixtures; living at the repo root also puts the scripts on sys.path."""
+
+import copy
+import json
+from pathlib import Path
+
+import pytest
+
+SAMPLE_CATALOG = Path(__file__).parent / "data" / "sample_catalog.json"
+
+@pytest.fixture(scope="session")
+def sample_catalog_data():
+    with open(SAMPLE_CATALOG, encoding="utf-8") as f:
+        return json.load(f)
+
+@pytest.fixture
+def sample_catalog(sample_catalog_data):
+    """A fresh copy of data/sample_catalog.json that tests may modify."""
+    return copy.deepcopy(sample_catalog_data)
+
+@pytest.fixture(scope="session")
+def sample_workbook(tmp_path_factory, sample_catalog_data):
+    """The sample catalog written out as a workbook with every catalog tab."""
+    from build_catalog import write_catalog_workbook
+    path = tmp_path_factory.mktemp("workbook") / "catalog.xlsx"
+    write_catalog_workbook(copy.deepcopy(sample_catalog_data), path)
+    return path
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Typed Excel Ingestion
+Loads the catalog columns of each sheet into compact, explicitly typed
+DataFrames, using the schema recorded in workbook_analysis.json to decide
+how to type them
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+from analyze_excel import iter_sheet_rows
+from build_catalog import SHEET_SPECS, normalize_cell, to_flag, to_float, to_int, to_text
+
+# Text columns with at most this share of distinct values become categoricals
+CATEGORY_RATIO = 0.5
+
+def load_schema(path):
+    """Return the per-sheet schema from a workbook_analysis.json file."""
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)["sheets"]
+
+def column_dtype(convert, column, sheet_schema):
+    """Return the DataFrame dtype for a catalog column.
+
+    The converter build_catalog uses says what a column holds; the
+    recorded null and distinct counts pick the compact form: nullable
+    ``Int64`` only for integer columns with gaps, and ``category`` for
+    repetitive text such as the design/material/treatment ids of a
+    compatibility table.
+    """
+    if convert is to_flag:
+        return "boolean"
+    if convert is to_int:
+        return "Int64" if sheet_schema["null_counts"].get(column) else "int64"
+    if convert is to_float:
+        return "float64"
+    if convert is to_text:
+        rows = sheet_schema["rows"]
+        # A capped count is only a lower bound, too weak to pick a categorical on
+        capped = column in sheet_schema.get("capped_unique_counts", ())
+        if rows and not capped and sheet_schema["unique_counts"].get(column, rows) <= rows * CATEGORY_RATIO:
+            return "category"
+    return "object"
+
+def plan_sheet(sheet_name, sheet_schema, columns=None):
+    """Return [(column, dtype)] to read from a sheet.
+
+    By default these are all the columns build_catalog converts. The
+    schema only picks dtypes, so a column it recorded as empty is still
+    read: an analysis older than the workbook must not hide data.
+    """
+    _, spec = SHEET_SPECS[sheet_name]
+    converters = {column: convert for _, column, convert in spec}
+    if columns is None:
+        columns = list(converters)
+    unknown = [column for column in columns
+               if column not in converters and column not in sheet_schema["column_names"]]
+    if unknown:
+        raise ValueError(f"{sheet_name}: columns not in the catalog spec or the analysis schema: {unknown}")
+    return [(column, column_dtype(converters.get(column), column, sheet_schema)) for column in columns]
+
+def to_whole(value):
+    """Return an integer cell as an int; a fractional value is rejected, not truncated."""
+    if isinstance(value, float) and not value.is_integer():
+        raise ValueError(f"not a whole number: {value!r}")
+    return to_int(value)
+
+def convert_values(values, convert, bad):
+    """Apply a build_catalog converter, turning cells it rejects into None.
+
+    The positions of the rejected cells are appended to ``bad``.
+    """
+    converted = []
+    for position, value in enumerate(values):
+        try:
+            converted.append(convert(value))
+        except (TypeError, ValueError):
+            bad.append(position)
+            converted.append(None)
+    return converted
+
+def to_series(values, dtype, bad=None):
+    """Build a typed column from normalized cell values.
+
+    Cells that do not fit a numeric dtype (text in a number column, a
+    fraction in an integer one) become missing, and their positions are
+    appended to ``bad``.
+    """
+    import numpy as np
+    import pandas as pd
+
+    bad = [] if bad is None else bad
+    if dtype == "boolean":
+        return pd.array([to_flag(value) for value in values], dtype="boolean")
+    if dtype in ("int64", "Int64"):
+        values = convert_values(values, to_whole, bad)
+        # A schema from an older workbook may not know about new gaps
+        if dtype == "int64" and None in values:
+            dtype = "Int64"
+        return pd.array(values, dtype=dtype)
+    if dtype == "float64":
+        values = convert_values(values, to_float, bad)
+        return np.array([np.nan if value is None else value for value in values], dtype=np.float64)
+    text = [to_text(value) for value in values]
+    if dtype == "category":
+        return pd.Categorical(text)
+    return np.array(text, dtype=object)
+
+def read_sheet(worksheet, plan, problems=None):
+    """Stream a read-only worksheet into a DataFrame holding only the planned columns.
+
+    Blank rows are skipped as build_catalog skips them, so frame rows line
+    up with catalog records. Cells that cannot be typed are read as
+    missing and appended to ``problems`` as {"column", "row", "value"},
+    with Excel row numbers.
+    """
+    import pandas as pd
+
+    rows = iter_sheet_rows(worksheet)
+    header = list(next(rows, ()))
+    positions = {name: position for position, name in enumerate(header)}
+    missing = [column for column, _ in plan if column not in positions]
+    if missing:
+        raise ValueError(f"missing columns: {missing}")
+
+    picked = [positions[column] for column, _ in plan]
+    values = [[] for _ in plan]
+    row_numbers = []
+    # Data starts on the row after the header
+    for row_number, row in enumerate(rows, 2):
+        if all(value is None or normalize_cell(value) is None for value in row):
+            continue
+        row_numbers.append(row_number)
+        width = len(row)
+        for column_values, position in zip(values, picked):
+            column_values.append(normalize_cell(row[position]) if position < width else None)
+
+    data = {}
+    for (column, dtype), column_values in zip(plan, values):
+        bad = []
+        data[column] = to_series(column_values, dtype, bad)
+        if problems is not None:
+            problems.extend({"column": column, "row": row_numbers[position], "value": column_values[position]}
+                            for position in bad)
+    return pd.DataFrame(data)
+
+def read_workbook(workbook_path, schema, sheets=None, columns=None, metrics=None, problems=None):
+    """Read catalog sheets into typed DataFrames, keyed by sheet name.
+
+    ``schema`` is the "sheets" part of a workbook analysis of the same
+    workbook. Only sheets with a build_catalog spec are read, so the
+    README tab is never parsed. ``columns`` maps a sheet to the columns
+    to read. Cells that could not be typed are collected per sheet in
+    the ``problems`` dict when given.
+    """
+    from openpyxl import load_workbook
+
+    columns = columns or {}
+    if sheets is None:
+        sheets = [name for name in schema if name in SHEET_SPECS]
+    workbook = load_workbook(workbook_path, read_only=True, data_only=True)
+    frames = {}
+    try:
+        for sheet_name in sheets:
+            if sheet_name not in SHEET_SPECS:
+                raise ValueError(f"no catalog spec for sheet {sheet_name!r}")
+            if sheet_name not in schema:
+                raise ValueError(f"sheet {sheet_name!r} is not in the analysis schema")
+            plan = plan_sheet(sheet_name, schema[sheet_name], columns.get(sheet_name))
+            bad_cells = []
+            if metrics is None:
+                frame = read_sheet(workbook[sheet_name], plan, bad_cells)
+            else:
+                with metrics.stage("ingest_sheet", sheet=sheet_name) as stage:
+                    frame = read_sheet(workbook[sheet_name], plan, bad_cells)
+                    stage["rows"] = len(frame)
+            if bad_cells and problems is not None:
+                problems[sheet_name] = bad_cells
+            frames[sheet_name] = frame
+    finally:
+        workbook.close()
+    return frames
+
+def frame_memory_mb(frame):
+    """Return a DataFrame's memory use in MB, strings included."""
+    return frame.memory_usage(deep=True).sum() / (1024 * 1024)
+
+def parse_args(argv=None):
+    """Parse command line options."""
+    parser = argparse.ArgumentParser(description="Load catalog sheets as typed DataFrames")
+    parser.add_argument("--input", default="data/Optical_Normalized_Catalog_FULL_v2.xlsx",
+                        help="Path to the Excel workbook")
+    parser.add_argument("--schema", default="data/workbook_analysis.json",
+                        help="Analysis of the same workbook written by analyze_excel.py")
+    parser.add_argument("--sheets", nargs="+", default=None,
+                        help="Only read these sheets")
+    parser.add_argument("--compare", action="store_true",
+                        help="Also read each sheet with pandas' default inference and compare")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """Read the workbook with the recorded schema and report time and memory per sheet."""
+    args = parse_args(argv)
+    for path in (Path(args.input), Path(args.schema)):
+        if not path.exists():
+            print(f"❌ File not found: {path}")
+            sys.exit(1)
+
+    schema = load_schema(args.schema)
+    print(f"🔍 Reading {args.input} with the schema in {args.schema}")
+    try:
+        start = time.perf_counter()
+        problems = {}
+        frames = read_workbook(args.input, schema, args.sheets, problems=problems)
+        elapsed = time.perf_counter() - start
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    for sheet_name, frame in frames.items():
+        print(f"   {sheet_name}: {len(frame)} rows | {len(frame.columns)} columns | {frame_memory_mb(frame):.2f} MB")
+    for sheet_name, bad_cells in problems.items():
+        print(f"   ⚠️  {sheet_name}: {len(bad_cells)} cells could not be typed and were read as missing")
+        for cell in bad_cells[:5]:
+            print(f"      row {cell['row']}, {cell['column']}: {cell['value']!r}")
+    print(f"✅ Typed read: {elapsed:.2f}s | {sum(frame_memory_mb(frame) for frame in frames.values()):.2f} MB")
+
+    if args.compare:
+        import pandas as pd
+        start = time.perf_counter()
+        default_frames = pd.read_excel(args.input, sheet_name=list(frames))
+        elapsed = time.perf_counter() - start
+        memory = sum(frame_memory_mb(frame) for frame in default_frames.values())
+        print(f"📊 Default read_excel: {elapsed:.2f}s | {memory:.2f} MB")
+
+if __name__ == "__main__":
+    main()
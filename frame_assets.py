@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""
+Frame Asset Manifest
+Checks every frame heroImage the catalog references, content-hashes the
+images in a thread pool and precomputes downscaled thumbnails for the
+ones that changed, writing a manifest the UI can serve from
+"""
+
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from build_catalog import hash_file, write_json
+from build_metrics import add_metrics_args, metrics_from_args, print_summary, timing_report_path, write_report
+
+MANIFEST_VERSION = 1
+DEFAULT_THUMBNAIL_SIZE = 320
+THUMBNAIL_QUALITY = 85
+
+def load_pillow():
+    """Return PIL.Image, or None when Pillow is not installed."""
+    try:
+        from PIL import Image
+    except ImportError:
+        return None
+    return Image
+
+def load_previous(path):
+    """Load an existing manifest, or an empty one when missing or stale."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {"images": {}}
+    if manifest.get("version") != MANIFEST_VERSION:
+        return {"images": {}}
+    return manifest
+
+def referenced_images(frames):
+    """Map each heroImage filename to the SKUs of the frames that use it."""
+    images = {}
+    for frame in frames:
+        name = frame.get("heroImage")
+        if name:
+            images.setdefault(name, []).append(frame.get("sku"))
+    return images
+
+def resolve_image(images_dir, name):
+    """Return the path of an image inside ``images_dir``, or None if the name escapes it."""
+    path = (images_dir / name).resolve()
+    if images_dir.resolve() not in path.parents:
+        return None
+    return path
+
+def thumbnail_name(content_hash, size):
+    """Thumbnails are named by content, so unchanged images always find theirs."""
+    return f"{content_hash[:16]}_{size}.jpg"
+
+def make_thumbnail(Image, source, target, size):
+    """Write a JPEG of ``source`` scaled to fit ``size`` x ``size``."""
+    with Image.open(source) as image:
+        # Lets the JPEG decoder downscale while decoding instead of after
+        image.draft("RGB", (size, size))
+        image.thumbnail((size, size))
+        if image.mode != "RGB":
+            image = image.convert("RGB")
+        tmp_path = target.with_name(target.name + ".tmp")
+        image.save(tmp_path, "JPEG", quality=THUMBNAIL_QUALITY, optimize=True)
+        width, height = image.size
+    tmp_path.replace(target)
+    return width, height
+
+def process_image(name, images_dir, previous):
+    """Stat and hash one image; runs in a worker thread.
+
+    An image whose size and modification time match the previous manifest
+    keeps its recorded hash instead of being read again.
+    """
+    path = resolve_image(images_dir, name)
+    if path is None:
+        return {"status": "invalid"}
+    try:
+        stat = path.stat()
+    except OSError:
+        return {"status": "missing"}
+
+    entry = {
+        "path": os.path.relpath(path, images_dir.resolve()),
+        "bytes": stat.st_size,
+        "mtimeNs": stat.st_mtime_ns
+    }
+    if previous and previous.get("bytes") == stat.st_size and previous.get("mtimeNs") == stat.st_mtime_ns:
+        entry["hash"] = previous["hash"]
+        hashed = False
+    else:
+        entry["hash"] = hash_file(path)
+        hashed = True
+    return dict(entry, status="ok", hashed=hashed)
+
+def plan_thumbnails(names, results, previous, images_dir, thumbnails_dir, size):
+    """Return (thumbnail -> recorded (width, height), thumbnail -> image to create it from).
+
+    Images with the same content share one thumbnail, so each one is
+    created at most once. A thumbnail that exists and that the previous
+    manifest recorded for the same content is reused.
+    """
+    known = {}
+    jobs = {}
+    for name, result in zip(names, results):
+        if result["status"] != "ok":
+            continue
+        target = thumbnail_name(result["hash"], size)
+        entry = previous["images"].get(name)
+        if entry and entry.get("hash") == result["hash"] and entry.get("thumbnail") == target \
+                and (thumbnails_dir / target).exists():
+            known[target] = (entry.get("width"), entry.get("height"))
+        else:
+            jobs.setdefault(target, images_dir.resolve() / result["path"])
+    for target in known:
+        jobs.pop(target, None)
+    return known, jobs
+
+def create_thumbnail(Image, source, target, size):
+    """Create one thumbnail; returns (width, height) or the OSError that stopped it."""
+    try:
+        return make_thumbnail(Image, source, target, size)
+    except OSError as e:
+        return e
+
+def build_asset_manifest(catalog, images_dir, thumbnails_dir, previous=None, size=DEFAULT_THUMBNAIL_SIZE,
+                         workers=None, metrics=None):
+    """Check, hash and thumbnail every image the catalog's frames reference.
+
+    Returns (manifest, counts). Hashing and decoding release the GIL, so
+    a thread pool keeps the disk and the CPU busy. Images are hashed
+    first, so names that share content get one thumbnail, created once.
+    Without Pillow the manifest is built without thumbnails.
+    """
+    images_dir = Path(images_dir)
+    thumbnails_dir = Path(thumbnails_dir)
+    previous = previous or {"images": {}}
+    Image = load_pillow()
+    if Image is not None:
+        thumbnails_dir.mkdir(parents=True, exist_ok=True)
+    if previous.get("thumbnailSize") != size:
+        # Thumbnails of another size are not reusable
+        previous = {"images": {name: dict(entry, thumbnail=None) for name, entry in previous["images"].items()}}
+
+    references = referenced_images(catalog.get("frames", []))
+    names = sorted(references)
+    counts = dict.fromkeys(("images", "hashed", "thumbnailsCreated", "missing", "invalid", "unreadable"), 0)
+    counts["images"] = len(names)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        def hash_images():
+            return list(executor.map(
+                lambda name: process_image(name, images_dir, previous["images"].get(name)), names))
+
+        def create_thumbnails(jobs):
+            return dict(zip(jobs, executor.map(
+                lambda target: create_thumbnail(Image, jobs[target], thumbnails_dir / target, size), jobs)))
+
+        if metrics is None:
+            results = hash_images()
+        else:
+            with metrics.stage("process_images", rows=len(names)):
+                results = hash_images()
+
+        thumbnails = {}
+        if Image is not None:
+            thumbnails, jobs = plan_thumbnails(names, results, previous, images_dir, thumbnails_dir, size)
+            if metrics is None:
+                created = create_thumbnails(jobs)
+            else:
+                with metrics.stage("create_thumbnails", rows=len(jobs)):
+                    created = create_thumbnails(jobs)
+            for target, outcome in created.items():
+                if not isinstance(outcome, OSError):
+                    counts["thumbnailsCreated"] += 1
+                thumbnails[target] = outcome
+
+    images = {}
+    problems = {}
+    for name, result in zip(names, results):
+        status = result.pop("status")
+        if status == "ok" and Image is not None:
+            target = thumbnail_name(result["hash"], size)
+            outcome = thumbnails[target]
+            if isinstance(outcome, OSError):
+                status = "unreadable"
+                result = dict(result, error=str(outcome))
+            else:
+                result["thumbnail"] = target
+                result["width"], result["height"] = outcome
+        elif status == "ok":
+            result["thumbnail"] = None
+        if status != "ok":
+            result.pop("hashed", None)
+            counts[status] += 1
+            problems[name] = {"status": status, "skus": references[name], **result}
+            continue
+        counts["hashed"] += result.pop("hashed")
+        images[name] = result
+
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "buildId": catalog.get("metadata", {}).get("buildId"),
+        "imagesDir": str(images_dir),
+        "thumbnailsDir": str(thumbnails_dir) if Image is not None else None,
+        "thumbnailSize": size if Image is not None else None,
+        "images": images,
+        "problems": problems
+    }
+    return manifest, counts
+
+def prune_thumbnails(previous, manifest, thumbnails_dir):
+    """Delete thumbnails the previous manifest listed that nothing uses any more."""
+    if manifest["thumbnailSize"] is None:
+        # Built without Pillow: the old thumbnails are still the best there is
+        return 0
+    in_use = {entry["thumbnail"] for entry in manifest["images"].values() if entry.get("thumbnail")}
+    removed = 0
+    for entry in previous.get("images", {}).values():
+        name = entry.get("thumbnail")
+        if name and name not in in_use:
+            try:
+                (Path(thumbnails_dir) / name).unlink()
+                removed += 1
+            except FileNotFoundError:
+                pass
+            in_use.add(name)
+    return removed
+
+def frame_asset(manifest, frame):
+    """Return the manifest entry for a frame's heroImage, or None."""
+    return manifest["images"].get(frame.get("heroImage"))
+
+def parse_args(argv=None):
+    """Parse command line options."""
+    parser = argparse.ArgumentParser(description="Hash frame images and precompute thumbnails")
+    parser.add_argument("--catalog", default="data/sample_catalog.json",
+                        help="Catalog JSON or binary (.ocat) file")
+    parser.add_argument("--images-dir", default="data/images",
+                        help="Directory holding the heroImage files")
+    parser.add_argument("--thumbnails-dir", default="data/thumbnails",
+                        help="Where thumbnails are written")
+    parser.add_argument("--manifest", default="data/frame_assets.json",
+                        help="Where to write the asset manifest")
+    parser.add_argument("--size", type=int, default=DEFAULT_THUMBNAIL_SIZE,
+                        help="Longest thumbnail edge in pixels")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Hashing/thumbnail threads (default: Python's ThreadPoolExecutor default)")
+    add_metrics_args(parser)
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """Build the frame asset manifest."""
+    args = parse_args(argv)
+    catalog_path = Path(args.catalog)
+    images_dir = Path(args.images_dir)
+    for path in (catalog_path, images_dir):
+        if not path.exists():
+            print(f"❌ Not found: {path}")
+            sys.exit(1)
+
+    from catalog_access import load_catalog
+    metrics = metrics_from_args("frame_assets", args)
+    with metrics.stage("load_catalog"):
+        catalog = load_catalog(catalog_path)
+    manifest_path = Path(args.manifest)
+    previous = load_previous(manifest_path)
+
+    print(f"🔍 Checking frame images in {images_dir}")
+    if load_pillow() is None:
+        print("⚠️  Pillow is not installed; writing the manifest without thumbnails")
+    manifest, counts = build_asset_manifest(
+        catalog, images_dir, args.thumbnails_dir, previous, args.size, args.workers, metrics
+    )
+    removed = prune_thumbnails(previous, manifest, args.thumbnails_dir)
+    with metrics.stage("write_manifest"):
+        manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        write_json(manifest_path, manifest)
+
+    print(f"   Images: {counts['images']} | hashed: {counts['hashed']} | "
+          f"thumbnails created: {counts['thumbnailsCreated']} | removed: {removed}")
+    for status in ("missing", "invalid", "unreadable"):
+        if counts[status]:
+            print(f"   ⚠️  {counts[status]} {status} images")
+    print(f"✅ Manifest saved to: {manifest_path}")
+
+    timings_file = Path(args.timings) if args.timings else timing_report_path(manifest_path)
+    print_summary(write_report(metrics, timings_file, args.openmetrics))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Frame Search
+Indexes catalog frames by dimension and attribute so multi-criteria
+searches and nearest-fit lookups avoid scanning every frame
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Searchable fields: name -> dotted field in the frame record
+NUMERIC_FIELDS = {
+    "a": "dimensions.a",
+    "b": "dimensions.b",
+    "dbl": "dimensions.dbl",
+    "ed": "dimensions.ed",
+    "temple": "dimensions.temple",
+    "framePd": "dimensions.framePd"
+}
+CATEGORICAL_FIELDS = {
+    "color": "color",
+    "material": "material",
+    "collection": "collection",
+    "brandModel": "brandModel",
+    "safety": "flags.safety",
+    "sport": "flags.sport",
+    "discontinued": "discontinued",
+    "backordered": "backordered"
+}
+
+def field_value(frame, field):
+    """Return a (possibly nested, dotted) field from a frame record."""
+    parent, _, leaf = field.rpartition(".")
+    if parent:
+        return (frame.get(parent) or {}).get(leaf)
+    return frame.get(field)
+
+def criterion_matches(name, wanted, value):
+    """Return whether one frame value satisfies one search criterion.
+
+    Numeric criteria are (low, high) tuples with None for an open end;
+    categorical criteria are a value or a list/set of accepted values.
+    """
+    if name in NUMERIC_FIELDS:
+        low, high = wanted
+        return value is not None and (low is None or value >= low) and (high is None or value <= high)
+    if isinstance(wanted, (list, tuple, set, frozenset)):
+        return value in wanted
+    return value == wanted
+
+def linear_search(frames, **criteria):
+    """Return positions of matching frames by scanning every frame.
+
+    The reference the index is checked and benchmarked against.
+    """
+    fields = {name: NUMERIC_FIELDS.get(name) or CATEGORICAL_FIELDS[name] for name in criteria}
+    return [
+        position for position, frame in enumerate(frames)
+        if all(criterion_matches(name, wanted, field_value(frame, fields[name]))
+               for name, wanted in criteria.items())
+    ]
+
+class FrameIndex:
+    """Sorted numeric columns plus inverted indexes over frame attributes.
+
+    Columns are numpy arrays: numeric fields as floats (NaN when missing),
+    categorical fields as integer codes (-1 when missing).
+    """
+
+    def __init__(self, frames):
+        self.frames = frames if isinstance(frames, list) else list(frames)
+        self.numeric = {}
+        self.sorted_values = {}
+        self.sorted_positions = {}
+        for name, field in NUMERIC_FIELDS.items():
+            column = np.array([
+                np.nan if value is None else value
+                for value in (field_value(frame, field) for frame in self.frames)
+            ], dtype=np.float64)
+            present = np.flatnonzero(~np.isnan(column))
+            order = present[np.argsort(column[present], kind="stable")]
+            self.numeric[name] = column
+            self.sorted_positions[name] = order
+            self.sorted_values[name] = column[order]
+
+        self.codes = {}
+        self.code_columns = {}
+        self.postings = {}
+        for name, field in CATEGORICAL_FIELDS.items():
+            codes = self.codes[name] = {}
+            column = np.array([
+                -1 if value is None else codes.setdefault(value, len(codes))
+                for value in (field_value(frame, field) for frame in self.frames)
+            ], dtype=np.int32)
+            self.code_columns[name] = column
+            order = np.argsort(column, kind="stable")
+            # Code -1 gets a posting list too, so "field is missing" is searchable
+            bounds = np.searchsorted(column[order], np.arange(-1, len(codes) + 1))
+            self.postings[name] = {code: order[bounds[code + 1]:bounds[code + 2]] for code in range(-1, len(codes))}
+        # (field names) -> (distinct value rows, positions per row), built on first nearest() use
+        self.fit_buckets = {}
+
+    def wanted_codes(self, name, wanted):
+        """Return the codes of the accepted values of a categorical criterion (-1 for None)."""
+        values = wanted if isinstance(wanted, (list, tuple, set, frozenset)) else [wanted]
+        codes = self.codes[name]
+        return sorted({-1 if value is None else codes[value]
+                       for value in values if value is None or value in codes})
+
+    def candidates(self, name, wanted):
+        """Return the positions one criterion allows, found by bisect or posting list."""
+        if name in NUMERIC_FIELDS:
+            low, high = wanted
+            values = self.sorted_values[name]
+            start = 0 if low is None else np.searchsorted(values, low, side="left")
+            end = len(values) if high is None else np.searchsorted(values, high, side="right")
+            return self.sorted_positions[name][start:max(start, end)]
+        postings = [self.postings[name][code] for code in self.wanted_codes(name, wanted)]
+        if len(postings) == 1:
+            return postings[0]
+        return np.concatenate(postings) if postings else np.empty(0, dtype=np.int64)
+
+    def filter_positions(self, positions, criteria):
+        """Keep the positions that satisfy every criterion, checked column-wise."""
+        for name, wanted in criteria.items():
+            if not len(positions):
+                break
+            if name in NUMERIC_FIELDS:
+                low, high = wanted
+                values = self.numeric[name][positions]
+                keep = ~np.isnan(values)
+                if low is not None:
+                    keep &= values >= low
+                if high is not None:
+                    keep &= values <= high
+            else:
+                keep = np.isin(self.code_columns[name][positions], self.wanted_codes(name, wanted))
+            positions = positions[keep]
+        return positions
+
+    def search_positions(self, limit=None, **criteria):
+        """Return positions (in catalog order) of frames matching every criterion.
+
+        The most selective criterion supplies the candidates; the rest are
+        checked on just those rows with vectorized comparisons.
+        """
+        unknown = set(criteria) - set(NUMERIC_FIELDS) - set(CATEGORICAL_FIELDS)
+        if unknown:
+            raise ValueError(f"unknown frame search fields: {', '.join(sorted(unknown))}")
+        if not criteria:
+            positions = range(len(self.frames))
+            return list(positions[:limit] if limit is not None else positions)
+
+        candidates = {name: self.candidates(name, wanted) for name, wanted in criteria.items()}
+        driver = min(candidates, key=lambda name: len(candidates[name]))
+        rest = {name: wanted for name, wanted in criteria.items() if name != driver}
+        found = np.sort(self.filter_positions(candidates[driver], rest))
+        return found[:limit].tolist() if limit is not None else found.tolist()
+
+    def search(self, limit=None, **criteria):
+        """Return the frame records matching every criterion."""
+        return [self.frames[position] for position in self.search_positions(limit, **criteria)]
+
+    def nearest(self, targets, k=5, weights=None, **criteria):
+        """Return up to ``k`` (distance, frame) pairs closest to ``targets``.
+
+        ``targets`` maps numeric fields to wanted values, e.g. a patient's
+        PD and A size; distance is the weighted Euclidean distance over
+        those fields. Frames are bucketed by their target-field values, so
+        only the distinct value combinations are ranked and buckets are
+        opened nearest-first until ``k`` frames passing ``criteria`` are found.
+        """
+        names = tuple(sorted(targets))
+        unknown = set(names) - set(NUMERIC_FIELDS)
+        if unknown:
+            raise ValueError(f"nearest-fit needs numeric fields, not {', '.join(sorted(unknown))}")
+        buckets = self.fit_buckets.get(names)
+        if buckets is None:
+            rows = np.column_stack([self.numeric[name] for name in names])
+            present = np.flatnonzero(~np.isnan(rows).any(axis=1))
+            keys, inverse = np.unique(rows[present], axis=0, return_inverse=True)
+            inverse = inverse.reshape(-1)
+            order = np.argsort(inverse, kind="stable")
+            bounds = np.searchsorted(inverse[order], np.arange(len(keys) + 1))
+            members = [present[order[bounds[bucket]:bounds[bucket + 1]]] for bucket in range(len(keys))]
+            buckets = self.fit_buckets[names] = (keys, members)
+
+        keys, members = buckets
+        weights = weights or {}
+        wanted = np.array([targets[name] for name in names], dtype=np.float64)
+        scale = np.array([weights.get(name, 1.0) for name in names], dtype=np.float64)
+        distances = np.sqrt((((keys - wanted) ** 2) * scale).sum(axis=1))
+        found = []
+        for bucket in np.argsort(distances, kind="stable"):
+            positions = members[bucket]
+            if criteria:
+                positions = self.filter_positions(positions, criteria)
+            for position in positions[:k - len(found)]:
+                found.append((float(distances[bucket]), self.frames[position]))
+            if len(found) == k:
+                break
+        return found
+
+def parse_range(text):
+    """Parse '52-55', '52-', '-55' or '52' into a (low, high) tuple."""
+    low, separator, high = text.partition("-")
+    if not separator:
+        return float(low), float(low)
+    return (float(low) if low else None, float(high) if high else None)
+
+def parse_flag(text):
+    """Parse a yes/no command line value."""
+    return text.strip().lower() in ("y", "yes", "true", "1")
+
+def parse_args(argv=None):
+    """Parse command line options."""
+    parser = argparse.ArgumentParser(description="Search catalog frames by size and attributes")
+    parser.add_argument("--catalog", default="data/sample_catalog.json", help="Catalog JSON to search")
+    for name in NUMERIC_FIELDS:
+        parser.add_argument(f"--{name}", type=parse_range, help=f"{name} range, e.g. 52-55")
+    for name in ("color", "material", "collection"):
+        parser.add_argument(f"--{name}", nargs="+", help=f"Accepted {name} values")
+    for name in ("safety", "sport", "discontinued", "backordered"):
+        parser.add_argument(f"--{name}", type=parse_flag, help="y or n")
+    parser.add_argument("--near", nargs="+", metavar="FIELD=VALUE",
+                        help="Nearest fit instead of a filter, e.g. framePd=64 a=52")
+    parser.add_argument("--limit", type=int, default=20, help="Maximum frames to list")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """Run one frame search from the command line."""
+    args = parse_args(argv)
+    catalog_path = Path(args.catalog)
+    if not catalog_path.exists():
+        print(f"❌ Catalog not found: {catalog_path}")
+        sys.exit(1)
+
+    with open(catalog_path, encoding="utf-8") as f:
+        frames = json.load(f).get("frames", [])
+    index = FrameIndex(frames)
+    criteria = {
+        name: getattr(args, name) for name in list(NUMERIC_FIELDS) + list(CATEGORICAL_FIELDS)
+        if name != "brandModel" and getattr(args, name) is not None
+    }
+
+    start = time.perf_counter()
+    if args.near:
+        targets = {field: float(value) for field, value in (item.split("=", 1) for item in args.near)}
+        results = index.nearest(targets, k=args.limit, **criteria)
+    else:
+        results = [(None, frame) for frame in index.search(limit=args.limit, **criteria)]
+    elapsed = time.perf_counter() - start
+
+    print(f"🔍 {len(results)} frames in {elapsed * 1000:.2f} ms")
+    for distance, frame in results:
+        # Same guard as field_value: a frame may carry "dimensions": null
+        dimensions = frame.get("dimensions") or {}
+        fit = f" (distance {distance:.2f})" if distance is not None else ""
+        print(f"   {frame['sku']} {frame.get('brandModel')} {frame.get('color')} "
+              f"{dimensions.get('a')}-{dimensions.get('dbl')}-{dimensions.get('temple')}{fit}")
+
+if __name__ == "__main__":
+    main()
@@ -4,11 +4,20 @@ Sample Data Generator
 Creates sample catalog.json for development and testing
 """
 
-import json
+import argparse
+import random
 from datetime import datetime
 from pathlib import Path
 
-def generate_sample_catalog():
+from build_metrics import (
+    BuildMetrics, add_metrics_args, metrics_from_args, print_summary, timing_report_path, write_report
+)
+from catalog_binary import write_catalog_binary
+from catalog_compiler import compile_catalog
+from catalog_writer import STYLES, write_catalog
+from tint_matrix import expand_tint_matrix
+
+def generate_sample_catalog(compact_tints=False):
     """Generate a sample catalog with representative data"""
     
     catalog = {
@@ -30,7 +39,7 @@ def generate_sample_catalog():
         "tints": generate_sample_tints(),
         "instructionCodes": generate_sample_instruction_codes(),
         "tintCompatibility": generate_sample_tint_compatibility(),
-        "indexes": {}  # Will be populated by build process
+        "indexes": {}  # Populated by compile_catalog below
     }
     
     # Update total records count
@@ -38,7 +47,7 @@ def generate_sample_catalog():
         len(catalog[key]) for key in catalog if key != "metadata" and key != "indexes"
     )
     
-    return catalog
+    return compile_catalog(catalog, compact_tints=compact_tints)
 
 def generate_sample_materials():
     """Generate sample materials data"""
@@ -98,6 +107,14 @@ def generate_sample_treatments():
             "rimlessAllowed": False,
             "notes": "No rimless frames with polarized",
             "labOutput": "POLARIZED"
+        },
+        {
+            "id": "TINT",
+            "type": "Tint",
+            "colorsAllowed": None,
+            "rimlessAllowed": True,
+            "notes": "Colors per TintCompatibility",
+            "labOutput": "TINT"
         }
     ]
 
@@ -365,25 +382,352 @@ def generate_sample_tint_compatibility():
     
     return compatibility
 
-def main():
+# Value pools for the scaled synthetic generator
+SCALED_MATERIAL_INDEXES = [1.5, 1.53, 1.59, 1.6, 1.67, 1.74]
+SCALED_TREATMENT_TYPES = ["Clear", "Tint", "Transition", "Polarized", "Mirror", "Blue Light"]
+SCALED_DESIGN_CATEGORIES = [
+    ("Single Vision", 5), ("Bifocal", 3), ("Progressive", 4), ("Trifocal", 1)
+]
+SCALED_FRAME_COLORS = [
+    ("BLACK", 30), ("GREY", 15), ("GUNMETAL", 12), ("TORTOISE", 15),
+    ("BROWN", 10), ("BLUE", 8), ("RED", 4), ("GOLD", 6)
+]
+SCALED_FRAME_MATERIALS = [("Plastic", 45), ("Metal", 30), ("Titanium", 10), ("Safety", 10), ("Rimless", 5)]
+SCALED_COLLECTIONS = ["Aeropostale", "Classic", "Sport", "Kids", "Executive", "Studio"]
+SCALED_TINT_COLORS = ["GREY", "BROWN", "G-15", "BLUE", "ROSE", "YELLOW", "GREEN", "PURPLE"]
+SCALED_TINT_STYLES = ["SOLID", "GRADIENT"]
+
+def weighted_choice(rng, weighted_values):
+    """Pick a value from (value, weight) pairs"""
+    values, weights = zip(*weighted_values)
+    return rng.choices(values, weights=weights)[0]
+
+def section_rng(seed, section):
+    """Return an independent, reproducible RNG for one catalog section"""
+    # Separate streams let sections be regenerated on demand with the same
+    # output, so foreign keys stay consistent without holding rows in memory
+    return random.Random(f"{seed}:{section}")
+
+def generate_scaled_materials(count, seed):
+    """Generate ``count`` synthetic materials"""
+    rng = section_rng(seed, "materials")
+    materials = []
+    for number in range(1, count + 1):
+        index = SCALED_MATERIAL_INDEXES[(number - 1) % len(SCALED_MATERIAL_INDEXES)]
+        materials.append({
+            "id": f"MAT{number:03d}",
+            "displayName": f"Material {number} ({index:.2f})",
+            "refractiveIndex": index,
+            "available": rng.random() < 0.9,
+            "rimlessAllowed": index > 1.5 or rng.random() < 0.5,
+            "notes": None,
+            "labOutput": f"{index:.2f} CLEAR"
+        })
+    return materials
+
+def generate_scaled_treatments(count, seed):
+    """Generate ``count`` synthetic treatments, always including CLEAR and TINT"""
+    rng = section_rng(seed, "treatments")
+    treatments = []
+    for number in range(count):
+        treatment_type = SCALED_TREATMENT_TYPES[number % len(SCALED_TREATMENT_TYPES)]
+        if number < 2:
+            treatment_id = treatment_type.upper()
+        else:
+            treatment_id = f"TRT{number:03d}"
+        treatments.append({
+            "id": treatment_id,
+            "type": treatment_type,
+            "colorsAllowed": None,
+            "rimlessAllowed": treatment_type != "Polarized" and rng.random() < 0.9,
+            "notes": None,
+            "labOutput": treatment_id
+        })
+    return treatments
+
+def generate_scaled_designs(count, seed):
+    """Generate ``count`` synthetic lens designs"""
+    rng = section_rng(seed, "designs")
+    designs = []
+    for number in range(1, count + 1):
+        category = SCALED_DESIGN_CATEGORIES[0][0] if number == 1 else weighted_choice(rng, SCALED_DESIGN_CATEGORIES)
+        segment_size = float(rng.choice([25, 28, 35])) if category in ("Bifocal", "Trifocal") else None
+        designs.append({
+            "id": f"DSN{number:03d}",
+            "category": category,
+            "segmentType": "FT" if segment_size else None,
+            "segmentSize": segment_size,
+            "minSegmentHeight": rng.choice([14, 16, 18]) if category == "Progressive" else 0,
+            "discontinued": rng.random() < 0.05,
+            "notes": None,
+            "labOutput": f"DSN-{number:03d}",
+            "segmentOutput": segment_size
+        })
+    return designs
+
+def generate_scaled_tints(count, seed):
+    """Generate ``count`` synthetic tints"""
+    rng = section_rng(seed, "tints")
+    tints = []
+    for number in range(count):
+        color = SCALED_TINT_COLORS[number % len(SCALED_TINT_COLORS)]
+        style = SCALED_TINT_STYLES[(number // len(SCALED_TINT_COLORS)) % len(SCALED_TINT_STYLES)]
+        fixed = rng.random() < 0.15
+        tints.append({
+            "id": f"TINT{number:03d}_{color}_{style}",
+            "category": "Mirror" if fixed else "Base",
+            "colorName": color,
+            "style": None if fixed else style,
+            "percentageMin": None if fixed else 10.0,
+            "percentageMax": None if fixed else rng.choice([50.0, 75.0, 85.0]),
+            "fixedPercentage": 75.0 if fixed else None,
+            "availableIn": rng.sample(["Plastic", "Trivex", "Poly", "1.60", "1.67", "Glass"], 3),
+            "notes": None,
+            "labOutput": f"{color} {style} {{PCT}}%"
+        })
+    return tints
+
+def generate_scaled_frames(count, seed):
+    """Yield ``count`` synthetic frames with realistic size distributions"""
+    rng = section_rng(seed, "frames")
+    for number in range(count):
+        a = max(42, min(64, round(rng.gauss(52, 3))))
+        b = max(24, min(48, round(rng.gauss(36, 4))))
+        dbl = max(14, min(24, round(rng.gauss(18, 1.5))))
+        color = weighted_choice(rng, SCALED_FRAME_COLORS)
+        material = weighted_choice(rng, SCALED_FRAME_MATERIALS)
+        safety = material == "Safety" or rng.random() < 0.02
+        model = f"{1000 + number % 9000}"
+        # Unique 12-digit SKUs without tracking the ones already issued
+        sku = 880000000000 + number
+        yield {
+            "id": sku,
+            "brandModel": model,
+            "sku": sku,
+            "color": color,
+            "material": material,
+            "dimensions": {
+                "a": a,
+                "b": b,
+                "dbl": dbl,
+                "ed": None,
+                "temple": rng.choice([135, 140, 145, 150]),
+                "framePd": a + dbl
+            },
+            "collection": rng.choice(SCALED_COLLECTIONS) if rng.random() < 0.3 else None,
+            "flags": {
+                "safety": safety,
+                "sport": rng.random() < 0.05
+            },
+            "sideShieldSku": 890000000000 + number if safety else None,
+            "heroImage": f"{model}_{a}_{color}_Hero.jpg",
+            "discontinued": rng.random() < 0.03,
+            "backordered": rng.random() < 0.02,
+            "notes": None
+        }
+
+def generate_scaled_availability(designs, materials, treatments, seed):
+    """Yield availability rows over a subset of design/material/treatment combos"""
+    rng = section_rng(seed, "availability")
+    treatment_lookup = {treatment["id"]: treatment for treatment in treatments}
+    for material in materials:
+        for design in designs:
+            for treatment_id, treatment in treatment_lookup.items():
+                # Every material stays orderable in SV/CLEAR
+                if not (design is designs[0] and treatment_id == "CLEAR") and rng.random() > 0.6:
+                    continue
+                yield {
+                    "id": f"{material['id']}_{design['id']}_{treatment_id}",
+                    "designId": design["id"],
+                    "materialId": material["id"],
+                    "treatmentId": treatment_id,
+                    "available": rng.random() < 0.9,
+                    "rimlessAllowed": material["rimlessAllowed"] and treatment["rimlessAllowed"],
+                    "colorLimits": None,
+                    "minSegmentHeight": design["minSegmentHeight"],
+                    "substitution": None,
+                    "leadTimeWeeks": rng.choice([None, None, None, 2.0, 4.0]),
+                    "notes": None
+                }
+
+def generate_scaled_add_power_rules(designs, materials, treatments, seed):
+    """Yield ADD power rules for every multifocal availability row"""
+    rng = section_rng(seed, "addPowerRules")
+    multifocal = {design["id"] for design in designs if design["category"] != "Single Vision"}
+    for row in generate_scaled_availability(designs, materials, treatments, seed):
+        if row["designId"] not in multifocal:
+            continue
+        add_max = rng.choice([3.0, 3.5, 4.0, 6.0])
+        yield {
+            "id": row["id"],
+            "designId": row["designId"],
+            "materialId": row["materialId"],
+            "treatmentId": row["treatmentId"],
+            "addMin": 0.75,
+            "addMax": add_max,
+            "incrementRule": f">+{add_max:.2f} in 0.50 steps" if rng.random() < 0.2 else None,
+            "notes": None
+        }
+
+def generate_scaled_tint_compatibility(designs, materials, treatments, tints, seed):
+    """Yield tint compatibility rows for every available TINT combo"""
+    rng = section_rng(seed, "tintCompatibility")
+    for row in generate_scaled_availability(designs, materials, treatments, seed):
+        if row["treatmentId"] != "TINT":
+            continue
+        for tint in tints:
+            allowed = rng.random() < 0.8
+            ranged = allowed and tint["fixedPercentage"] is None
+            yield {
+                "designId": row["designId"],
+                "materialId": row["materialId"],
+                "treatmentId": row["treatmentId"],
+                "tintId": tint["id"],
+                "allowed": allowed,
+                "styleRequired": "match" if allowed else None,
+                "percentageMin": tint["percentageMin"] if ranged else None,
+                "percentageMax": tint["percentageMax"] if ranged else None,
+                "notes": None
+            }
+
+def generate_scaled_sections(frames=1000, materials=6, designs=12, treatments=5, tints=20, seed=42):
+    """Return catalog sections for a synthetic catalog of the requested size
+
+    Small reference sections are lists; frames and the rule sections are
+    generators so arbitrarily large catalogs can be streamed to disk.
+    """
+    material_rows = generate_scaled_materials(materials, seed)
+    treatment_rows = generate_scaled_treatments(max(treatments, 2), seed)
+    design_rows = generate_scaled_designs(designs, seed)
+    tint_rows = generate_scaled_tints(tints, seed)
+    return {
+        "materials": material_rows,
+        "treatments": treatment_rows,
+        "designs": design_rows,
+        "frames": generate_scaled_frames(frames, seed),
+        "addPowerRules": generate_scaled_add_power_rules(design_rows, material_rows, treatment_rows, seed),
+        "availability": generate_scaled_availability(design_rows, material_rows, treatment_rows, seed),
+        "tints": tint_rows,
+        "instructionCodes": generate_sample_instruction_codes(),
+        "tintCompatibility": generate_scaled_tint_compatibility(
+            design_rows, material_rows, treatment_rows, tint_rows, seed
+        )
+    }
+
+def generate_scaled_catalog(path, frames=1000, materials=6, designs=12, treatments=5, tints=20, seed=42,
+                            style="compact", metrics=None):
+    """Stream a reproducible synthetic catalog of the requested size to ``path``
+
+    Frames are generated while they are written, so memory use does not grow
+    with the frame count. Returns the per-section record counts.
+    """
+    metrics = metrics or BuildMetrics("generate_sample_data")
+    metadata = {
+        "version": "2.0-synthetic",
+        "lastUpdated": datetime.now().isoformat(),
+        "sourceFile": "Synthetic_Data_Generated",
+        "validationStatus": "valid",
+        "buildId": f"synthetic-s{seed}-f{frames}-m{materials}-d{designs}-t{treatments}-n{tints}",
+        "tabCount": 10,
+        "totalRecords": 0
+    }
+    with metrics.stage("generate_sections"):
+        sections = generate_scaled_sections(frames, materials, designs, treatments, tints, seed)
+    return write_catalog(path, {"metadata": metadata, **sections, "indexes": {}}, style, metrics)
+
+def parse_args(argv=None):
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="Generate sample catalog data")
+    parser.add_argument("--compact-tints", action="store_true",
+                        help="Store tint compatibility as a packed tintMatrix section")
+    parser.add_argument("--format", choices=["json", "binary", "both"], default="json",
+                        help="Write JSON, the binary .ocat format, or both")
+    parser.add_argument("--json-style", choices=STYLES, default=None,
+                        help="pretty, compact, or one JSON Lines file per section "
+                             "(default: pretty for the sample, compact for --scaled)")
+    scaled = parser.add_argument_group("scaled synthetic catalog")
+    scaled.add_argument("--scaled", action="store_true",
+                        help="Stream a synthetic catalog of the requested size instead of the sample")
+    scaled.add_argument("--frames", type=int, default=1000, help="Number of frames")
+    scaled.add_argument("--materials", type=int, default=6, help="Number of materials")
+    scaled.add_argument("--designs", type=int, default=12, help="Number of designs")
+    scaled.add_argument("--treatments", type=int, default=5, help="Number of treatments (min 2)")
+    scaled.add_argument("--tints", type=int, default=20, help="Number of tints")
+    scaled.add_argument("--seed", type=int, default=42, help="Random seed for reproducible output")
+    scaled.add_argument("--output", default="data/synthetic_catalog.json",
+                        help="Output path for the synthetic catalog")
+    add_metrics_args(parser)
+    return parser.parse_args(argv)
+
+def save_catalog(catalog, output_dir, stem, output_format="json", metrics=None, style="pretty"):
+    """Write the catalog as JSON and/or binary and return the written paths"""
+    metrics = metrics or BuildMetrics("generate_sample_data")
+    rows = catalog["metadata"].get("totalRecords")
+    paths = []
+    if output_format in ("json", "both"):
+        json_path = output_dir / f"{stem}.json"
+        with metrics.stage("write_json", rows=rows, catalog=stem):
+            write_catalog(json_path, catalog, style)
+        paths.append(json_path.with_suffix("") if style == "jsonl" else json_path)
+    if output_format in ("binary", "both"):
+        binary_path = output_dir / f"{stem}.ocat"
+        with metrics.stage("write_binary", rows=rows, catalog=stem):
+            write_catalog_binary(catalog, binary_path)
+        paths.append(binary_path)
+    return paths
+
+def save_timings(metrics, args, output_path):
+    """Write the timing report next to ``output_path`` unless --timings says otherwise"""
+    timings_path = Path(args.timings) if args.timings else timing_report_path(output_path)
+    report = write_report(metrics, timings_path, args.openmetrics)
+    print(f"✅ Timings saved to: {timings_path}")
+    print_summary(report)
+
+def main(argv=None):
     """Generate sample catalog and save to file"""
     
+    args = parse_args(argv)
+    metrics = metrics_from_args("generate_sample_data", args)
+    
+    if args.scaled:
+        print("🔄 Generating synthetic catalog data...")
+        output_path = Path(args.output)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        counts = generate_scaled_catalog(
+            output_path, frames=args.frames, materials=args.materials, designs=args.designs,
+            treatments=args.treatments, tints=args.tints, seed=args.seed,
+            style=args.json_style or "compact", metrics=metrics
+        )
+        print(f"✅ Synthetic catalog generated: {output_path}")
+        print(f"📊 Data Summary:")
+        for section, count in counts.items():
+            print(f"   {section}: {count}")
+        print(f"   Total Records: {sum(counts.values())}")
+        save_timings(metrics, args, output_path)
+        return
+    
     print("🔄 Generating sample catalog data...")
     
     # Generate sample catalog
-    catalog = generate_sample_catalog()
+    with metrics.stage("generate_catalog") as stage:
+        catalog = generate_sample_catalog(compact_tints=args.compact_tints)
+        stage["rows"] = catalog["metadata"]["totalRecords"]
+    if args.compact_tints:
+        tint_compatibility = expand_tint_matrix(catalog["tintMatrix"])
+    else:
+        tint_compatibility = catalog["tintCompatibility"]
     
     # Create output directory if it doesn't exist
     output_dir = Path("data")
     output_dir.mkdir(exist_ok=True)
     
     # Save to file
-    output_path = output_dir / "sample_catalog.json"
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(catalog, f, indent=2, ensure_ascii=False)
+    style = args.json_style or "pretty"
+    output_paths = save_catalog(catalog, output_dir, "sample_catalog", args.format, metrics, style)
     
     # Generate summary
-    print(f"✅ Sample catalog generated: {output_path}")
+    for output_path in output_paths:
+        print(f"✅ Sample catalog generated: {output_path}")
     print(f"📊 Data Summary:")
     print(f"   Materials: {len(catalog['materials'])}")
     print(f"   Treatments: {len(catalog['treatments'])}")
@@ -393,7 +737,7 @@ def main():
     print(f"   Availability Rules: {len(catalog['availability'])}")
     print(f"   Tints: {len(catalog['tints'])}")
     print(f"   Instruction Codes: {len(catalog['instructionCodes'])}")
-    print(f"   Tint Compatibility: {len(catalog['tintCompatibility'])}")
+    print(f"   Tint Compatibility: {len(tint_compatibility)}")
     print(f"   Total Records: {catalog['metadata']['totalRecords']}")
     
     # Also create a minimal version for quick testing
@@ -407,7 +751,7 @@ def main():
         "availability": catalog["availability"][:2],
         "tints": catalog["tints"][:2],
         "instructionCodes": catalog["instructionCodes"][:2],
-        "tintCompatibility": catalog["tintCompatibility"][:4],
+        "tintCompatibility": tint_compatibility[:4],
         "indexes": {}
     }
     
@@ -415,13 +759,14 @@ def main():
         len(minimal_catalog[key]) for key in minimal_catalog if key != "metadata" and key != "indexes"
     )
     minimal_catalog["metadata"]["version"] = "2.0-minimal"
+    compile_catalog(minimal_catalog, compact_tints=args.compact_tints)
     
-    minimal_path = output_dir / "minimal_catalog.json"
-    with open(minimal_path, 'w', encoding='utf-8') as f:
-        json.dump(minimal_catalog, f, indent=2, ensure_ascii=False)
+    minimal_paths = save_catalog(minimal_catalog, output_dir, "minimal_catalog", args.format, metrics, style)
     
-    print(f"✅ Minimal catalog generated: {minimal_path}")
+    for minimal_path in minimal_paths:
+        print(f"✅ Minimal catalog generated: {minimal_path}")
     print(f"   Total Records: {minimal_catalog['metadata']['totalRecords']}")
+    save_timings(metrics, args, output_dir / "sample_catalog.json")
 
 if __name__ == "__main__":
     main()
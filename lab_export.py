@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+"""
+Lab Text Exporter
+Renders batches of orders into lab-ready text using the catalog's
+labOutput/outputTemplate fields, compiled once into reusable formatters
+"""
+
+import argparse
+import csv
+import itertools
+import json
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+PCT_PLACEHOLDER = "{PCT}"
+
+# Orders handed to a worker at a time, and the write buffer for output files
+CHUNK_SIZE = 500
+WRITE_BUFFER = 1 << 20
+
+# Separator for list fields in CSV order files (treatments, tints, ...)
+CSV_LIST_SEPARATOR = ";"
+
+def format_percentage(value):
+    """Format a tint percentage the way lab templates expect (25, 37.5)."""
+    return f"{float(value):g}"
+
+def compile_template(template):
+    """Return a function that fills ``{PCT}`` in ``template``.
+
+    The template is split once so each render is a single join instead of
+    a search-and-replace.
+    """
+    parts = template.split(PCT_PLACEHOLDER)
+    if len(parts) == 1:
+        return lambda percentage=None: template
+
+    def fill(percentage=None):
+        if percentage is None:
+            raise ValueError(f"'{template}' needs a percentage")
+        return format_percentage(percentage).join(parts)
+    return fill
+
+class LabTextExporter:
+    """Lab text renderer with every catalog template precompiled."""
+
+    def __init__(self, catalog):
+        self.materials = {row["id"]: row.get("labOutput") or row["id"] for row in catalog.get("materials", [])}
+        self.designs = {row["id"]: row.get("labOutput") or row["id"] for row in catalog.get("designs", [])}
+        self.treatments = {row["id"]: row.get("labOutput") or row["id"] for row in catalog.get("treatments", [])}
+        self.tints = {
+            row["id"]: (compile_template(row.get("labOutput") or row["id"]), row.get("fixedPercentage"))
+            for row in catalog.get("tints", [])
+        }
+        self.instructions = {
+            row["code"]: compile_template(row.get("outputTemplate") or row["code"])
+            for row in catalog.get("instructionCodes", [])
+        }
+
+    def lookup(self, table, kind, key):
+        """Return a compiled entry, naming the missing id on failure."""
+        try:
+            return table[key]
+        except KeyError:
+            raise ValueError(f"unknown {kind} '{key}'") from None
+
+    def render_tint(self, tint, default_percentage):
+        """Render one order tint, given as an id or {"id", "percentage"}."""
+        if isinstance(tint, dict):
+            tint_id, percentage = tint["id"], tint.get("percentage")
+        else:
+            tint_id, percentage = tint, None
+        fill, fixed_percentage = self.lookup(self.tints, "tint", tint_id)
+        if fixed_percentage is not None:
+            percentage = fixed_percentage
+        elif percentage is None:
+            percentage = default_percentage
+        return fill(percentage)
+
+    def render_instruction(self, instruction, default_percentage):
+        """Render one instruction, given as a code or {"code", "value"}."""
+        if isinstance(instruction, dict):
+            code, value = instruction["code"], instruction.get("value")
+        else:
+            code, value = instruction, None
+        fill = self.lookup(self.instructions, "instruction code", code)
+        return fill(default_percentage if value is None else value)
+
+    def render(self, order):
+        """Return the lab text for one order in the API spec's standard format."""
+        lens = order["lensConfig"]
+        tint_percentage = order.get("tintPercentage")
+        lines = [
+            f"ORDER: {order['frameId']}",
+            f"MATERIAL: {self.lookup(self.materials, 'material', lens['material'])}",
+            f"DESIGN: {self.lookup(self.designs, 'design', lens['design'])}",
+            f"SPHERE: {float(lens['sphere']):+.2f}",
+            f"CYLINDER: {float(lens.get('cylinder') or 0):+.2f}",
+            f"AXIS: {int(lens.get('axis') or 0):03d}"
+        ]
+        if lens.get("addPower") is not None:
+            lines.append(f"ADD: {float(lens['addPower']):+.2f}")
+        treatments = [
+            self.lookup(self.treatments, "treatment", treatment_id)
+            for treatment_id in order.get("treatments", [])
+        ]
+        tints = [self.render_tint(tint, tint_percentage) for tint in order.get("tints", [])]
+        instructions = [
+            self.render_instruction(instruction, tint_percentage)
+            for instruction in order.get("specialInstructions", [])
+        ]
+        lines.append(f"TREATMENTS: {', '.join(treatments) or 'None'}")
+        lines.append(f"TINTS: {', '.join(tints) or 'None'}")
+        lines.append(f"INSTRUCTIONS: {', '.join(instructions) or 'Standard processing'}")
+        return "\n".join(lines) + "\n"
+
+def split_list(value):
+    """Split a CSV list cell into its non-empty items."""
+    return [item.strip() for item in (value or "").split(CSV_LIST_SEPARATOR) if item.strip()]
+
+def csv_row_to_order(row):
+    """Convert one flat CSV order row into the nested order shape."""
+    lens = {"material": row["material"], "design": row["design"], "sphere": row["sphere"]}
+    for field in ("cylinder", "axis", "addPower"):
+        if row.get(field) not in (None, ""):
+            lens[field] = row[field]
+    order = {
+        "frameId": row["frameId"],
+        "lensConfig": lens,
+        "treatments": split_list(row.get("treatments")),
+        "tints": split_list(row.get("tints")),
+        "specialInstructions": split_list(row.get("specialInstructions"))
+    }
+    if row.get("id"):
+        order["id"] = row["id"]
+    if row.get("tintPercentage") not in (None, ""):
+        order["tintPercentage"] = row["tintPercentage"]
+    return order
+
+def iter_orders(path):
+    """Stream orders from a JSONL or CSV file without loading it whole.
+
+    JSONL lines are yielded unparsed; render_chunk decodes them, so with a
+    worker pool the parsing happens in the workers rather than here.
+    """
+    path = Path(path)
+    with open(path, encoding="utf-8", newline="") as f:
+        if path.suffix.lower() == ".csv":
+            for row in csv.DictReader(f):
+                yield csv_row_to_order(row)
+        else:
+            for line in f:
+                if line.strip():
+                    yield line
+
+def iter_chunks(items, size):
+    """Yield lists of up to ``size`` items."""
+    iterator = iter(items)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+def render_chunk(exporter, chunk):
+    """Render a chunk of (number, order) pairs into (number, order id, text, error)."""
+    rendered = []
+    for number, order in chunk:
+        order_id = f"order-{number:06d}"
+        try:
+            if isinstance(order, str):
+                order = json.loads(order)
+            order_id = str(order.get("id") or order_id)
+            rendered.append((number, order_id, exporter.render(order), None))
+        except KeyError as e:
+            rendered.append((number, order_id, None, f"missing field {e}"))
+        except (TypeError, ValueError) as e:
+            rendered.append((number, order_id, None, str(e)))
+    return rendered
+
+# Per-process exporter, built once by init_worker so templates compile once per worker
+WORKER_EXPORTER = None
+
+def init_worker(catalog_path):
+    """Load the catalog and compile its templates in a pool worker."""
+    global WORKER_EXPORTER
+    from catalog_access import load_catalog
+    WORKER_EXPORTER = LabTextExporter(load_catalog(catalog_path))
+
+def render_chunk_in_worker(chunk):
+    """Render a chunk with the worker's exporter."""
+    return render_chunk(WORKER_EXPORTER, chunk)
+
+def iter_rendered(catalog_path, orders, workers=None, chunk_size=CHUNK_SIZE):
+    """Yield rendered chunks in input order.
+
+    With more than one worker, chunks are rendered in a process pool with a
+    bounded number in flight, so memory stays flat however long the input.
+    """
+    chunks = iter_chunks(enumerate(orders, 1), chunk_size)
+    if not workers or workers <= 1:
+        from catalog_access import load_catalog
+        exporter = LabTextExporter(load_catalog(catalog_path))
+        for chunk in chunks:
+            yield render_chunk(exporter, chunk)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                             initargs=(str(catalog_path),)) as executor:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(executor.submit(render_chunk_in_worker, chunk))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+def order_file(output_dir, order_id):
+    """Return an order's text file in ``output_dir``, or None if its id is not a plain file name."""
+    name = f"{order_id}.txt"
+    path = (output_dir / name).resolve()
+    if order_id in (None, "") or path.parent != output_dir.resolve() or path.name != name:
+        return None
+    return path
+
+def export_orders(catalog_path, orders_path, output_path, workers=None, per_order=False,
+                  chunk_size=CHUNK_SIZE):
+    """Render every order in ``orders_path`` to lab text.
+
+    Writes one combined batch file (orders separated by a blank line) to
+    ``output_path``, or with ``per_order=True`` one ``<order id>.txt`` per
+    order inside the ``output_path`` directory. Orders that cannot be
+    rendered are skipped and returned as errors, as are per-order files
+    whose id is not a plain file name or was already written.
+    """
+    output_path = Path(output_path)
+    if per_order:
+        output_path.mkdir(parents=True, exist_ok=True)
+        batch = None
+    else:
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        batch = open(output_path, "w", encoding="utf-8", newline="\n", buffering=WRITE_BUFFER)
+
+    exported = 0
+    errors = []
+    written = set()
+    try:
+        for rendered in iter_rendered(catalog_path, iter_orders(orders_path), workers, chunk_size):
+            for number, order_id, text, error in rendered:
+                if error is not None:
+                    errors.append({"order": number, "id": order_id, "error": error})
+                    continue
+                if batch is None:
+                    path = order_file(output_path, order_id)
+                    if path is None or path in written:
+                        problem = "order id is not a valid file name" if path is None else "duplicate order id"
+                        errors.append({"order": number, "id": order_id, "error": problem})
+                        continue
+                    written.add(path)
+                    with open(path, "w", encoding="utf-8", newline="\n") as f:
+                        f.write(text)
+                else:
+                    if exported:
+                        batch.write("\n")
+                    batch.write(text)
+                exported += 1
+    finally:
+        if batch is not None:
+            batch.close()
+
+    return {"exported": exported, "errors": errors, "output": str(output_path)}
+
+def parse_args(argv=None):
+    """Parse command line options."""
+    parser = argparse.ArgumentParser(description="Export orders to lab-ready text")
+    parser.add_argument("orders", help="Orders file (.jsonl or .csv)")
+    parser.add_argument("--catalog", default="data/sample_catalog.json",
+                        help="Catalog JSON or binary (.ocat) file")
+    parser.add_argument("--output", default="data/lab_orders.txt",
+                        help="Batch text file, or a directory with --per-order")
+    parser.add_argument("--per-order", action="store_true",
+                        help="Write one text file per order instead of a single batch file")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Render chunks of orders across this many processes")
+    parser.add_argument("--errors", help="Write rejected orders to this JSON file")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """Main export function."""
+    args = parse_args(argv)
+    for path in (Path(args.orders), Path(args.catalog)):
+        if not path.exists():
+            print(f"❌ File not found: {path}")
+            sys.exit(1)
+
+    print(f"🧾 Exporting orders: {args.orders}")
+    result = export_orders(args.catalog, args.orders, args.output,
+                           workers=args.workers, per_order=args.per_order)
+    print(f"✅ {result['exported']} orders written to: {result['output']}")
+
+    if args.errors:
+        with open(args.errors, "w", encoding="utf-8") as f:
+            json.dump(result["errors"], f, indent=2, ensure_ascii=False)
+
+    if result["errors"]:
+        print(f"❌ {len(result['errors'])} orders rejected")
+        for error in result["errors"][:20]:
+            print(f"   #{error['order']} {error['id']}: {error['error']}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Order Option Resolver
+Precomputes the reachable frame → material → design → treatment → tint
+options for a catalog and answers "what is still selectable" queries from
+a bounded LRU cache
+"""
+
+from collections import OrderedDict
+from functools import lru_cache
+
+from catalog_compiler import build_tint_indexes, combo_key
+
+DEFAULT_CACHE_SIZE = 4096
+
+# Resolvers kept alive per catalog buildId by get_resolver()
+RESOLVER_LIMIT = 4
+
+# Frame materials that mean the lenses are mounted without a rim
+RIMLESS_FRAME_MATERIALS = {"rimless", "drill mount", "3-piece"}
+
+def is_rimless_frame(frame):
+    """Return whether a frame needs rimless-compatible lenses."""
+    if "rimless" in frame:
+        return bool(frame["rimless"])
+    return str(frame.get("material") or "").strip().lower() in RIMLESS_FRAME_MATERIALS
+
+def load_combo_tints(catalog):
+    """Return combo key -> allowed tint ids from whichever form the catalog has."""
+    if "tintMatrix" in catalog:
+        from tint_matrix import TintMatrix
+        matrix = TintMatrix(catalog["tintMatrix"])
+        return {
+            combo_key(design_id, material_id, treatment_id): tuple(
+                matrix.allowed_tints(design_id, material_id, treatment_id)
+            )
+            for design_id in catalog["tintMatrix"]["designs"]
+            for material_id in catalog["tintMatrix"]["materials"]
+            for treatment_id in catalog["tintMatrix"]["treatments"]
+        }
+    combo_tints = catalog.get("indexes", {}).get("comboTints")
+    if combo_tints is None:
+        combo_tints, _ = build_tint_indexes(catalog.get("tintCompatibility", []))
+    return {key: tuple(tints) for key, tints in combo_tints.items()}
+
+class OrderCombo:
+    """One orderable material/design/treatment combination."""
+
+    __slots__ = ("material_id", "design_id", "treatment_id", "rimless_allowed",
+                 "min_segment_height", "add_min", "add_max", "tints")
+
+    def __init__(self, material_id, design_id, treatment_id, rimless_allowed,
+                 min_segment_height, add_min, add_max, tints):
+        self.material_id = material_id
+        self.design_id = design_id
+        self.treatment_id = treatment_id
+        self.rimless_allowed = rimless_allowed
+        self.min_segment_height = min_segment_height
+        self.add_min = add_min
+        self.add_max = add_max
+        self.tints = tints
+
+    def accepts(self, rimless, material_id, design_id, treatment_id, tint_id, add_power, seg_height):
+        """Return whether the combo survives a set of partial selections."""
+        if rimless and not self.rimless_allowed:
+            return False
+        if material_id is not None and material_id != self.material_id:
+            return False
+        if design_id is not None and design_id != self.design_id:
+            return False
+        if treatment_id is not None and treatment_id != self.treatment_id:
+            return False
+        if tint_id is not None and tint_id not in self.tints:
+            return False
+        if add_power is not None and self.add_min is not None and self.add_max is not None:
+            if not self.add_min <= add_power <= self.add_max:
+                return False
+        if seg_height is not None and self.min_segment_height and seg_height < self.min_segment_height:
+            return False
+        return True
+
+class OptionResolver:
+    """Answers cascading order-option queries for one catalog build."""
+
+    def __init__(self, catalog, cache_size=DEFAULT_CACHE_SIZE):
+        self.build_id = catalog.get("metadata", {}).get("buildId")
+        self.frames = {
+            str(frame["sku"]): frame
+            for frame in catalog.get("frames", [])
+            if not frame.get("discontinued")
+        }
+        self.order = {
+            section: {row["id"]: position for position, row in enumerate(catalog.get(section, []))}
+            for section in ("materials", "designs", "treatments", "tints")
+        }
+        self.combos = self.build_combos(catalog)
+        # Edges of the option graph: each chosen id -> the combos it reaches
+        self.by_choice = {"material": {}, "design": {}, "treatment": {}, "tint": {}}
+        for combo in self.combos:
+            self.by_choice["material"].setdefault(combo.material_id, []).append(combo)
+            self.by_choice["design"].setdefault(combo.design_id, []).append(combo)
+            self.by_choice["treatment"].setdefault(combo.treatment_id, []).append(combo)
+            for tint_id in combo.tints:
+                self.by_choice["tint"].setdefault(tint_id, []).append(combo)
+        self.resolve = lru_cache(maxsize=cache_size)(self.compute_options)
+
+    def build_combos(self, catalog):
+        """Join availability with the entity flags, ADD rules and tints once."""
+        materials = {row["id"]: row for row in catalog.get("materials", [])}
+        designs = {row["id"]: row for row in catalog.get("designs", [])}
+        treatments = {row["id"]: row for row in catalog.get("treatments", [])}
+        add_rules = {
+            combo_key(row["designId"], row["materialId"], row["treatmentId"]): row
+            for row in catalog.get("addPowerRules", [])
+        }
+        combo_tints = load_combo_tints(catalog)
+
+        combos = []
+        for row in catalog.get("availability", []):
+            material = materials.get(row["materialId"])
+            design = designs.get(row["designId"])
+            treatment = treatments.get(row["treatmentId"])
+            if not row.get("available") or material is None or design is None or treatment is None:
+                continue
+            if not material.get("available", True) or design.get("discontinued"):
+                continue
+            key = combo_key(row["designId"], row["materialId"], row["treatmentId"])
+            add_rule = add_rules.get(key, {})
+            combos.append(OrderCombo(
+                material_id=row["materialId"],
+                design_id=row["designId"],
+                treatment_id=row["treatmentId"],
+                rimless_allowed=bool(row.get("rimlessAllowed") and material.get("rimlessAllowed")
+                                     and treatment.get("rimlessAllowed")),
+                # Matches order_validation: the stricter of the combo's and the design's minimum
+                min_segment_height=max(row.get("minSegmentHeight") or 0, design.get("minSegmentHeight") or 0),
+                add_min=add_rule.get("addMin"),
+                add_max=add_rule.get("addMax"),
+                tints=frozenset(combo_tints.get(key, ()))
+            ))
+        return combos
+
+    def sorted_ids(self, section, ids):
+        """Return ids in catalog order."""
+        order = self.order[section]
+        return tuple(sorted(ids, key=lambda value: order.get(value, len(order))))
+
+    def compute_options(self, frame_sku, material_id, design_id, treatment_id, tint_id, add_power, seg_height):
+        """Filter the precomputed combos for one set of selections (uncached)."""
+        rimless = False
+        if frame_sku is not None:
+            frame = self.frames.get(frame_sku)
+            if frame is None:
+                return {"materials": (), "designs": (), "treatments": (), "tints": ()}
+            rimless = is_rimless_frame(frame)
+
+        # Start from the smallest candidate set any single selection reaches
+        candidates = self.combos
+        for step, selected in (("material", material_id), ("design", design_id),
+                               ("treatment", treatment_id), ("tint", tint_id)):
+            if selected is not None:
+                reached = self.by_choice[step].get(selected, [])
+                if len(reached) < len(candidates):
+                    candidates = reached
+
+        remaining = [
+            combo for combo in candidates
+            if combo.accepts(rimless, material_id, design_id, treatment_id, tint_id, add_power, seg_height)
+        ]
+        tints = set()
+        for combo in remaining:
+            tints.update(combo.tints)
+        return {
+            "materials": self.sorted_ids("materials", {combo.material_id for combo in remaining}),
+            "designs": self.sorted_ids("designs", {combo.design_id for combo in remaining}),
+            "treatments": self.sorted_ids("treatments", {combo.treatment_id for combo in remaining}),
+            "tints": self.sorted_ids("tints", tints)
+        }
+
+    def remaining_options(self, frame_sku=None, material_id=None, design_id=None, treatment_id=None,
+                          tint_id=None, add_power=None, seg_height=None):
+        """Return the options still selectable at each step given partial selections."""
+        if frame_sku is not None:
+            frame_sku = str(frame_sku)
+        return dict(self.resolve(frame_sku, material_id, design_id, treatment_id, tint_id, add_power, seg_height))
+
+    def cache_stats(self):
+        """Return hit/miss counters for the option cache."""
+        info = self.resolve.cache_info()
+        lookups = info.hits + info.misses
+        return {
+            "hits": info.hits,
+            "misses": info.misses,
+            "size": info.currsize,
+            "maxSize": info.maxsize,
+            "hitRate": info.hits / lookups if lookups else 0.0
+        }
+
+RESOLVERS = OrderedDict()
+
+def get_resolver(catalog, cache_size=DEFAULT_CACHE_SIZE):
+    """Return the resolver for a catalog, building it once per buildId."""
+    build_id = catalog.get("metadata", {}).get("buildId")
+    if build_id is None:
+        # Without a build id there is no safe key to share a resolver under
+        return OptionResolver(catalog, cache_size)
+    resolver = RESOLVERS.get(build_id)
+    if resolver is None:
+        resolver = RESOLVERS[build_id] = OptionResolver(catalog, cache_size)
+        while len(RESOLVERS) > RESOLVER_LIMIT:
+            RESOLVERS.popitem(last=False)
+    else:
+        RESOLVERS.move_to_end(build_id)
+    return resolver
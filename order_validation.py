@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+"""
+Order Validation
+Validates whole batches of orders against the catalog's prescription,
+ADD power and segment height rules with NumPy array operations,
+returning error codes per order
+"""
+
+import argparse
+import itertools
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+from catalog_compiler import build_add_power_increments
+
+# Prescription limits from docs/validation-engine.md
+SPHERE_RANGE = (-20.0, 20.0)
+CYLINDER_RANGE = (-10.0, 10.0)
+AXIS_RANGE = (0, 180)
+POWER_STEP = 0.25
+STEP_TOLERANCE = 1e-6
+
+# Design categories that take an ADD power
+MULTIFOCAL_CATEGORIES = {"bifocal", "trifocal", "progressive"}
+
+# Per-order errors are a bitmask over these codes
+ERROR_CODES = [
+    "INVALID_COMBINATION",
+    "MATERIAL_NOT_AVAILABLE",
+    "SPHERE_OUT_OF_RANGE",
+    "CYLINDER_OUT_OF_RANGE",
+    "AXIS_INVALID",
+    "POWER_INCREMENT_INVALID",
+    "ADD_POWER_REQUIRED",
+    "ADD_POWER_INVALID",
+    "SEGMENT_HEIGHT_TOO_LOW",
+    "NUMERIC_VALUE_INVALID"
+]
+ERROR_BITS = {code: 1 << position for position, code in enumerate(ERROR_CODES)}
+
+ID_COLUMNS = ["designId", "materialId", "treatmentId"]
+NUMERIC_COLUMNS = ["sphere", "cylinder", "axis", "addPower", "segmentHeight"]
+ORDER_FIELDS = ID_COLUMNS + NUMERIC_COLUMNS
+
+# incrementRule comparison -> code stored in the compiled constraint table
+INCREMENT_OPS = {None: 0, ">": 1, ">=": 2, "<": 3, "<=": 4}
+
+def order_treatments(order):
+    """Return the treatment ids an order names.
+
+    That is ``treatmentId`` or ``lensConfig.treatment`` when given, and
+    otherwise every entry of ``treatments`` (a single None without any).
+    """
+    lens = order.get("lensConfig") or order
+    treatment_id = order.get("treatmentId") or lens.get("treatment")
+    if treatment_id:
+        return [treatment_id]
+    return list(order.get("treatments") or [None])
+
+def order_rows(order):
+    """Return an order's (nested lensConfig or flat) values in ORDER_FIELDS order, one row per treatment."""
+    lens = order.get("lensConfig") or order
+    design_id = lens.get("designId", lens.get("design"))
+    material_id = lens.get("materialId", lens.get("material"))
+    numbers = (lens.get("sphere"), lens.get("cylinder"), lens.get("axis"),
+               lens.get("addPower"), lens.get("segmentHeight"))
+    return [(design_id, material_id, treatment_id, *numbers) for treatment_id in order_treatments(order)]
+
+def order_columns(orders):
+    """Turn order dicts into validation columns.
+
+    Returns (columns, owners): an order with several treatments becomes
+    one row per treatment, and ``owners`` maps each row to its order.
+    """
+    rows = []
+    owners = []
+    for position, order in enumerate(orders):
+        for row in order_rows(order):
+            rows.append(row)
+            owners.append(position)
+    columns = {name: [row[position] for row in rows] for position, name in enumerate(ORDER_FIELDS)}
+    return columns, owners
+
+def to_number(value):
+    """Return a value as a float; NaN when blank, None when it is not a number."""
+    if value is None or value == "":
+        return np.nan
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+def numeric_column(values, size):
+    """Return (float array, invalid mask) with NaN for missing, blank or unparseable values.
+
+    The mask marks the values that were present but are not numbers.
+    """
+    if values is None:
+        return np.full(size, np.nan), np.zeros(size, dtype=bool)
+    if isinstance(values, np.ndarray) and values.dtype.kind == "f":
+        return values, np.zeros(size, dtype=bool)
+    try:
+        # None converts to NaN directly; only strings need the slow path
+        return np.array(values, dtype=np.float64), np.zeros(size, dtype=bool)
+    except (TypeError, ValueError):
+        numbers = [to_number(value) for value in values]
+        invalid = np.fromiter((number is None for number in numbers), dtype=bool, count=size)
+        column = np.array([np.nan if number is None else number for number in numbers], dtype=np.float64)
+        return column, invalid
+
+def off_grid(values, step):
+    """Return where ``values`` are not whole multiples of ``step``."""
+    ratio = values / step
+    return np.abs(ratio - np.rint(ratio)) > STEP_TOLERANCE
+
+class BatchValidator:
+    """Catalog rules compiled into dense design × material × treatment arrays.
+
+    Every axis has one extra trailing slot that unknown ids map to; it is
+    never offered and carries no rules, so lookups need no masking.
+    """
+
+    def __init__(self, catalog):
+        self.build_id = catalog.get("metadata", {}).get("buildId")
+        designs = catalog.get("designs", [])
+        materials = catalog.get("materials", [])
+        self.designs = {row["id"]: position for position, row in enumerate(designs)}
+        self.materials = {row["id"]: position for position, row in enumerate(materials)}
+        self.treatments = {row["id"]: position for position, row in enumerate(catalog.get("treatments", []))}
+        shape = self.shape = (len(designs) + 1, len(materials) + 1, len(catalog.get("treatments", [])) + 1)
+
+        self.multifocal = np.array([
+            str(row.get("category") or "").lower() in MULTIFOCAL_CATEGORIES for row in designs
+        ] + [False], dtype=bool)
+        self.discontinued = np.array([bool(row.get("discontinued")) for row in designs] + [False], dtype=bool)
+        self.design_min_segment = np.array([row.get("minSegmentHeight") or 0 for row in designs] + [0],
+                                           dtype=np.float64)
+        # Unknown materials are already an invalid combination
+        self.material_available = np.array([bool(row.get("available")) for row in materials] + [True], dtype=bool)
+
+        self.offered = np.zeros(shape, dtype=bool)
+        self.min_segment = np.zeros(shape, dtype=np.float64)
+        seen = np.zeros(shape, dtype=bool)
+        for row in catalog.get("availability", []):
+            cell = self.cell(row)
+            # First row wins, matching the compiled availability index
+            if cell is None or seen[cell]:
+                continue
+            seen[cell] = True
+            self.offered[cell] = bool(row.get("available"))
+            self.min_segment[cell] = row.get("minSegmentHeight") or 0
+
+        rules = catalog.get("addPowerRules", [])
+        increments = catalog.get("indexes", {}).get("addPowerIncrements")
+        if increments is None or len(increments) != len(rules):
+            increments = build_add_power_increments(rules)
+        self.add_min = np.full(shape, np.nan)
+        self.add_max = np.full(shape, np.nan)
+        self.increment_op = np.zeros(shape, dtype=np.int8)
+        self.increment_threshold = np.full(shape, np.nan)
+        self.increment_step = np.full(shape, np.nan)
+        for row, increment in zip(rules, increments):
+            cell = self.cell(row)
+            if cell is None or not np.isnan(self.add_min[cell]):
+                continue
+            self.add_min[cell] = row.get("addMin") if row.get("addMin") is not None else -np.inf
+            self.add_max[cell] = row.get("addMax") if row.get("addMax") is not None else np.inf
+            if increment:
+                self.increment_op[cell] = INCREMENT_OPS[increment["op"]]
+                if increment["threshold"] is not None:
+                    self.increment_threshold[cell] = increment["threshold"]
+                self.increment_step[cell] = increment["step"]
+
+    def cell(self, row):
+        """Return a rule row's (design, material, treatment) array position, or None."""
+        try:
+            return (self.designs[row["designId"]], self.materials[row["materialId"]],
+                    self.treatments[row["treatmentId"]])
+        except KeyError:
+            return None
+
+    @staticmethod
+    def codes(values, lookup, unknown):
+        """Map an id column to array positions; unknown ids map to ``unknown``, the sentinel slot."""
+        return np.fromiter(map(lookup.get, values, itertools.repeat(unknown)), dtype=np.int64, count=len(values))
+
+    def validate(self, columns):
+        """Validate a batch given as columns and return a uint16 error bitmask per order.
+
+        ``columns`` maps designId/materialId/treatmentId and sphere,
+        cylinder, axis, addPower, segmentHeight to equal-length sequences;
+        missing numeric columns count as blank, and values that are not
+        numbers count as blank and set NUMERIC_VALUE_INVALID.
+        """
+        design = self.codes(columns["designId"], self.designs, self.shape[0] - 1)
+        material = self.codes(columns["materialId"], self.materials, self.shape[1] - 1)
+        treatment = self.codes(columns["treatmentId"], self.treatments, self.shape[2] - 1)
+        size = len(design)
+        numeric = [numeric_column(columns.get(name), size) for name in NUMERIC_COLUMNS]
+        sphere, cylinder, axis, add, segment = (column for column, _ in numeric)
+        errors = np.zeros(size, dtype=np.uint16)
+
+        def flag(code, mask):
+            errors[mask] |= ERROR_BITS[code]
+
+        # Unparseable values are validated as blank and flagged on their own
+        flag("NUMERIC_VALUE_INVALID", np.logical_or.reduce([invalid for _, invalid in numeric]))
+
+        cell = (design, material, treatment)
+        flag("INVALID_COMBINATION", ~self.offered[cell] | self.discontinued[design])
+        flag("MATERIAL_NOT_AVAILABLE", ~self.material_available[material])
+
+        cylinder = np.where(np.isnan(cylinder), 0.0, cylinder)
+        flag("SPHERE_OUT_OF_RANGE", np.isnan(sphere) | (sphere < SPHERE_RANGE[0]) | (sphere > SPHERE_RANGE[1]))
+        flag("CYLINDER_OUT_OF_RANGE", (cylinder < CYLINDER_RANGE[0]) | (cylinder > CYLINDER_RANGE[1]))
+        flag("POWER_INCREMENT_INVALID", (~np.isnan(sphere) & off_grid(sphere, POWER_STEP))
+             | off_grid(cylinder, POWER_STEP))
+        # An axis only matters with cylinder power
+        flag("AXIS_INVALID", (cylinder != 0) & (
+            np.isnan(axis) | (axis < AXIS_RANGE[0]) | (axis > AXIS_RANGE[1]) | off_grid(axis, 1.0)))
+
+        multifocal = self.multifocal[design]
+        has_add = ~np.isnan(add)
+        flag("ADD_POWER_REQUIRED", multifocal & ~has_add)
+        add_min = self.add_min[cell]
+        add_max = self.add_max[cell]
+        op = self.increment_op[cell]
+        threshold = self.increment_threshold[cell]
+        step = self.increment_step[cell]
+        applies = ~np.isnan(step) & np.select(
+            [op == 1, op == 2, op == 3, op == 4],
+            [add > threshold, add >= threshold, add < threshold, add <= threshold],
+            default=True
+        )
+        origin = np.where(np.isnan(threshold), 0.0, threshold)
+        steps_wrong = applies & off_grid(add - origin, np.where(np.isnan(step), 1.0, step))
+        flag("ADD_POWER_INVALID", has_add & (
+            ~multifocal | np.isnan(add_min) | (add < add_min) | (add > add_max)
+            | off_grid(add, POWER_STEP) | steps_wrong))
+
+        required_segment = np.maximum(self.min_segment[cell], self.design_min_segment[design])
+        flag("SEGMENT_HEIGHT_TOO_LOW", (required_segment > 0) & (np.isnan(segment) | (segment < required_segment)))
+        return errors
+
+    def validate_orders(self, orders):
+        """Validate order dicts and return a bitmask per order.
+
+        Each treatment of an order is validated as its own combo; the
+        order carries the errors of all of them.
+        """
+        columns, owners = order_columns(orders)
+        masks = self.validate(columns)
+        if len(owners) == len(orders):
+            return masks
+        errors = np.zeros(len(orders), dtype=np.uint16)
+        np.bitwise_or.at(errors, np.asarray(owners, dtype=np.int64), masks)
+        return errors
+
+def error_names(mask):
+    """Return the error codes set in one order's bitmask."""
+    return [code for code in ERROR_CODES if int(mask) & ERROR_BITS[code]]
+
+def count_errors(masks):
+    """Return how many orders carry each error code."""
+    return {code: int(np.count_nonzero(masks & ERROR_BITS[code])) for code in ERROR_CODES}
+
+def load_orders(path):
+    """Load orders from a JSONL or CSV order file."""
+    from lab_export import iter_orders
+    return [json.loads(order) if isinstance(order, str) else order for order in iter_orders(path)]
+
+def parse_args(argv=None):
+    """Parse command line options."""
+    parser = argparse.ArgumentParser(description="Validate a batch of orders against the catalog")
+    parser.add_argument("orders", help="Orders as JSON Lines or CSV")
+    parser.add_argument("--catalog", default="data/sample_catalog.json",
+                        help="Catalog JSON or binary (.ocat) file")
+    parser.add_argument("--output", default="data/order_validation.json",
+                        help="Where to write the errors of invalid orders")
+    parser.add_argument("--cache", default=None,
+                        help="SQLite file that keeps validation results between runs")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """Validate an order file and report the invalid orders."""
+    args = parse_args(argv)
+    for path in (Path(args.orders), Path(args.catalog)):
+        if not path.exists():
+            print(f"❌ File not found: {path}")
+            sys.exit(1)
+
+    from catalog_access import load_catalog
+    catalog = load_catalog(args.catalog)
+    orders = load_orders(args.orders)
+    print(f"🔍 Validating {len(orders)} orders against {args.catalog}")
+
+    start = time.perf_counter()
+    validator = BatchValidator(catalog)
+    cache_stats = None
+    if args.cache:
+        from validation_cache import ValidationCache, validate_orders_cached
+        with ValidationCache(validator.build_id, path=args.cache) as cache:
+            errors = validate_orders_cached(validator, orders, cache)
+            cache_stats = cache.stats()
+    else:
+        errors = [error_names(mask) for mask in validator.validate_orders(orders)]
+    elapsed = time.perf_counter() - start
+
+    records = [
+        {"index": position, "id": order.get("id"), "errors": order_errors}
+        for position, (order, order_errors) in enumerate(zip(orders, errors))
+        if order_errors
+    ]
+    output_path = Path(args.output)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump(records, f, indent=2, ensure_ascii=False)
+
+    print(f"   Valid: {len(orders) - len(records)} | Invalid: {len(records)} | {elapsed * 1000:.1f} ms")
+    counts = dict.fromkeys(ERROR_CODES, 0)
+    for record in records:
+        for code in record["errors"]:
+            counts[code] += 1
+    for code, count in counts.items():
+        if count:
+            print(f"   {code}: {count}")
+    if cache_stats:
+        print(f"   Cache: {cache_stats['hits'] + cache_stats['diskHits']} hits | "
+              f"{cache_stats['misses']} misses | {cache_stats['diskSize']} stored")
+    print(f"✅ Errors saved to: {output_path}")
+
+if __name__ == "__main__":
+    main()
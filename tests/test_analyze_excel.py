@@ -0,0 +1,56 @@
+import contextlib
+import io
+
+from openpyxl import Workbook
+
+import analyze_excel
+from analyze_excel import StreamingColumnProfile, analyze_workbook
+from build_metrics import BuildMetrics
+
+def analyze(path, **options):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return analyze_workbook(path, **options)["sheets"]
+
+def test_streaming_profile_matches_pandas(sample_workbook):
+    assert analyze(sample_workbook, streaming=True) == analyze(sample_workbook)
+
+def test_distinct_values_are_capped(monkeypatch):
+    monkeypatch.setattr(analyze_excel, "DISTINCT_LIMIT", 5)
+    profile = StreamingColumnProfile()
+    for value in range(100):
+        profile.add(value)
+
+    assert len(profile.distinct) == 5
+    assert profile.distinct_capped
+    assert profile.dtype() == "int64"
+    assert profile.sample_values() == [0, 1, 2]
+
+def test_capped_columns_are_listed(sample_workbook, monkeypatch):
+    monkeypatch.setattr(analyze_excel, "DISTINCT_LIMIT", 2)
+    frames = analyze(sample_workbook, streaming=True)["Frames"]
+
+    assert "SKU" in frames["capped_unique_counts"]
+    assert frames["unique_counts"]["SKU"] == 2
+
+def test_parallel_analysis_matches_sequential(sample_workbook):
+    metrics = BuildMetrics("analyze_excel")
+    with contextlib.redirect_stdout(io.StringIO()):
+        parallel = analyze_workbook(sample_workbook, streaming=True, workers=2, metrics=metrics)["sheets"]
+
+    assert list(parallel) == list(analyze(sample_workbook, streaming=True))
+    assert parallel == analyze(sample_workbook, streaming=True)
+    profiled = {stage["labels"]["sheet"] for stage in metrics.stages if stage["stage"] == "profile_sheet"}
+    assert profiled == {name for name, info in parallel.items() if "error" not in info}
+
+def test_boolean_column_with_gaps_matches_pandas(tmp_path):
+    path = tmp_path / "flags.xlsx"
+    workbook = Workbook()
+    workbook.active.title = "Flags"
+    for row in [("FLAG", "MIXED"), (True, True), (None, "x"), (False, None)]:
+        workbook.active.append(row)
+    workbook.save(path)
+
+    streamed = analyze(path, streaming=True)
+    assert streamed == analyze(path)
+    assert streamed["Flags"]["data_types"]["FLAG"] == "float64"
+    assert streamed["Flags"]["sample_data"]["FLAG"] == [1.0, 0.0]
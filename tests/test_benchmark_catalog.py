@@ -0,0 +1,52 @@
+import pytest
+
+import benchmark_catalog
+from benchmark_catalog import BENCHMARKS, check_targets, compare_to_baseline, prepare_fixture, run_case
+
+# Workbook benchmarks take seconds each even on a tiny fixture
+CATALOG_BENCHMARKS = [name for name in BENCHMARKS
+                      if not name.startswith(("analyze_", "ingest_", "build_catalog", "cold_start_"))]
+
+@pytest.fixture(scope="module")
+def tiny_fixture(tmp_path_factory):
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setitem(benchmark_catalog.SIZES, "tiny", {"frames": 50})
+        yield prepare_fixture("tiny", tmp_path_factory.mktemp("fixtures"))
+
+@pytest.mark.parametrize("name", CATALOG_BENCHMARKS)
+def test_benchmark_runs(name, tiny_fixture):
+    result = run_case(name, tiny_fixture, repeat=1)
+
+    assert result["name"] == name and result["size"] == "tiny"
+    assert result["wall_seconds"] > 0
+
+def test_regressions_past_tolerance_are_reported():
+    baseline = {"results": [{"name": "a", "size": "small", "wall_seconds": 1.0,
+                             "peak_alloc_mb": 10.0, "retained_alloc_mb": 0.0}]}
+    results = [{"name": "a", "size": "small", "wall_seconds": 1.1, "peak_alloc_mb": 13.0, "retained_alloc_mb": 5.0},
+               {"name": "b", "size": "small", "wall_seconds": 9.0, "peak_alloc_mb": 0.0, "retained_alloc_mb": 0.0}]
+
+    regressions = compare_to_baseline(results, baseline, tolerance=0.2)
+
+    assert [(entry["name"], entry["metric"]) for entry in regressions] == [("a", "peak_alloc_mb")]
+
+def test_target_misses():
+    results = [{"name": "load_catalog_json", "size": "large", "peak_alloc_mb": 80.0},
+               {"name": "load_catalog_json", "size": "small", "peak_alloc_mb": 5.0}]
+
+    assert check_targets(results) == [{"name": "load_catalog_json", "size": "large", "metric": "peak_alloc_mb",
+                                       "target": 50.0, "current": 80.0}]
+
+def test_lower_bound_targets():
+    results = [{"name": "validation_cache_stream", "size": "small", "hit_rate": 0.5},
+               {"name": "validation_cache_stream", "size": "medium", "hit_rate": 0.95}]
+
+    assert check_targets(results) == [{"name": "validation_cache_stream", "size": "small", "metric": "hit_rate",
+                                       "target": 0.9, "current": 0.5}]
+
+def test_latency_and_hit_rate_are_measured(tiny_fixture):
+    latency = run_case("order_validation_latency", tiny_fixture, repeat=1)
+    stream = run_case("validation_cache_stream", tiny_fixture, repeat=1)
+
+    assert 0 < latency["p95_ms"] <= latency["max_ms"]
+    assert check_targets([latency, stream]) == []
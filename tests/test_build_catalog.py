@@ -0,0 +1,41 @@
+import json
+import shutil
+
+from openpyxl import load_workbook
+
+from build_catalog import build_catalog, hash_sheet
+
+def test_hash_ignores_cell_padding_and_blank_rows():
+    rows = [("id", "name"), (1, "A"), (), (2, "B")]
+    padded = [("id", "name", None, None), (1, "A", None), (None, None), (2, "B", None, None), (None,)]
+    assert hash_sheet(padded) == hash_sheet(rows)
+    assert hash_sheet(rows) != hash_sheet([("id", "name"), (1, "A"), (2, "C")])
+
+def test_resaved_workbook_reports_no_changed_sheets(tmp_path, sample_workbook):
+    workbook_path = tmp_path / "catalog.xlsx"
+    output_path = tmp_path / "catalog.json"
+    shutil.copy(sample_workbook, workbook_path)
+    build_catalog(workbook_path, output_path)
+
+    workbook = load_workbook(workbook_path)
+    workbook.save(workbook_path)
+    assert build_catalog(workbook_path, output_path)["changed"] == []
+
+    workbook = load_workbook(workbook_path)
+    workbook["Frames"]["B2"] = "Edited frame"
+    workbook.save(workbook_path)
+    assert build_catalog(workbook_path, output_path)["changed"] == ["Frames"]
+
+def test_inserted_blank_row_is_recorded_without_changing_sheets(tmp_path, sample_workbook):
+    workbook_path = tmp_path / "catalog.xlsx"
+    output_path = tmp_path / "catalog.json"
+    shutil.copy(sample_workbook, workbook_path)
+    build_catalog(workbook_path, output_path)
+
+    workbook = load_workbook(workbook_path)
+    workbook["Materials"].insert_rows(3)
+    workbook.save(workbook_path)
+    result = build_catalog(workbook_path, output_path)
+
+    assert result["changed"] == []
+    assert json.loads(output_path.read_text())["metadata"]["blankRows"] == {"Materials": [3]}
@@ -0,0 +1,32 @@
+import json
+
+from build_metrics import BuildMetrics, to_openmetrics, write_report
+
+def test_nested_stages_and_report(tmp_path):
+    metrics = BuildMetrics("build_catalog", trace_memory=True).start()
+    with metrics.stage("convert", sheet="Frames") as outer:
+        with metrics.stage("parse", rows=3):
+            data = [bytearray(1024) for _ in range(100)]
+        outer["rows"] = len(data)
+
+    report = write_report(metrics, tmp_path / "catalog.timings.json", tmp_path / "catalog.prom")
+
+    assert [record["stage"] for record in report["stages"]] == ["parse", "convert"]
+    parse, convert = report["stages"]
+    assert convert["labels"] == {"sheet": "Frames"} and convert["rows"] == 100
+    assert convert["seconds"] >= parse["seconds"]
+    assert convert["peakAllocMb"] >= parse["peakAllocMb"] > 0
+    assert json.loads((tmp_path / "catalog.timings.json").read_text())["pipeline"] == "build_catalog"
+    assert (tmp_path / "catalog.prom").read_text().endswith("# EOF\n")
+
+def test_openmetrics_sums_repeated_stages():
+    report = {"pipeline": "p", "totalSeconds": None, "stages": [
+        {"stage": "s", "labels": {"sheet": 'a"b'}, "seconds": 1.0, "cpuSeconds": 0.5, "rows": 2},
+        {"stage": "s", "labels": {"sheet": 'a"b'}, "seconds": 2.0, "cpuSeconds": 0.5, "rows": None}
+    ]}
+
+    text = to_openmetrics(report)
+
+    assert 'catalog_build_stage_seconds{pipeline="p",stage="s",sheet="a\\"b"} 3' in text
+    assert 'catalog_build_stage_rows{pipeline="p",stage="s",sheet="a\\"b"} 2' in text
+    assert "total_seconds" not in text
@@ -0,0 +1,29 @@
+import asyncio
+import json
+import shutil
+
+from build_service import CATALOG_FILE, VIEWS_FILE, build_all, discover_workbooks
+
+def test_manifest_with_missing_workbook_builds_the_rest(tmp_path, sample_workbook):
+    shutil.copy(sample_workbook, tmp_path / "east.xlsx")
+    manifest = tmp_path / "catalogs.json"
+    manifest.write_text(json.dumps(["east.xlsx", {"name": "west", "workbook": "missing.xlsx"}]))
+
+    pairs = discover_workbooks([manifest])
+    results = asyncio.run(build_all(pairs, tmp_path / "out", workers=1, analyze=False))
+
+    assert results["west"]["status"] == "failed"
+    assert "FileNotFoundError" in results["west"]["error"]
+    assert results["east"]["status"] == "built"
+    assert (tmp_path / "out" / "east" / CATALOG_FILE).exists()
+    assert (tmp_path / "out" / "east" / VIEWS_FILE).exists()
+
+def test_identical_workbooks_are_built_once(tmp_path, sample_workbook):
+    for name in ("a", "b"):
+        shutil.copy(sample_workbook, tmp_path / f"{name}.xlsx")
+
+    results = asyncio.run(build_all(discover_workbooks([tmp_path]), tmp_path / "out", workers=1, analyze=False))
+
+    assert results["a"]["status"] == "built"
+    assert results["b"]["status"] == "copied"
+    assert (tmp_path / "out" / "b" / CATALOG_FILE).read_bytes() == (tmp_path / "out" / "a" / CATALOG_FILE).read_bytes()
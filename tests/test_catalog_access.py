@@ -0,0 +1,31 @@
+import json
+
+from catalog_access import load_catalog, snapshot_path_for
+from catalog_compiler import compile_catalog
+
+def test_snapshot_is_used_until_the_build_id_changes(tmp_path, sample_catalog):
+    path = tmp_path / "catalog.json"
+    path.write_text(json.dumps(sample_catalog))
+
+    first = load_catalog(path)
+    snapshot = snapshot_path_for(path)
+    assert snapshot.exists()
+    assert list(snapshot.parent.glob("*.tmp")) == []
+    assert load_catalog(path) == first
+
+    sample_catalog["metadata"]["buildId"] = "next"
+    sample_catalog["frames"] = sample_catalog["frames"][:1]
+    path.write_text(json.dumps(sample_catalog))
+    assert len(load_catalog(path)["frames"]) == 1
+
+def test_catalog_with_a_tint_matrix_keeps_it(tmp_path, sample_catalog):
+    compile_catalog(sample_catalog, compact_tints=True)
+    del sample_catalog["indexes"]
+    path = tmp_path / "catalog.json"
+    path.write_text(json.dumps(sample_catalog))
+
+    catalog = load_catalog(path, use_snapshot=False)
+
+    assert catalog["tintMatrix"] == sample_catalog["tintMatrix"]
+    assert "tintCompatibility" not in catalog
+    assert catalog["indexes"]["framesBySku"]
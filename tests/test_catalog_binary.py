@@ -0,0 +1,32 @@
+from catalog_binary import read_catalog_binary, write_catalog_binary
+
+def test_round_trip_keeps_nullable_nested_fields(tmp_path):
+    catalog = {
+        "metadata": {"buildId": "b1"},
+        "frames": [
+            {"sku": 1, "dimensions": {"a": 52, "b": 40.5}, "notes": None},
+            {"sku": 2, "dimensions": None, "notes": "rimless"},
+            {"sku": 3, "dimensions": {"a": 54, "b": None}, "notes": {"text": "mixed"}}
+        ]
+    }
+    path = tmp_path / "catalog.ocat"
+    write_catalog_binary(catalog, path)
+    assert read_catalog_binary(path) == catalog
+
+def test_round_trip_of_sample_catalog(tmp_path, sample_catalog):
+    path = tmp_path / "catalog.ocat"
+    write_catalog_binary(sample_catalog, path)
+    assert read_catalog_binary(path) == sample_catalog
+
+def test_round_trip_keeps_absent_keys_absent(tmp_path):
+    catalog = {
+        "frames": [
+            {"sku": 1, "dimensions": {"a": 52, "ed": 55}},
+            {"sku": 2, "dimensions": {"a": 50}, "notes": None},
+            {"sku": 3, "notes": "sparse"},
+            {"sku": 4, "empty": None}
+        ]
+    }
+    path = tmp_path / "catalog.ocat"
+    write_catalog_binary(catalog, path)
+    assert read_catalog_binary(path) == catalog
@@ -0,0 +1,41 @@
+import pytest
+
+from catalog_compiler import compile_catalog, lookup, parse_increment_rule
+
+def test_indexes_point_at_the_catalog_rows(sample_catalog):
+    catalog = compile_catalog(sample_catalog)
+    row = catalog["availability"][0]
+    frame = catalog["frames"][-1]
+
+    assert lookup(catalog, "availability", f"{row['designId']}|{row['materialId']}|{row['treatmentId']}") is row
+    assert lookup(catalog, "framesBySku", frame["sku"]) is frame
+    assert lookup(catalog, "framesBySku", "no-such-sku") is None
+
+def test_duplicate_combo_maps_to_its_first_row(sample_catalog):
+    first = sample_catalog["availability"][0]
+    sample_catalog["availability"].append(dict(first, id="DUPLICATE", available=False))
+
+    assert lookup(compile_catalog(sample_catalog), "availability",
+                  f"{first['designId']}|{first['materialId']}|{first['treatmentId']}") is first
+
+def test_increment_rules():
+    assert parse_increment_rule(">+4.00 in 0.50 steps") == {"op": ">", "threshold": 4.0, "step": 0.5}
+    assert parse_increment_rule("in 0.25 steps") == {"op": None, "threshold": None, "step": 0.25}
+    assert parse_increment_rule("  ") is None
+    with pytest.raises(ValueError):
+        parse_increment_rule("in 0 steps")
+
+def test_compacting_keeps_an_existing_tint_matrix(sample_catalog):
+    compile_catalog(sample_catalog, compact_tints=True)
+    matrix = sample_catalog["tintMatrix"]
+    del sample_catalog["indexes"]
+
+    compile_catalog(sample_catalog, compact_tints=True)
+
+    assert sample_catalog["tintMatrix"] is matrix
+    assert "comboTints" not in sample_catalog["indexes"]
+
+def test_compacting_refuses_two_tint_sections(sample_catalog):
+    sample_catalog["tintMatrix"] = {}
+    with pytest.raises(ValueError):
+        compile_catalog(sample_catalog, compact_tints=True)
@@ -0,0 +1,33 @@
+import copy
+import json
+
+from catalog_compiler import SECTION_KEYS
+from catalog_diff import apply_changeset, diff_catalogs, main
+
+def edited(catalog):
+    new = copy.deepcopy(catalog)
+    new["metadata"]["buildId"] = "next"
+    new["frames"][0]["color"] = "Teal"
+    del new["frames"][1]
+    new["materials"].append(dict(new["materials"][0], id="NEW_MATERIAL"))
+    return new
+
+def test_applying_a_changeset_reproduces_the_new_catalog(sample_catalog):
+    new = edited(sample_catalog)
+
+    changeset = diff_catalogs(sample_catalog, new)
+    patched = apply_changeset(sample_catalog, changeset)
+
+    assert changeset["summary"]["frames"] == {"added": 0, "removed": 1, "changed": 1}
+    for section in SECTION_KEYS:
+        assert sorted(map(json.dumps, patched.get(section) or [])) == sorted(map(json.dumps, new.get(section) or []))
+
+def test_cli_diffs_json_files(tmp_path, sample_catalog, capsys):
+    old_path, new_path, output = tmp_path / "old.json", tmp_path / "new.json", tmp_path / "changes.json"
+    old_path.write_text(json.dumps(sample_catalog))
+    new_path.write_text(json.dumps(edited(sample_catalog)))
+
+    main([str(old_path), str(new_path), "--output", str(output)])
+
+    assert json.loads(output.read_text())["summary"]["materials"] == {"added": 1, "removed": 0, "changed": 0}
+    assert "frames: +0 -1 ~1" in capsys.readouterr().out
@@ -0,0 +1,25 @@
+import copy
+
+from catalog_model import CatalogModel
+
+def test_round_trip_keeps_odd_rows(sample_catalog):
+    frames = sample_catalog["frames"]
+    frames.extend(copy.deepcopy(frames[0]) for _ in range(3))
+    frames[0]["dimensions"] = None
+    frames[1]["sku"] = "X-1"
+    frames[2]["dimensions"]["a"] = 52.5
+    frames[3]["flags"] = None
+
+    assert CatalogModel(copy.deepcopy(sample_catalog)).to_catalog() == sample_catalog
+
+def test_frames_and_entities_read_like_records(sample_catalog):
+    model = CatalogModel(sample_catalog)
+    record = sample_catalog["frames"][1]
+    frame = model.frames.find(record["sku"])
+
+    assert frame.brand_model == record["brandModel"]
+    assert frame.a == record["dimensions"]["a"]
+    assert frame.safety == record["flags"]["safety"]
+    assert model.frames[-1].to_record() == record
+    assert model.frames.find("no-such-sku") is None
+    assert [material.to_record() for material in model.materials] == sample_catalog["materials"]
@@ -0,0 +1,36 @@
+import json
+
+import pytest
+
+from catalog_writer import read_catalog_jsonl, write_catalog
+
+def test_pretty_output_matches_json_dump(tmp_path, sample_catalog):
+    total = sum(len(value) for name, value in sample_catalog.items() if isinstance(value, list))
+    expected = json.dumps(dict(sample_catalog, metadata=dict(sample_catalog["metadata"], totalRecords=total)),
+                          indent=2, ensure_ascii=False)
+
+    write_catalog(tmp_path / "catalog.json", sample_catalog, style="pretty")
+
+    assert (tmp_path / "catalog.json").read_text(encoding="utf-8") == expected
+
+@pytest.mark.parametrize("style", ["pretty", "compact"])
+def test_streamed_sections_patch_the_record_count(tmp_path, sample_catalog, style):
+    frames = sample_catalog["frames"]
+    catalog = dict(sample_catalog, frames=(frame for frame in frames), designs=[], indexes={})
+
+    counts = write_catalog(tmp_path / "catalog.json", catalog, style=style)
+    written = json.loads((tmp_path / "catalog.json").read_text(encoding="utf-8"))
+
+    assert counts["frames"] == len(frames) and counts["designs"] == 0
+    assert written["metadata"]["totalRecords"] == sum(counts.values())
+    assert written["frames"] == frames and written["designs"] == [] and written["indexes"] == {}
+
+def test_jsonl_round_trip(tmp_path, sample_catalog):
+    write_catalog(tmp_path / "catalog.json", sample_catalog, style="jsonl")
+
+    catalog = read_catalog_jsonl(tmp_path / "catalog")
+
+    assert catalog.pop("metadata")["totalRecords"] == sum(
+        len(value) for value in sample_catalog.values() if isinstance(value, list))
+    sample_catalog.pop("metadata")
+    assert catalog == sample_catalog
@@ -0,0 +1,14 @@
+from combination_analysis import analyze_combinations, build_report
+
+def test_report_does_not_depend_on_worker_count(sample_catalog):
+    sample_catalog["addPowerRules"].insert(0, {
+        "id": "GONE_RULE", "designId": "GONE", "materialId": "CR39", "treatmentId": "CLEAR",
+        "addMin": 1.0, "addMax": 3.0, "incrementRule": None, "notes": None
+    })
+
+    serial = build_report(sample_catalog, analyze_combinations(sample_catalog))
+    parallel = build_report(sample_catalog, analyze_combinations(sample_catalog, workers=2))
+
+    assert serial == parallel
+    assert {"sheet": "AddPowerRules", "rule": "GONE_RULE",
+            "reason": "unknown design, material or treatment"} in serial["unreachable"]
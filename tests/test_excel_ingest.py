@@ -0,0 +1,56 @@
+import contextlib
+import io
+import shutil
+
+import pytest
+from openpyxl import load_workbook
+
+from analyze_excel import analyze_workbook
+from excel_ingest import read_workbook
+
+@pytest.fixture
+def schema(sample_workbook):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return analyze_workbook(sample_workbook, streaming=True)["sheets"]
+
+def test_columns_recorded_as_empty_are_still_read(sample_workbook, schema):
+    frames_schema = schema["Frames"]
+    frames_schema["null_counts"]["COLLECTION"] = frames_schema["rows"]
+
+    frame = read_workbook(sample_workbook, schema, sheets=["Frames"])["Frames"]
+
+    assert frame["COLLECTION"].notna().any()
+
+def test_bad_numeric_cells_are_read_as_missing_and_reported(tmp_path, sample_workbook, schema):
+    path = tmp_path / "catalog.xlsx"
+    shutil.copy(sample_workbook, path)
+    workbook = load_workbook(path)
+    header = [cell.value for cell in workbook["Frames"][1]]
+    workbook["Frames"].cell(row=2, column=header.index("A") + 1, value=52.5)
+    workbook["Frames"].cell(row=3, column=header.index("ED") + 1, value="wide")
+    workbook.save(path)
+
+    problems = {}
+    frame = read_workbook(path, schema, sheets=["Frames"], problems=problems)["Frames"]
+
+    assert frame["A"].isna().iloc[0]
+    assert frame["ED"].isna().iloc[1]
+    assert problems == {"Frames": [{"column": "A", "row": 2, "value": 52.5},
+                                   {"column": "ED", "row": 3, "value": "wide"}]}
+
+def test_blank_rows_are_skipped_like_the_catalog_build(tmp_path, sample_workbook, schema):
+    path = tmp_path / "catalog.xlsx"
+    workbook = load_workbook(sample_workbook)
+    sheet = workbook["Availability"]
+    rows = sheet.max_row - 1
+    sheet.insert_rows(3)
+    header = [cell.value for cell in sheet[1]]
+    sheet.cell(row=4, column=header.index("LEAD_TIME_WEEKS") + 1, value="soon")
+    workbook.save(path)
+
+    problems = {}
+    frame = read_workbook(path, schema, sheets=["Availability"], problems=problems)["Availability"]
+
+    assert len(frame) == rows
+    assert frame["DESIGN_ID"].notna().all()
+    assert problems == {"Availability": [{"column": "LEAD_TIME_WEEKS", "row": 4, "value": "soon"}]}
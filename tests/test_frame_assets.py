@@ -0,0 +1,36 @@
+import pytest
+
+from frame_assets import build_asset_manifest, plan_thumbnails, process_image
+
+def write_images(images_dir, contents):
+    images_dir.mkdir()
+    for name, data in contents.items():
+        (images_dir / name).write_bytes(data)
+
+def test_images_with_the_same_content_share_one_thumbnail_job(tmp_path):
+    images_dir = tmp_path / "images"
+    write_images(images_dir, {"a.jpg": b"same", "b.jpg": b"same", "c.jpg": b"other"})
+    names = ["a.jpg", "b.jpg", "c.jpg", "gone.jpg"]
+    results = [process_image(name, images_dir, None) for name in names]
+
+    known, jobs = plan_thumbnails(names, results, {"images": {}}, images_dir, tmp_path / "thumbs", 64)
+
+    assert known == {}
+    assert len(jobs) == 2
+    assert jobs[f"{results[0]['hash'][:16]}_64.jpg"] == (images_dir / "a.jpg").resolve()
+
+def test_manifest_thumbnails_are_created_once(tmp_path):
+    Image = pytest.importorskip("PIL.Image")
+    images_dir = tmp_path / "images"
+    images_dir.mkdir()
+    Image.new("RGB", (200, 100), "red").save(images_dir / "a.jpg")
+    (images_dir / "b.jpg").write_bytes((images_dir / "a.jpg").read_bytes())
+    catalog = {"frames": [{"sku": 1, "heroImage": "a.jpg"}, {"sku": 2, "heroImage": "b.jpg"}]}
+
+    manifest, counts = build_asset_manifest(catalog, images_dir, tmp_path / "thumbs", size=64, workers=4)
+    _, again = build_asset_manifest(catalog, images_dir, tmp_path / "thumbs", manifest, size=64)
+
+    assert counts["thumbnailsCreated"] == 1
+    assert manifest["images"]["a.jpg"]["thumbnail"] == manifest["images"]["b.jpg"]["thumbnail"]
+    assert (manifest["images"]["a.jpg"]["width"], manifest["images"]["a.jpg"]["height"]) == (64, 32)
+    assert again["thumbnailsCreated"] == 0 and again["hashed"] == 0
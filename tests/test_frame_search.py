@@ -0,0 +1,56 @@
+import json
+import math
+
+import pytest
+
+from frame_search import FrameIndex, linear_search, main
+from generate_sample_data import generate_scaled_frames
+
+@pytest.fixture(scope="module")
+def frames():
+    return list(generate_scaled_frames(2000, seed=5))
+
+@pytest.mark.parametrize("criteria", [
+    {"a": (50, 54)},
+    {"a": (None, 48), "dbl": (17, None)},
+    {"framePd": (68, 72), "safety": True},
+    {"color": ["BLACK", "GREY"], "b": (34, 38), "discontinued": False},
+    {"collection": None},
+    {"ed": (40, 60)},
+    {"color": "NO SUCH COLOR"}
+])
+def test_index_search_matches_linear_scan(frames, criteria):
+    index = FrameIndex(frames)
+
+    assert index.search_positions(**criteria) == linear_search(frames, **criteria)
+    assert index.search_positions(limit=3, **criteria) == linear_search(frames, **criteria)[:3]
+
+def test_unknown_field_is_rejected(frames):
+    with pytest.raises(ValueError):
+        FrameIndex(frames).search(size=52)
+
+def test_nearest_returns_closest_matching_frames(frames):
+    index = FrameIndex(frames)
+    targets = {"a": 52, "framePd": 70}
+
+    found = index.nearest(targets, k=10, material="Safety")
+
+    def distance(frame):
+        return math.dist([frame["dimensions"]["a"], frame["dimensions"]["framePd"]], [52, 70])
+
+    expected = sorted(distance(frame) for frame in frames if frame["material"] == "Safety")[:10]
+    assert [found_distance for found_distance, _ in found] == pytest.approx(expected)
+    assert all(frame["material"] == "Safety" for _, frame in found)
+
+def test_cli_lists_frames_without_dimensions(tmp_path, capsys):
+    frames = [{"sku": 1, "color": "BLACK", "dimensions": None},
+              {"sku": 2, "color": "BLACK", "dimensions": {"a": 52, "dbl": 18, "temple": 140}}]
+    path = tmp_path / "catalog.json"
+    path.write_text(json.dumps({"frames": frames}))
+
+    main(["--catalog", str(path), "--color", "BLACK"])
+
+    output = capsys.readouterr().out
+    assert "2 frames" in output
+    assert "1 None BLACK None-None-None" in output
+    assert "2 None BLACK 52-18-140" in output
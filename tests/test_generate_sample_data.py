@@ -0,0 +1,27 @@
+import json
+
+from generate_sample_data import generate_scaled_catalog
+from validate_catalog import validate_catalog
+
+def load(path):
+    with open(path, encoding="utf-8") as f:
+        catalog = json.load(f)
+    catalog["metadata"].pop("lastUpdated")
+    return catalog
+
+def test_scaled_catalog_is_reproducible_and_consistent(tmp_path):
+    counts = generate_scaled_catalog(tmp_path / "a.json", frames=300, seed=7)
+    generate_scaled_catalog(tmp_path / "b.json", frames=300, seed=7, style="pretty")
+    catalog = load(tmp_path / "a.json")
+
+    assert catalog == load(tmp_path / "b.json")
+    assert counts["frames"] == 300
+    assert catalog["metadata"]["totalRecords"] == sum(counts.values())
+    assert len({frame["sku"] for frame in catalog["frames"]}) == 300
+    assert validate_catalog(catalog).empty
+
+def test_seed_changes_the_catalog(tmp_path):
+    generate_scaled_catalog(tmp_path / "a.json", frames=50, seed=1)
+    generate_scaled_catalog(tmp_path / "b.json", frames=50, seed=2)
+
+    assert load(tmp_path / "a.json")["frames"] != load(tmp_path / "b.json")["frames"]
@@ -0,0 +1,40 @@
+import json
+
+from lab_export import export_orders
+
+def test_serial_and_parallel_exports_match(tmp_path, sample_catalog):
+    catalog_path = tmp_path / "catalog.json"
+    catalog_path.write_text(json.dumps(sample_catalog))
+    order = {"frameId": sample_catalog["frames"][0]["sku"], "treatments": ["CLEAR"], "tints": [],
+             "lensConfig": {"material": "CR39", "design": "SV", "sphere": -2.25}}
+    orders_path = tmp_path / "orders.jsonl"
+    orders_path.write_text("\n".join(json.dumps(dict(order, id=f"o{n}")) for n in range(5))
+                           + "\n" + json.dumps({"id": "bad", "frameId": 0}) + "\n")
+
+    serial = export_orders(catalog_path, orders_path, tmp_path / "serial.txt")
+    parallel = export_orders(catalog_path, orders_path, tmp_path / "parallel.txt", workers=2, chunk_size=2)
+
+    assert serial["exported"] == parallel["exported"] == 5
+    assert [error["id"] for error in serial["errors"]] == ["bad"]
+    assert (tmp_path / "serial.txt").read_text() == (tmp_path / "parallel.txt").read_text()
+    assert "SPHERE: -2.25" in (tmp_path / "serial.txt").read_text()
+
+def test_per_order_files_stay_inside_the_output_directory(tmp_path, sample_catalog):
+    catalog_path = tmp_path / "catalog.json"
+    catalog_path.write_text(json.dumps(sample_catalog))
+    order = {"frameId": sample_catalog["frames"][0]["sku"], "treatments": ["CLEAR"], "tints": [],
+             "lensConfig": {"material": "CR39", "design": "SV", "sphere": -2.25}}
+    orders_path = tmp_path / "orders.jsonl"
+    orders_path.write_text("\n".join(json.dumps(dict(order, id=order_id))
+                                     for order_id in ["a", "../escape", "a", "sub/b", "c"]) + "\n")
+
+    result = export_orders(catalog_path, orders_path, tmp_path / "out", per_order=True)
+
+    assert result["exported"] == 2
+    assert [(error["id"], error["error"]) for error in result["errors"]] == [
+        ("../escape", "order id is not a valid file name"),
+        ("a", "duplicate order id"),
+        ("sub/b", "order id is not a valid file name")
+    ]
+    assert sorted(path.name for path in (tmp_path / "out").iterdir()) == ["a.txt", "c.txt"]
+    assert not (tmp_path / "escape.txt").exists()
@@ -0,0 +1,14 @@
+from order_resolver import OptionResolver
+
+def test_design_minimum_segment_height_applies_to_every_combo(sample_catalog):
+    for row in sample_catalog["availability"]:
+        if row["designId"] == "SV":
+            row["minSegmentHeight"] = None
+    for design in sample_catalog["designs"]:
+        if design["id"] == "SV":
+            design["minSegmentHeight"] = 20
+    resolver = OptionResolver(sample_catalog)
+
+    assert "SV" in resolver.remaining_options(material_id="CR39", seg_height=22)["designs"]
+    assert "SV" not in resolver.remaining_options(material_id="CR39", seg_height=15)["designs"]
+    assert "SV" in resolver.remaining_options(material_id="CR39")["designs"]
@@ -0,0 +1,26 @@
+from order_validation import BatchValidator, error_names
+
+def order(sphere, **lens):
+    return {"designId": "SV", "materialId": "CR39", "treatmentId": "CLEAR", "sphere": sphere, **lens}
+
+def test_bad_numeric_value_flags_only_its_order(sample_catalog):
+    validator = BatchValidator(sample_catalog)
+    orders = [order("-2.25"), order("plano"), order(1.5, cylinder="-0.75", axis={"deg": 90}), order(None)]
+
+    errors = [error_names(mask) for mask in validator.validate_orders(orders)]
+
+    assert errors[0] == []
+    assert "NUMERIC_VALUE_INVALID" in errors[1]
+    assert "NUMERIC_VALUE_INVALID" in errors[2] and "AXIS_INVALID" in errors[2]
+    assert errors[3] == ["SPHERE_OUT_OF_RANGE"]
+
+def test_every_treatment_of_an_order_is_validated(sample_catalog):
+    validator = BatchValidator(sample_catalog)
+    lens = {"design": "SV", "material": "CR39", "sphere": -1.0}
+    orders = [{"lensConfig": lens, "treatments": ["CLEAR"]},
+              {"lensConfig": lens, "treatments": ["CLEAR", "TRANS"]},
+              order(-1.0)]
+
+    errors = [error_names(mask) for mask in validator.validate_orders(orders)]
+
+    assert errors == [[], ["INVALID_COMBINATION"], []]
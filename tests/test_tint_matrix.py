@@ -0,0 +1,23 @@
+import json
+
+from tint_matrix import TintMatrix, encode_tint_matrix, expand_tint_matrix
+
+def test_expands_back_to_the_original_rows(sample_catalog):
+    rows = sample_catalog["tintCompatibility"]
+    rows[1]["labCode"] = "G15"
+    rows.reverse()
+
+    section = json.loads(json.dumps(encode_tint_matrix(rows)))
+
+    assert expand_tint_matrix(section) == rows
+
+def test_allowed_tints_match_the_rows(sample_catalog):
+    rows = sample_catalog["tintCompatibility"]
+    matrix = TintMatrix(encode_tint_matrix(rows))
+    row = rows[0]
+
+    expected = [r["tintId"] for r in rows if r["allowed"]
+                and (r["designId"], r["materialId"], r["treatmentId"])
+                == (row["designId"], row["materialId"], row["treatmentId"])]
+    assert matrix.allowed_tints(row["designId"], row["materialId"], row["treatmentId"]) == expected
+    assert matrix.allowed_tints("NOPE", row["materialId"], row["treatmentId"]) == []
@@ -0,0 +1,57 @@
+from openpyxl import load_workbook
+
+from build_catalog import build_catalog
+from catalog_compiler import parse_increment_rule
+from validate_catalog import check_increment_rules, validate_catalog, violation_records
+
+def test_sample_catalog_is_clean(sample_catalog):
+    assert validate_catalog(sample_catalog).empty
+
+def test_violations_point_at_sheet_cells(sample_catalog):
+    sample_catalog["availability"][0]["designId"] = "NOPE"
+    sample_catalog["materials"].append(dict(sample_catalog["materials"][0]))
+    sample_catalog["tints"][1]["percentageMin"] = 90
+    sample_catalog["tints"][1]["percentageMax"] = 10
+    sample_catalog["designs"][2]["minSegmentHeight"] = "tall"
+    sample_catalog["addPowerRules"][0]["incrementRule"] = "sometimes"
+
+    found = {(record["sheet"], record["row"], record["column"], record["check"])
+             for record in violation_records(validate_catalog(sample_catalog))}
+
+    assert found == {
+        ("Availability", 2, "DESIGN_ID", "foreign_key"),
+        ("Materials", len(sample_catalog["materials"]) + 1, "MATERIAL_ID", "duplicate"),
+        ("Tints", 3, "PCT_MIN", "range"),
+        ("Designs", 4, "MIN_SEG_HEIGHT_MM", "type"),
+        ("AddPowerRules", 2, "INCREMENT_RULE", "format")
+    }
+
+def test_rows_after_a_blank_row_keep_their_sheet_row(tmp_path, sample_workbook):
+    workbook_path = tmp_path / "catalog.xlsx"
+    workbook = load_workbook(sample_workbook)
+    sheet = workbook["Availability"]
+    sheet.insert_rows(3, amount=2)
+    column = [cell.value for cell in sheet[1]].index("DESIGN_ID") + 1
+    sheet.cell(row=6, column=column, value="NOPE")
+    workbook.save(workbook_path)
+
+    result = build_catalog(workbook_path, tmp_path / "catalog.json")
+
+    assert [(record["sheet"], record["row"], record["column"]) for record in result["violations"]] == [
+        ("Availability", 6, "DESIGN_ID")
+    ]
+
+def test_increment_rule_check_matches_the_compiler():
+    rules = [">+4.00 in 0.50 steps", "in 0 steps", "sometimes", None, "  ", 3.5, "IN 0.25 STEP"]
+    catalog = {"addPowerRules": [{"incrementRule": rule} for rule in rules]}
+
+    def rejected(rule):
+        try:
+            parse_increment_rule(rule)
+        except ValueError:
+            return True
+        return False
+
+    assert list(check_increment_rules(catalog)[0]["row"]) == [
+        position + 2 for position, rule in enumerate(rules) if rejected(rule)
+    ]
@@ -0,0 +1,44 @@
+from order_validation import BatchValidator
+from validation_cache import ValidationCache, order_hash, validate_orders_cached
+
+def order(sphere):
+    return {"designId": "SV", "materialId": "CR39", "treatmentId": "CLEAR", "sphere": sphere}
+
+def test_equal_values_share_a_key():
+    assert order_hash(order("2.25")) == order_hash(order(2.25)) == order_hash(order("2.250"))
+    assert order_hash(order("plano")) != order_hash(order(None))
+
+def test_bad_numeric_value_is_cached_with_the_rest(tmp_path, sample_catalog):
+    validator = BatchValidator(sample_catalog)
+    orders = [order("-2.25"), order("plano")]
+
+    with ValidationCache(validator.build_id, path=tmp_path / "cache.sqlite") as cache:
+        first = validate_orders_cached(validator, orders, cache)
+    with ValidationCache(validator.build_id, path=tmp_path / "cache.sqlite") as cache:
+        second = validate_orders_cached(validator, orders, cache)
+        assert cache.stats()["diskHits"] == 2
+
+    assert first == second
+    assert first[0] == []
+    assert "NUMERIC_VALUE_INVALID" in first[1]
+
+def test_key_covers_every_treatment():
+    lens = {"design": "SV", "material": "CR39", "sphere": -1.0}
+
+    assert order_hash({"lensConfig": lens, "treatments": ["CLEAR"]}) == order_hash(order(-1.0))
+    assert order_hash({"lensConfig": lens, "treatments": ["CLEAR", "TRANS"]}) != order_hash(order(-1.0))
+    assert (order_hash({"lensConfig": lens, "treatments": ["TRANS", "CLEAR"]})
+            == order_hash({"lensConfig": lens, "treatments": ["CLEAR", "TRANS"]}))
+
+def test_nothing_is_cached_without_a_build_id(tmp_path, sample_catalog):
+    del sample_catalog["metadata"]["buildId"]
+    validator = BatchValidator(sample_catalog)
+    orders = [order("-2.25")]
+
+    with ValidationCache("other-build", path=tmp_path / "cache.sqlite") as cache:
+        cache.put(order("-2.25"), ["SPHERE_OUT_OF_RANGE"])
+    with ValidationCache(validator.build_id, path=tmp_path / "cache.sqlite") as cache:
+        assert validate_orders_cached(validator, orders, cache) == [[]]
+        assert validate_orders_cached(validator, orders, cache) == [[]]
+        assert cache.stats()["misses"] == 2
+        assert cache.disk_size() == 1
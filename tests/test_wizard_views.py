@@ -0,0 +1,46 @@
+from wizard_views import VIEWS, WizardViews, materialize_views
+
+def test_unchanged_catalog_rebuilds_nothing(sample_catalog):
+    document, rebuilt = materialize_views(sample_catalog)
+    again, rebuilt_again = materialize_views(sample_catalog, document)
+
+    assert rebuilt == list(VIEWS)
+    assert rebuilt_again == []
+    assert again == document
+
+def test_only_views_reading_a_changed_section_are_rebuilt(sample_catalog):
+    document, _ = materialize_views(sample_catalog)
+    sample_catalog["metadata"]["buildId"] = "next-build"
+    sample_catalog["frames"][0]["discontinued"] = True
+
+    updated, rebuilt = materialize_views(sample_catalog, document)
+
+    assert rebuilt == ["frameKinds"]
+    assert str(sample_catalog["frames"][0]["sku"]) not in updated["views"]["frameKinds"]["data"]
+
+def test_same_build_id_reuses_section_hashes(sample_catalog):
+    document, _ = materialize_views(sample_catalog)
+    # Same buildId promises the same content, so the edit is not noticed
+    sample_catalog["frames"][0]["discontinued"] = True
+
+    assert materialize_views(sample_catalog, document)[1] == []
+
+def test_queries_follow_orderable_combos(sample_catalog):
+    views = WizardViews.from_catalog(sample_catalog)
+    frame = sample_catalog["frames"][0]
+
+    assert views.frame_kind(frame["sku"]) == "standard"
+    assert views.frame_kind("no-such-sku") is None
+    assert [material["id"] for material in views.materials()] == ["CR39", "TRIVEX"]
+    assert [design["id"] for design in views.designs("CR39")] == ["SV", "PAL"]
+    assert views.designs("NO-SUCH-MATERIAL") == []
+    assert [treatment["id"] for treatment in views.treatments("SV", "CR39")] == ["CLEAR"]
+
+def test_rimless_views_drop_combos_that_cannot_be_rimless(sample_catalog):
+    for treatment in sample_catalog["treatments"]:
+        if treatment["id"] == "CLEAR":
+            treatment["rimlessAllowed"] = False
+    views = WizardViews.from_catalog(sample_catalog)
+
+    assert [treatment["id"] for treatment in views.treatments("SV", "CR39")] == ["CLEAR"]
+    assert views.treatments("SV", "CR39", rimless=True) == []
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Tint Compatibility Matrix
+Compact encoding of the design × material × treatment × tint compatibility
+table as a packed bitset plus small side tables
+"""
+
+import base64
+
+import numpy as np
+
+# Dimension order of the matrix and the row field each axis is keyed on
+DIMENSIONS = [
+    ("designs", "designId"),
+    ("materials", "materialId"),
+    ("treatments", "treatmentId"),
+    ("tints", "tintId")
+]
+
+# Row fields the matrix itself encodes; every other field goes to the per-cell side table
+MATRIX_FIELDS = {field for _, field in DIMENSIONS} | {"allowed"}
+
+def encode_array(array):
+    """Base64-encode a numpy array's raw bytes."""
+    return base64.b64encode(np.ascontiguousarray(array).tobytes()).decode("ascii")
+
+def decode_array(text, dtype, shape=None):
+    """Decode a base64 string produced by encode_array."""
+    array = np.frombuffer(base64.b64decode(text), dtype=dtype)
+    return array.reshape(shape) if shape is not None else array
+
+def encode_bits(mask):
+    """Pack a boolean array into a base64 bitset."""
+    return encode_array(np.packbits(mask.ravel()))
+
+def decode_bits(text, shape):
+    """Unpack a base64 bitset back into a boolean array of ``shape``."""
+    size = int(np.prod(shape))
+    bits = np.unpackbits(decode_array(text, np.uint8), count=size)
+    return bits.astype(bool).reshape(shape)
+
+def encode_tint_matrix(rows):
+    """Encode tintCompatibility rows as a compact matrix section.
+
+    Each dimension gets dense integer ids in first-seen order. ``allowed``
+    and ``present`` (whether the sheet had a row for the cell at all) are
+    packed bitsets; the remaining fields of each row are deduplicated into
+    ``cellTypes`` and referenced by a small integer array, where 0 means
+    the cell has no row. When the rows are not already in matrix order,
+    ``rowOrder`` lists their cells so they expand back in sheet order. A
+    cell listed twice keeps its last row, at its first position.
+    """
+    axes = [{} for _ in DIMENSIONS]
+    for row in rows:
+        for axis, (_, field) in zip(axes, DIMENSIONS):
+            axis.setdefault(row[field], len(axis))
+
+    shape = tuple(len(axis) for axis in axes)
+    allowed = np.zeros(shape, dtype=bool)
+    cell_type_ids = {}
+    cell_types = np.zeros(shape, dtype=np.uint32)
+    # Rows of one sheet share their field names; look the side-table ones up once
+    side_fields = {}
+    order = []
+
+    for row in rows:
+        cell = tuple(axis[row[field]] for axis, (_, field) in zip(axes, DIMENSIONS))
+        allowed[cell] = bool(row["allowed"])
+        names = tuple(row)
+        fields = side_fields.get(names)
+        if fields is None:
+            fields = side_fields[names] = tuple(field for field in names if field not in MATRIX_FIELDS)
+        cell_type = (fields, tuple(map(row.get, fields)))
+        cell_types[cell] = cell_type_ids.setdefault(cell_type, len(cell_type_ids) + 1)
+        design, material, treatment, tint = cell
+        order.append(((design * shape[1] + material) * shape[2] + treatment) * shape[3] + tint)
+
+    id_dtype = np.uint8 if len(cell_type_ids) < 256 else np.uint16 if len(cell_type_ids) < 65536 else np.uint32
+
+    section = {name: list(axis) for axis, (name, _) in zip(axes, DIMENSIONS)}
+    section.update({
+        "shape": list(shape),
+        "allowed": encode_bits(allowed),
+        "present": encode_bits(cell_types > 0),
+        "cellTypes": [dict(zip(fields, values)) for fields, values in cell_type_ids],
+        "cellTypeDtype": np.dtype(id_dtype).name,
+        "cellTypeIds": encode_array(cell_types.astype(id_dtype))
+    })
+    order = np.array(order, dtype=np.int64)
+    if np.any(np.diff(order) <= 0):
+        # Keep each cell once, at its first position
+        _, first = np.unique(order, return_index=True)
+        order = order[np.sort(first)]
+        if np.any(np.diff(order) < 0):
+            section["rowOrder"] = encode_array(order)
+    return section
+
+def expand_tint_matrix(section):
+    """Expand a matrix section back into tintCompatibility rows."""
+    return TintMatrix(section).rows()
+
+class TintMatrix:
+    """Read-only view over an encoded tint matrix section."""
+
+    def __init__(self, section):
+        self.shape = tuple(section["shape"])
+        self.labels = [np.array(section[name], dtype=object) for name, _ in DIMENSIONS]
+        self.positions = [
+            {label: position for position, label in enumerate(section[name])}
+            for name, _ in DIMENSIONS
+        ]
+        self.allowed = decode_bits(section["allowed"], self.shape)
+        self.present = decode_bits(section["present"], self.shape)
+        self.cell_types = section["cellTypes"]
+        self.cell_type_ids = decode_array(
+            section["cellTypeIds"], np.dtype(section["cellTypeDtype"]), self.shape
+        )
+        self.row_order = decode_array(section["rowOrder"], np.int64) if "rowOrder" in section else None
+
+    def combo_position(self, design_id, material_id, treatment_id):
+        """Return matrix coordinates for a combo, or None if it is unknown."""
+        try:
+            return tuple(
+                axis[label] for axis, label in zip(self.positions, (design_id, material_id, treatment_id))
+            )
+        except KeyError:
+            return None
+
+    def allowed_tints(self, design_id, material_id, treatment_id):
+        """Return the tint ids allowed for a design/material/treatment combo."""
+        position = self.combo_position(design_id, material_id, treatment_id)
+        if position is None:
+            return []
+        return self.labels[3][self.allowed[position]].tolist()
+
+    def is_allowed(self, design_id, material_id, treatment_id, tint_id):
+        """Return whether a single tint is allowed for the combo."""
+        position = self.combo_position(design_id, material_id, treatment_id)
+        tint_position = self.positions[3].get(tint_id)
+        if position is None or tint_position is None:
+            return False
+        return bool(self.allowed[position + (tint_position,)])
+
+    def cell(self, design_id, material_id, treatment_id, tint_id):
+        """Return the side-table attributes for one cell, or None if absent."""
+        position = self.combo_position(design_id, material_id, treatment_id)
+        tint_position = self.positions[3].get(tint_id)
+        if position is None or tint_position is None:
+            return None
+        cell_type = int(self.cell_type_ids[position + (tint_position,)])
+        if cell_type == 0:
+            return None
+        return self.cell_types[cell_type - 1]
+
+    def rows(self):
+        """Return every present cell as a tintCompatibility row, in the encoded rows' order."""
+        if self.row_order is None:
+            cells = np.nonzero(self.present)
+        else:
+            cells = np.unravel_index(self.row_order, self.shape)
+        rows = []
+        for cell in zip(*cells):
+            row = {field: self.labels[axis][cell[axis]] for axis, (_, field) in enumerate(DIMENSIONS)}
+            row["allowed"] = bool(self.allowed[cell])
+            row.update(self.cell_types[int(self.cell_type_ids[cell]) - 1])
+            rows.append(row)
+        return rows
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Catalog Validation
+Checks referential integrity, value ranges, types and duplicate ids across
+catalog sections using vectorized DataFrame operations
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from build_catalog import SHEET_SPECS
+from catalog_compiler import INCREMENT_RULE_PATTERN, SECTION_KEYS
+
+# Catalog section -> source sheet, and (section, field) -> source column,
+# so violations can be reported against the workbook the user edits
+SECTION_SHEETS = {section: sheet for sheet, (section, _) in SHEET_SPECS.items()}
+FIELD_COLUMNS = {
+    (section, field): column
+    for section, spec in SHEET_SPECS.values()
+    for field, column, _ in spec
+}
+
+# (section, field) -> referenced section whose "id" must contain the value
+FOREIGN_KEYS = [
+    ("availability", "designId", "designs"),
+    ("availability", "materialId", "materials"),
+    ("availability", "treatmentId", "treatments"),
+    ("addPowerRules", "designId", "designs"),
+    ("addPowerRules", "materialId", "materials"),
+    ("addPowerRules", "treatmentId", "treatments"),
+    ("tintCompatibility", "designId", "designs"),
+    ("tintCompatibility", "materialId", "materials"),
+    ("tintCompatibility", "treatmentId", "treatments"),
+    ("tintCompatibility", "tintId", "tints")
+]
+
+# Key fields that must be present and unique within their section
+UNIQUE_KEYS = SECTION_KEYS
+
+# (section, lower field, upper field) pairs that must satisfy lower <= upper
+RANGES = [
+    ("addPowerRules", "addMin", "addMax"),
+    ("tints", "percentageMin", "percentageMax"),
+    ("tintCompatibility", "percentageMin", "percentageMax")
+]
+
+# Fields that must hold numbers when present
+NUMERIC_FIELDS = {
+    "materials": ["refractiveIndex"],
+    "designs": ["segmentSize", "minSegmentHeight"],
+    "addPowerRules": ["addMin", "addMax"],
+    "availability": ["minSegmentHeight", "leadTimeWeeks"],
+    "tints": ["percentageMin", "percentageMax", "fixedPercentage"],
+    "tintCompatibility": ["percentageMin", "percentageMax"]
+}
+
+VIOLATION_COLUMNS = ["sheet", "row", "column", "check", "value", "message"]
+
+def sheet_rows(catalog, section, count):
+    """Return the Excel row number of each of a section's ``count`` records.
+
+    Excel rows are 1-based and row 1 holds the header. Blank rows the
+    build skipped (metadata.blankRows) shift the records after them.
+    """
+    rows = np.arange(count) + 2
+    blank = catalog.get("metadata", {}).get("blankRows", {}).get(SECTION_SHEETS.get(section), [])
+    if blank:
+        # Number of records that come before each blank row
+        records_before = np.asarray(blank) - 2 - np.arange(len(blank))
+        rows += np.searchsorted(records_before, np.arange(count), side="right")
+    return pd.Index(rows)
+
+def section_frame(catalog, section, fields):
+    """Build a DataFrame with only ``fields`` from a catalog section, indexed by Excel row."""
+    rows = catalog.get(section) or []
+    if not rows:
+        return pd.DataFrame(columns=fields)
+    return pd.DataFrame.from_records(rows, columns=fields, index=sheet_rows(catalog, section, len(rows)))
+
+def violations_for(section, field, mask, frame, check, message, values=None):
+    """Turn a boolean row mask into violation rows for one field."""
+    hits = frame.index[mask.to_numpy()]
+    if len(hits) == 0:
+        return None
+    values = frame.loc[hits, field] if values is None else values[mask]
+    return pd.DataFrame({
+        "sheet": SECTION_SHEETS.get(section, section),
+        "row": hits,
+        "column": FIELD_COLUMNS.get((section, field), field),
+        "check": check,
+        "value": values.to_numpy(),
+        "message": message
+    })
+
+def check_foreign_keys(catalog):
+    """Flag references to ids missing from the referenced section."""
+    found = []
+    known_ids = {}
+    for section, field, target in FOREIGN_KEYS:
+        if target not in known_ids:
+            known_ids[target] = pd.Index(section_frame(catalog, target, ["id"])["id"].dropna().unique())
+        frame = section_frame(catalog, section, [field])
+        mask = frame[field].notna() & ~frame[field].isin(known_ids[target])
+        found.append(violations_for(section, field, mask, frame, "foreign_key",
+                                    f"unknown {target} id"))
+    return found
+
+def check_unique_keys(catalog):
+    """Flag missing and duplicated key values."""
+    found = []
+    for section, fields in UNIQUE_KEYS.items():
+        frame = section_frame(catalog, section, fields)
+        for field in fields:
+            found.append(violations_for(section, field, frame[field].isna(), frame,
+                                        "required", "missing key value"))
+        duplicated = frame.duplicated(subset=fields, keep="first") & frame[fields].notna().all(axis=1)
+        if len(fields) == 1:
+            values = None
+        else:
+            values = frame[fields[0]].astype(str).str.cat(
+                [frame[field].astype(str) for field in fields[1:]], sep="|"
+            )
+        found.append(violations_for(section, fields[0], duplicated, frame, "duplicate",
+                                    f"duplicate {'/'.join(fields)}", values))
+    return found
+
+def check_ranges(catalog):
+    """Flag rows whose lower bound exceeds their upper bound."""
+    found = []
+    for section, lower, upper in RANGES:
+        frame = section_frame(catalog, section, [lower, upper])
+        low = pd.to_numeric(frame[lower], errors="coerce")
+        high = pd.to_numeric(frame[upper], errors="coerce")
+        mask = low.notna() & high.notna() & (low > high)
+        values = low.astype(str) + " > " + high.astype(str)
+        found.append(violations_for(section, lower, mask, frame, "range",
+                                    f"{lower} greater than {upper}", values))
+    return found
+
+def check_numeric_fields(catalog):
+    """Flag values that should be numeric but are not."""
+    found = []
+    for section, fields in NUMERIC_FIELDS.items():
+        frame = section_frame(catalog, section, fields)
+        for field in fields:
+            column = frame[field]
+            if pd.api.types.is_bool_dtype(column):
+                mask = column.notna()
+            else:
+                mask = column.notna() & pd.to_numeric(column, errors="coerce").isna()
+            found.append(violations_for(section, field, mask, frame, "type", "expected a number"))
+    return found
+
+def check_increment_rules(catalog):
+    """Flag ADD increment rules the compiler cannot parse.
+
+    Uses the compiler's own pattern, so exactly the rules
+    parse_increment_rule rejects are flagged.
+    """
+    frame = section_frame(catalog, "addPowerRules", ["incrementRule"])
+    text = frame["incrementRule"].dropna().astype(str)
+    step = pd.to_numeric(text.str.extract(INCREMENT_RULE_PATTERN)[2], errors="coerce")
+    invalid = text.str.strip().ne("") & (step.isna() | (step <= 0))
+    mask = invalid.reindex(frame.index, fill_value=False)
+    return [violations_for("addPowerRules", "incrementRule", mask, frame, "format",
+                           'expected a rule like ">+4.00 in 0.50 steps"')]
+
+CHECKS = [check_foreign_keys, check_unique_keys, check_ranges, check_numeric_fields, check_increment_rules]
+
+def validate_catalog(catalog):
+    """Run every check and return all violations as one DataFrame."""
+    found = [violations for check in CHECKS for violations in check(catalog) if violations is not None]
+    if not found:
+        return pd.DataFrame(columns=VIOLATION_COLUMNS)
+    report = pd.concat(found, ignore_index=True)
+    return report.sort_values(["sheet", "row", "column"], kind="stable").reset_index(drop=True)
+
+def violation_records(report):
+    """Convert a violations DataFrame into JSON-friendly dicts."""
+    records = report.astype(object).where(report.notna(), None).to_dict("records")
+    for record in records:
+        record["row"] = int(record["row"])
+        if not isinstance(record["value"], (str, int, float, bool, type(None))):
+            record["value"] = str(record["value"])
+    return records
+
+def parse_args(argv=None):
+    """Parse command line options."""
+    parser = argparse.ArgumentParser(description="Validate a catalog JSON file")
+    parser.add_argument("catalog", nargs="?", default="data/sample_catalog.json",
+                        help="Catalog JSON to validate")
+    parser.add_argument("--output", help="Write violations to this JSON file")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """Main validation function."""
+    args = parse_args(argv)
+    catalog_path = Path(args.catalog)
+    if not catalog_path.exists():
+        print(f"❌ Catalog not found: {catalog_path}")
+        sys.exit(1)
+
+    with open(catalog_path, encoding="utf-8") as f:
+        catalog = json.load(f)
+
+    print(f"🔍 Validating catalog: {catalog_path}")
+    report = validate_catalog(catalog)
+    records = violation_records(report)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(records, f, indent=2, ensure_ascii=False)
+
+    if not records:
+        print("✅ No violations found")
+        return
+
+    print(f"❌ {len(records)} violations found")
+    for check, count in report["check"].value_counts().items():
+        print(f"   {check}: {count}")
+    for record in records[:20]:
+        print(f"   {record['sheet']} row {record['row']} {record['column']}: "
+              f"{record['message']} ({record['value']})")
+    if len(records) > 20:
+        print(f"   ... {len(records) - 20} more")
+    sys.exit(1)
+
+if __name__ == "__main__":
+    main()
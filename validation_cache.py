@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+Validation Cache
+Remembers order validation results per catalog build: an in-memory LRU
+with TTL expiry in front of an optional SQLite file that keeps warm
+results across restarts and shares them between worker processes
+"""
+
+import hashlib
+import json
+import sqlite3
+import time
+from collections import OrderedDict
+
+from order_validation import error_names, order_rows
+
+DEFAULT_MAX_SIZE = 10000
+DEFAULT_TTL = 24 * 60 * 60
+DEFAULT_DISK_MAX_SIZE = 1000000
+
+# Disk-tier size limits are enforced every this many writes, not on each one
+PRUNE_INTERVAL = 1000
+
+# SQLite caps bound parameters per statement; batch lookups stay below it
+LOOKUP_BATCH = 500
+
+# dumps() with keyword arguments builds a new encoder per call; reuse one
+CANONICAL_ENCODER = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False)
+
+# Seconds a process waits for another one's write lock on the SQLite file
+SQLITE_TIMEOUT = 30
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS validation_results (
+    build_id TEXT NOT NULL,
+    order_hash TEXT NOT NULL,
+    result TEXT NOT NULL,
+    expires_at REAL NOT NULL,
+    last_used REAL NOT NULL,
+    PRIMARY KEY (build_id, order_hash)
+)
+"""
+
+def number(value):
+    """Return a numeric order field as a float, None when blank.
+
+    Values that are not numbers are kept as text: they still get a stable
+    key, and validation reports them as NUMERIC_VALUE_INVALID.
+    """
+    if value is None or value == "":
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return str(value)
+
+def order_config(order):
+    """Return the values, in ORDER_FIELDS order, that an order's validation depends on.
+
+    Nested and flat orders normalize to the same config, and numbers are
+    compared by value, so "2.25", 2.25 and 2.250 share a cache entry.
+    The treatment is the sorted list of every treatment the order names.
+    """
+    rows = order_rows(order)
+    design_id, material_id, _, sphere, cylinder, axis, add_power, segment_height = rows[0]
+    treatments = sorted({row[2] for row in rows}, key=str)
+    return [design_id, material_id, treatments, number(sphere), number(cylinder), number(axis),
+            number(add_power), number(segment_height)]
+
+def order_hash(order):
+    """Return a stable hash of an order's validation-relevant configuration."""
+    text = CANONICAL_ENCODER.encode(order_config(order))
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+class ValidationCache:
+    """Validation results keyed by order configuration hash and catalog buildId.
+
+    Entries live for ``ttl`` seconds; the memory tier keeps the
+    ``max_size`` most recently used ones. With ``path`` results are also
+    written to a SQLite file (up to ``disk_max_size`` rows) that other
+    processes can open at the same time. Results must be JSON-serializable.
+    Without a build id nothing tells two catalogs apart, so nothing is
+    cached: every lookup misses and every store is dropped.
+    """
+
+    def __init__(self, build_id, max_size=DEFAULT_MAX_SIZE, ttl=DEFAULT_TTL, path=None,
+                 disk_max_size=DEFAULT_DISK_MAX_SIZE):
+        self.build_id = build_id
+        self.max_size = max_size
+        self.ttl = ttl
+        self.disk_max_size = disk_max_size
+        self.entries = OrderedDict()
+        self.counters = dict.fromkeys(
+            ("hits", "diskHits", "misses", "evictions", "expirations", "invalidations"), 0)
+        self.writes = 0
+        self.db = None
+        if path is not None:
+            # Autocommit; WAL lets readers in other processes work during a write
+            self.db = sqlite3.connect(str(path), timeout=SQLITE_TIMEOUT, isolation_level=None)
+            self.db.execute("PRAGMA journal_mode=WAL")
+            # A crash can lose the last writes but never corrupts the file; fine for a cache
+            self.db.execute("PRAGMA synchronous=NORMAL")
+            self.db.execute(SCHEMA)
+            if build_id is not None:
+                self.purge_other_builds()
+
+    @classmethod
+    def for_catalog(cls, catalog, **options):
+        """Return a cache bound to the catalog's metadata.buildId."""
+        return cls(catalog.get("metadata", {}).get("buildId"), **options)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        """Close the SQLite file, if any."""
+        if self.db is not None:
+            self.db.close()
+            self.db = None
+
+    def purge_other_builds(self):
+        """Delete disk entries written for any other catalog build."""
+        deleted = self.db.execute("DELETE FROM validation_results WHERE build_id != ?",
+                                  (str(self.build_id),)).rowcount
+        self.counters["invalidations"] += max(deleted, 0)
+
+    def bind(self, build_id):
+        """Switch to a new catalog build, dropping every result from the old one."""
+        if build_id == self.build_id:
+            return
+        self.counters["invalidations"] += len(self.entries)
+        self.entries.clear()
+        self.build_id = build_id
+        if self.db is not None and build_id is not None:
+            self.purge_other_builds()
+
+    def get(self, order, default=None):
+        """Return the cached result for an order, or ``default``."""
+        return self.get_hashed(order_hash(order), default)
+
+    def get_hashed(self, key, default=None):
+        """Return the cached result for an order hash, or ``default``."""
+        result = self.get_many([key])[0]
+        return default if result is None else result
+
+    def get_many(self, keys):
+        """Return the cached result for each order hash, None for misses.
+
+        Memory misses are looked up in the disk tier in batches, and their
+        last-used times are updated in a single transaction.
+        """
+        results = [None] * len(keys)
+        if self.build_id is None:
+            self.counters["misses"] += len(keys)
+            return results
+        now = time.time()
+        pending = {}
+        for position, key in enumerate(keys):
+            entry = self.entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self.entries.move_to_end(key)
+                    self.counters["hits"] += 1
+                    results[position] = entry[1]
+                    continue
+                del self.entries[key]
+                self.counters["expirations"] += 1
+            pending.setdefault(key, []).append(position)
+
+        if self.db is not None and pending:
+            found = self.load_disk(list(pending), now)
+            for key, (result, expires_at) in found.items():
+                self.remember(key, result, expires_at)
+                positions = pending.pop(key)
+                self.counters["diskHits"] += len(positions)
+                for position in positions:
+                    results[position] = result
+
+        self.counters["misses"] += sum(len(positions) for positions in pending.values())
+        return results
+
+    def load_disk(self, keys, now):
+        """Return {order hash: (result, expires_at)} for the live disk entries among ``keys``."""
+        build_id = str(self.build_id)
+        found = {}
+        for start in range(0, len(keys), LOOKUP_BATCH):
+            batch = keys[start:start + LOOKUP_BATCH]
+            rows = self.db.execute(
+                "SELECT order_hash, result, expires_at FROM validation_results "
+                f"WHERE build_id = ? AND order_hash IN ({','.join('?' * len(batch))})",
+                [build_id, *batch]
+            ).fetchall()
+            for key, result, expires_at in rows:
+                if expires_at > now:
+                    found[key] = (json.loads(result), expires_at)
+                else:
+                    self.counters["expirations"] += 1
+        if found:
+            with self.db:
+                self.db.execute("BEGIN")
+                self.db.executemany(
+                    "UPDATE validation_results SET last_used = ? WHERE build_id = ? AND order_hash = ?",
+                    [(now, build_id, key) for key in found]
+                )
+        return found
+
+    def put(self, order, result):
+        """Cache the result of validating an order."""
+        self.put_many([(order_hash(order), result)])
+
+    def put_many(self, items):
+        """Cache (order hash, result) pairs, writing the disk tier in one transaction."""
+        if self.build_id is None:
+            return
+        now = time.time()
+        expires_at = now + self.ttl
+        items = list(items)
+        for key, result in items:
+            self.remember(key, result, expires_at)
+        if self.db is None or not items:
+            return
+        with self.db:
+            self.db.execute("BEGIN")
+            self.db.executemany(
+                "INSERT OR REPLACE INTO validation_results VALUES (?, ?, ?, ?, ?)",
+                [(str(self.build_id), key, json.dumps(result), expires_at, now) for key, result in items]
+            )
+        self.writes += len(items)
+        if self.writes >= PRUNE_INTERVAL:
+            self.writes = 0
+            self.prune_disk()
+
+    def remember(self, key, result, expires_at):
+        """Store an entry in the memory tier, evicting the least recently used."""
+        self.entries[key] = (expires_at, result)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+            self.counters["evictions"] += 1
+
+    def prune_disk(self):
+        """Drop expired disk entries, then the least recently used beyond disk_max_size."""
+        expired = self.db.execute("DELETE FROM validation_results WHERE expires_at <= ?", (time.time(),)).rowcount
+        self.counters["expirations"] += max(expired, 0)
+        evicted = self.db.execute(
+            "DELETE FROM validation_results WHERE rowid IN ("
+            "SELECT rowid FROM validation_results ORDER BY last_used DESC, rowid DESC LIMIT -1 OFFSET ?)",
+            (self.disk_max_size,)
+        ).rowcount
+        self.counters["evictions"] += max(evicted, 0)
+
+    def disk_size(self):
+        """Return the number of rows in the disk tier."""
+        if self.db is None:
+            return 0
+        return self.db.execute("SELECT COUNT(*) FROM validation_results").fetchone()[0]
+
+    def stats(self):
+        """Return hit/miss/eviction counters for both tiers."""
+        hits = self.counters["hits"] + self.counters["diskHits"]
+        lookups = hits + self.counters["misses"]
+        return dict(
+            self.counters,
+            buildId=self.build_id,
+            size=len(self.entries),
+            maxSize=self.max_size,
+            diskSize=self.disk_size(),
+            hitRate=hits / lookups if lookups else 0.0
+        )
+
+def validate_orders_cached(validator, orders, cache):
+    """Return each order's error codes, validating only the cache misses.
+
+    The misses are validated together in one BatchValidator call.
+    """
+    cache.bind(validator.build_id)
+    keys = [order_hash(order) for order in orders]
+    results = cache.get_many(keys)
+    missing = [position for position, result in enumerate(results) if result is None]
+    if missing:
+        masks = validator.validate_orders([orders[position] for position in missing])
+        fresh = {}
+        for position, mask in zip(missing, masks):
+            results[position] = fresh[keys[position]] = error_names(mask)
+        cache.put_many(fresh.items())
+    return results
@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""
+Order Wizard Views
+Materializes the denormalized per-screen views the order wizard needs
+(frame -> material -> design -> treatment -> tint) from a compiled catalog,
+rebuilding only the views whose source sections changed, and serves them
+with single dictionary lookups
+"""
+
+import argparse
+import hashlib
+import json
+import sys
+from pathlib import Path
+
+from build_catalog import write_json
+from catalog_compiler import combo_key
+from catalog_writer import COMPACT_ENCODER
+from order_resolver import is_rimless_frame
+
+VIEWS_VERSION = 1
+
+# Frames are either mounted with a rim or rimless; every view that depends
+# on the frame is split by this
+FRAME_KINDS = ("standard", "rimless")
+
+# Sections whose rows decide which design x material x treatment combos can be ordered
+ORDERABLE_SECTIONS = ["availability", "materials", "designs", "treatments"]
+
+def section_hash(catalog, section):
+    """Return a content hash of one catalog section."""
+    text = COMPACT_ENCODER.encode(catalog.get(section))
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+def tint_rows(catalog):
+    """Return tint compatibility rows from whichever form the catalog has."""
+    if "tintMatrix" in catalog:
+        from tint_matrix import expand_tint_matrix
+        return expand_tint_matrix(catalog["tintMatrix"])
+    return catalog.get("tintCompatibility", [])
+
+def orderable_rows(catalog):
+    """Yield (availability row, material, design, treatment) for every orderable combo.
+
+    Uses the same rules as order_resolver: the row is available, the
+    material is available and the design is not discontinued.
+    """
+    materials = {row["id"]: row for row in catalog.get("materials", [])}
+    designs = {row["id"]: row for row in catalog.get("designs", [])}
+    treatments = {row["id"]: row for row in catalog.get("treatments", [])}
+    for row in catalog.get("availability", []):
+        material = materials.get(row["materialId"])
+        design = designs.get(row["designId"])
+        treatment = treatments.get(row["treatmentId"])
+        if not row.get("available") or material is None or design is None or treatment is None:
+            continue
+        if not material.get("available", True) or design.get("discontinued"):
+            continue
+        yield row, material, design, treatment
+
+def allows_rimless(row, material, treatment):
+    """Return whether a combo can be mounted in a rimless frame."""
+    return bool(row.get("rimlessAllowed") and material.get("rimlessAllowed") and treatment.get("rimlessAllowed"))
+
+def fastest(current, lead_time):
+    """Return the shorter of two lead times, ignoring unknown ones."""
+    if current is None:
+        return lead_time
+    if lead_time is None:
+        return current
+    return min(current, lead_time)
+
+def first_known(*values):
+    """Return the first value that is not None."""
+    return next((value for value in values if value is not None), None)
+
+def by_kind(entries):
+    """Split entries (each with a rimlessAllowed flag) into the per-frame-kind lists."""
+    return {
+        "standard": entries,
+        "rimless": [entry for entry in entries if entry["rimlessAllowed"]]
+    }
+
+def view_frame_kinds(catalog):
+    """SKU -> "standard" or "rimless" for every frame that can still be ordered."""
+    return {
+        str(frame["sku"]): "rimless" if is_rimless_frame(frame) else "standard"
+        for frame in catalog.get("frames", [])
+        if not frame.get("discontinued")
+    }
+
+def view_frame_materials(catalog):
+    """Frame kind -> the materials offered in at least one orderable combo."""
+    entries = {}
+    for row, material, _, treatment in orderable_rows(catalog):
+        entry = entries.get(material["id"])
+        if entry is None:
+            entry = entries[material["id"]] = {
+                "id": material["id"],
+                "displayName": material.get("displayName"),
+                "refractiveIndex": material.get("refractiveIndex"),
+                "labOutput": material.get("labOutput"),
+                "rimlessAllowed": False
+            }
+        entry["rimlessAllowed"] = entry["rimlessAllowed"] or allows_rimless(row, material, treatment)
+    order = {row["id"]: position for position, row in enumerate(catalog.get("materials", []))}
+    return by_kind(sorted(entries.values(), key=lambda entry: order[entry["id"]]))
+
+def view_designs_by_material(catalog):
+    """Material -> frame kind -> designs with their fastest lead time."""
+    designs = {}
+    for row, material, design, treatment in orderable_rows(catalog):
+        entry = designs.setdefault(material["id"], {}).get(design["id"])
+        if entry is None:
+            entry = designs[material["id"]][design["id"]] = {
+                "id": design["id"],
+                "category": design.get("category"),
+                "segmentType": design.get("segmentType"),
+                "labOutput": design.get("labOutput"),
+                "minSegmentHeight": design.get("minSegmentHeight") or 0,
+                "leadTimeWeeks": None,
+                "rimlessAllowed": False
+            }
+        entry["leadTimeWeeks"] = fastest(entry["leadTimeWeeks"], row.get("leadTimeWeeks"))
+        entry["rimlessAllowed"] = entry["rimlessAllowed"] or allows_rimless(row, material, treatment)
+    return {material_id: by_kind(list(entries.values())) for material_id, entries in designs.items()}
+
+def view_combo_treatments(catalog):
+    """design|material -> frame kind -> treatments with the combo's own limits."""
+    treatments = {}
+    for row, material, design, treatment in orderable_rows(catalog):
+        treatments.setdefault(f"{design['id']}|{material['id']}", []).append({
+            "id": treatment["id"],
+            "type": treatment.get("type"),
+            "labOutput": treatment.get("labOutput"),
+            "colorLimits": row.get("colorLimits"),
+            "leadTimeWeeks": row.get("leadTimeWeeks"),
+            "minSegmentHeight": max(row.get("minSegmentHeight") or 0, design.get("minSegmentHeight") or 0),
+            "rimlessAllowed": allows_rimless(row, material, treatment)
+        })
+    return {key: by_kind(entries) for key, entries in treatments.items()}
+
+def view_combo_tints(catalog):
+    """Combo key -> the tints allowed for that orderable combo, with their ranges."""
+    orderable = {
+        combo_key(row["designId"], row["materialId"], row["treatmentId"])
+        for row, _, _, _ in orderable_rows(catalog)
+    }
+    tints = {row["id"]: row for row in catalog.get("tints", [])}
+    options = {}
+    for row in tint_rows(catalog):
+        key = combo_key(row["designId"], row["materialId"], row["treatmentId"])
+        tint = tints.get(row["tintId"])
+        if not row.get("allowed") or tint is None or key not in orderable:
+            continue
+        options.setdefault(key, []).append({
+            "id": tint["id"],
+            "category": tint.get("category"),
+            "colorName": tint.get("colorName"),
+            "style": tint.get("style"),
+            "styleRequired": row.get("styleRequired"),
+            # The combo's own range overrides the tint's general one
+            "percentageMin": first_known(row.get("percentageMin"), tint.get("percentageMin")),
+            "percentageMax": first_known(row.get("percentageMax"), tint.get("percentageMax")),
+            "fixedPercentage": tint.get("fixedPercentage"),
+            "labOutput": tint.get("labOutput")
+        })
+    return options
+
+# View -> (builder, catalog sections it reads)
+VIEWS = {
+    "frameKinds": (view_frame_kinds, ["frames"]),
+    "frameMaterials": (view_frame_materials, ORDERABLE_SECTIONS),
+    "designsByMaterial": (view_designs_by_material, ORDERABLE_SECTIONS),
+    "comboTreatments": (view_combo_treatments, ORDERABLE_SECTIONS),
+    "comboTints": (view_combo_tints, ORDERABLE_SECTIONS + ["tints", "tintCompatibility", "tintMatrix"])
+}
+
+def materialize_views(catalog, previous=None, metrics=None):
+    """Build every wizard view, reusing the previous ones whose sources are unchanged.
+
+    Returns (views document, names of the rebuilt views). Each view
+    records a hash over the sections it reads; a section is hashed once
+    even when several views read it. The same buildId means the same
+    content, so the previous section hashes are reused without hashing.
+    """
+    previous = previous if previous and previous.get("version") == VIEWS_VERSION else {"views": {}}
+    build_id = catalog.get("metadata", {}).get("buildId")
+    sections = sorted({section for _, view_sections in VIEWS.values() for section in view_sections})
+    hashes = previous.get("sectionHashes") or {}
+    if build_id is None or previous.get("buildId") != build_id or any(section not in hashes for section in sections):
+        if metrics is None:
+            hashes = {section: section_hash(catalog, section) for section in sections}
+        else:
+            with metrics.stage("hash_sections", rows=len(sections)):
+                hashes = {section: section_hash(catalog, section) for section in sections}
+
+    views = {}
+    rebuilt = []
+    for name, (build, view_sections) in VIEWS.items():
+        source_hash = hashlib.sha256(
+            "".join(hashes[section] for section in view_sections).encode("ascii")).hexdigest()
+        cached = previous["views"].get(name)
+        if cached and cached["sourceHash"] == source_hash:
+            views[name] = cached
+            continue
+        if metrics is None:
+            data = build(catalog)
+        else:
+            with metrics.stage("materialize_view", view=name) as stage:
+                data = build(catalog)
+                stage["rows"] = len(data)
+        views[name] = {"sourceHash": source_hash, "data": data}
+        rebuilt.append(name)
+
+    document = {
+        "version": VIEWS_VERSION,
+        "buildId": build_id,
+        "sectionHashes": hashes,
+        "views": views
+    }
+    return document, rebuilt
+
+def load_views(path):
+    """Load a views file, or None when it is missing or unreadable."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+class WizardViews:
+    """Answers each wizard screen's question with one lookup into the materialized views."""
+
+    def __init__(self, document):
+        self.build_id = document.get("buildId")
+        views = document["views"]
+        self.frame_kinds = views["frameKinds"]["data"]
+        self.frame_materials = views["frameMaterials"]["data"]
+        self.designs_by_material = views["designsByMaterial"]["data"]
+        self.combo_treatments = views["comboTreatments"]["data"]
+        self.combo_tints = views["comboTints"]["data"]
+
+    @classmethod
+    def from_catalog(cls, catalog):
+        """Materialize the views for a catalog in memory."""
+        return cls(materialize_views(catalog)[0])
+
+    def frame_kind(self, frame_sku):
+        """Return "standard" or "rimless" for an orderable frame, or None."""
+        return self.frame_kinds.get(str(frame_sku))
+
+    def materials(self, frame_sku=None):
+        """Materials usable with a frame (any frame when ``frame_sku`` is None)."""
+        if frame_sku is None:
+            return self.frame_materials["standard"]
+        kind = self.frame_kind(frame_sku)
+        return self.frame_materials[kind] if kind else []
+
+    def designs(self, material_id, rimless=False):
+        """Designs orderable in a material, with their fastest lead time."""
+        return self.designs_by_material.get(material_id, {}).get(FRAME_KINDS[rimless], [])
+
+    def treatments(self, design_id, material_id, rimless=False):
+        """Treatments orderable for a design in a material."""
+        return self.combo_treatments.get(f"{design_id}|{material_id}", {}).get(FRAME_KINDS[rimless], [])
+
+    def tints(self, design_id, material_id, treatment_id):
+        """Tints allowed for a combo, with their percentage ranges."""
+        return self.combo_tints.get(combo_key(design_id, material_id, treatment_id), [])
+
+def parse_args(argv=None):
+    """Parse command line options."""
+    parser = argparse.ArgumentParser(description="Materialize the order wizard's per-screen views")
+    parser.add_argument("--catalog", default="data/sample_catalog.json",
+                        help="Catalog JSON or binary (.ocat) file")
+    parser.add_argument("--output", default="data/wizard_views.json",
+                        help="Where to write the views")
+    parser.add_argument("--full", action="store_true",
+                        help="Rebuild every view even if its sections are unchanged")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """Materialize the views for a catalog, incrementally."""
+    args = parse_args(argv)
+    catalog_path = Path(args.catalog)
+    if not catalog_path.exists():
+        print(f"❌ Catalog not found: {catalog_path}")
+        sys.exit(1)
+
+    from catalog_access import load_catalog
+    catalog = load_catalog(catalog_path)
+    output_path = Path(args.output)
+    previous = None if args.full else load_views(output_path)
+
+    print(f"🔍 Materializing wizard views for {catalog_path}")
+    document, rebuilt = materialize_views(catalog, previous)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    write_json(output_path, document, indent=None)
+
+    for name, view in document["views"].items():
+        status = "rebuilt" if name in rebuilt else "unchanged"
+        print(f"   {name}: {len(view['data'])} entries ({status})")
+    print(f"✅ Views saved to: {output_path}")
+
+if __name__ == "__main__":
+    main()